@@ -0,0 +1,133 @@
+"""
+승인 제어(admission control) 부하 테스트
+
+lab5_runtime_streaming.invoke에 순간적으로 많은 요청을 보내고, 승인 제어가 없을 때와
+있을 때 클라이언트 마감 시간 안에 끝난 요청 수와 거절 응답 시간을 비교합니다.
+
+모델은 동시 처리 용량이 제한된 StubBedrockModel 대역입니다. 용량을 넘는 호출은
+Bedrock처럼 ThrottlingException으로 실패하고, strands가 백오프 후 재시도하면서
+다시 부딪히므로 승인 제어가 없으면 스로틀링이 연쇄적으로 퍼집니다.
+(시간을 줄이기 위해 재시도 간격은 1초부터 시작하도록 줄였습니다)
+
+실행:
+    python benchmarks/bench_admission_control.py --burst 120 --capacity 8 --deadline 3
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.dirname(__file__))
+
+from strands import Agent
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+from strands.event_loop._retry import ModelRetryStrategy
+from strands.types.exceptions import ModelThrottledException
+
+from stub_model import StubBedrockModel
+
+
+class ThrottlingModel(StubBedrockModel):
+    """동시에 capacity개 호출만 처리하고 나머지는 스로틀링 예외를 내는 모델 대역"""
+
+    def __init__(self, capacity: int, **kwargs):
+        super().__init__(**kwargs)
+        self.capacity = capacity
+        self.active = 0
+        self.attempts = 0
+        self.throttled = 0
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.attempts += 1
+        if self.active >= self.capacity:
+            self.throttled += 1
+            raise ModelThrottledException("Too many requests, please wait before trying again.")
+        self.active += 1
+        try:
+            async for event in super().stream(messages, tool_specs, system_prompt, **kwargs):
+                yield event
+        finally:
+            self.active -= 1
+
+
+async def one_request(module, run: str, index: int):
+    """요청 하나를 끝까지 받고 (결과, 소요 시간) 반환"""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        async for frame in module.invoke({"prompt": "반품 기간이 어떻게 되나요?", "session_id": f"{run}-{index}"}):
+            if frame.get("error_type") == "ServerBusy":
+                outcome = "rejected"
+    except ModelThrottledException:
+        outcome = "failed"
+    return outcome, time.perf_counter() - started
+
+
+async def run_burst(module, run: str, burst: int):
+    return await asyncio.gather(*(one_request(module, run, i) for i in range(burst)))
+
+
+def summarize(label: str, results, deadline: float):
+    ok = [t for outcome, t in results if outcome == "ok" and t <= deadline]
+    late = [t for outcome, t in results if outcome == "ok" and t > deadline]
+    rejected = [t for outcome, t in results if outcome == "rejected"]
+    failed = [t for outcome, t in results if outcome == "failed"]
+    p95 = sorted(ok)[int(len(ok) * 0.95) - 1] if len(ok) > 1 else (ok[0] if ok else 0)
+    print(f"{label:<10} 마감 내 완료 {len(ok):4d} | 마감 초과 {len(late):4d} | 스로틀 실패 {len(failed):4d} | "
+          f"즉시 거절 {len(rejected):4d} ({(statistics.mean(rejected) * 1000 if rejected else 0):.2f}ms) | "
+          f"완료 p95 {p95:5.2f}초 | 실패까지 평균 {(statistics.mean(failed) if failed else 0):5.2f}초")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="승인 제어 부하 테스트")
+    parser.add_argument("--burst", type=int, default=120, help="동시에 보내는 요청 수")
+    parser.add_argument("--capacity", type=int, default=8, help="모델 동시 처리 용량")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="모델 호출 지연 (ms)")
+    parser.add_argument("--deadline", type=float, default=3.0, help="클라이언트 마감 시간 (초)")
+    parser.add_argument("--max-queue", type=int, default=16)
+    parser.add_argument("--queue-timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    # 모든 요청이 모델까지 가도록 답변 캐시는 끔 (캐시 효과는 bench_answer_cache.py에서 측정)
+    os.environ["ANSWER_CACHE"] = "false"
+    sys.path.insert(0, os.path.join(ROOT, "notebooks", "lab-05-agentcore-observability"))
+    module = importlib.import_module("lab5_runtime_streaming")
+    from admission_control import AdmissionController
+
+    print("📊 승인 제어 부하 테스트")
+    print(f"요청 {args.burst}개 동시 도착, 모델 용량 {args.capacity} × {args.latency_ms}ms, "
+          f"클라이언트 마감 {args.deadline}초")
+    print("=" * 100)
+
+    modes = [
+        ("제어 없음", AdmissionController(max_concurrency=10 ** 6, max_queue=0)),
+        ("승인 제어", AdmissionController(
+            max_concurrency=args.capacity, max_queue=args.max_queue, queue_timeout_seconds=args.queue_timeout,
+        )),
+    ]
+    for run, (label, controller) in enumerate(modes):
+        # 런타임의 모델/에이전트 생성/승인 제어기를 교체 (세션 ID는 모드마다 다르게)
+        model = ThrottlingModel(capacity=args.capacity, first_token_ms=args.latency_ms)
+        module.agent_pool.agent_factory = lambda: Agent(
+            model=model,
+            tools=module.get_tools(),
+            system_prompt=module.ecommerce_tools.ECOMMERCE_SYSTEM_PROMPT,
+            conversation_manager=SlidingWindowConversationManager(window_size=module.HISTORY_WINDOW_SIZE),
+            retry_strategy=ModelRetryStrategy(max_attempts=4, initial_delay=1, max_delay=4),
+            callback_handler=None,
+        )
+        module.admission = controller
+        results = asyncio.run(run_burst(module, f"run{run}", args.burst))
+        summarize(label, results, args.deadline)
+        print(f"{'':<10} 모델 호출 {model.attempts}회 (스로틀 {model.throttled}회) | 게이지: {controller.gauges()}")
+        print("-" * 100)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+FAQ 답변 캐시 벤치마크
+
+lab5_runtime_streaming의 invoke()로 정책 질문 트래픽(같은 질문의 다른 표현 + 개인/맥락 질문)을
+보내면서, 답변 캐시(answer_cache)를 켠 경우와 끈 경우의 응답 시간, 모델 호출 수, 적중률,
+오답 적중(다른 정책 질문의 답변을 돌려준 경우)을 비교합니다.
+
+- 모델은 StubBedrockModel 대역 (호출마다 --first-token-ms 지연). 답변에 질문을 그대로 넣어,
+  캐시가 돌려준 답변이 어떤 질문의 것인지 확인
+- 세션마다 질문 1건 (정책 질문 트래픽은 대부분 새 세션의 첫 질문)
+
+실행:
+    python benchmarks/bench_answer_cache.py --requests 120 --first-token-ms 600
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, "notebooks", "lab-05-agentcore-observability"))
+os.environ.setdefault("AWS_REGION", "us-east-1")
+
+import lab5_runtime_streaming as runtime  # noqa: E402
+from stub_model import StubBedrockModel, last_user_text  # noqa: E402
+
+# 정책 질문별 표현 (같은 줄은 같은 답변이면 되는 질문)
+FAQ_TRAFFIC = {
+    "반품 기간": ["반품 기간이 어떻게 되나요?", "반품 기간 며칠이에요?", "반품기간이 어떻게 되나요", "반품 기간 알려주세요"],
+    "반품 배송비": ["반품 배송비는 얼마인가요?", "반품 배송비 얼마예요?", "반품할 때 배송비 얼마예요?"],
+    "교환 기간": ["교환 기간은 며칠인가요?", "교환 기간이 며칠이에요?", "교환 기간 알려주세요"],
+    "교환 배송비": ["교환 배송비는 누가 부담하나요?", "교환 배송비는 누가 부담해요?"],
+    "교환 조건": ["교환 조건이 어떻게 되나요?", "교환 조건 알려주세요"],
+    "환불 기간": ["환불은 보통 며칠 걸려요?", "환불 며칠 걸리나요?", "환불까지 보통 얼마나 걸려요?"],
+    "배송비": ["배송비는 얼마예요?", "배송비 얼마인가요?"],
+    "배송 기간": ["배송은 며칠 걸리나요?", "배송 며칠 걸려요?"],
+    "고객센터": ["고객센터 운영 시간 알려주세요", "고객센터 운영시간이 어떻게 되나요?", "상담 운영 시간 알려주세요"],
+    "단순 변심": ["단순 변심도 반품 되나요?", "단순 변심으로도 반품 가능한가요?"],
+    "해외 배송": ["해외 배송도 되나요?", "해외배송 되나요?"],
+}
+# 캐시하면 안 되는 질문 (개인 주문/앞 대화 의존/정책 질문이 아님)
+OTHER_TRAFFIC = [
+    "제가 산 원피스 반품 기간 지났나요?",
+    "ORD-20240101-001 반품 기간 남았나요?",
+    "그럼 배송비는요?",
+    "여름에 입을 원피스 추천해 주세요",
+]
+
+QUESTION_TOPIC = {text: topic for topic, texts in FAQ_TRAFFIC.items() for text in texts}
+
+
+def reply_for(messages):
+    question = last_user_text(messages)
+    return f"'{question}' 문의 안내드립니다. K-Style 정책에 따라 처리됩니다."
+
+
+def make_traffic(requests, other_ratio, seed=0):
+    rng = random.Random(seed)
+    faq = [(topic, text) for topic, texts in FAQ_TRAFFIC.items() for text in texts]
+    return [(None, rng.choice(OTHER_TRAFFIC)) if rng.random() < other_ratio else rng.choice(faq)
+            for _ in range(requests)]
+
+
+async def ask(session_id, prompt):
+    started = time.perf_counter()
+    text = []
+    # 런타임 에이전트의 기본 콜백이 응답 텍스트를 stdout에 출력하므로 숨김
+    with contextlib.redirect_stdout(io.StringIO()):
+        async for frame in runtime.invoke({"prompt": prompt, "session_id": session_id}):
+            if isinstance(frame, dict) and isinstance(frame.get("data"), str):
+                text.append(frame["data"])
+    return (time.perf_counter() - started) * 1000, "".join(text)
+
+
+async def run_mode(enabled, traffic, first_token_ms):
+    model = StubBedrockModel(reply=reply_for, first_token_ms=first_token_ms)
+    runtime.get_model = lambda: model
+    runtime.answer_cache.enabled = enabled
+    runtime.answer_cache.clear()
+    runtime.answer_cache.stats.clear()
+
+    hit_latencies, miss_latencies, wrong = [], [], []
+    for i, (topic, prompt) in enumerate(traffic):
+        before = len(model.calls)
+        latency, answer = await ask(f"{'cache' if enabled else 'model'}-{i}", prompt)
+        if len(model.calls) == before:
+            hit_latencies.append(latency)
+            source = answer.split("'")[1]
+            if QUESTION_TOPIC.get(source) != topic:
+                wrong.append((prompt, source))
+        else:
+            miss_latencies.append(latency)
+    return hit_latencies, miss_latencies, wrong, len(model.calls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAQ 답변 캐시 벤치마크")
+    parser.add_argument("--requests", type=int, default=120, help="보낼 질문 수")
+    parser.add_argument("--first-token-ms", type=float, default=600.0, help="모델 호출당 첫 토큰 지연 (ms)")
+    parser.add_argument("--other-ratio", type=float, default=0.2, help="캐시하면 안 되는 질문의 비율")
+    parser.add_argument("--threshold", type=float, default=None, help="유사도 기준 (기본값: ANSWER_CACHE_THRESHOLD)")
+    args = parser.parse_args()
+    if args.threshold is not None:
+        runtime.answer_cache.threshold = args.threshold
+
+    traffic = make_traffic(args.requests, args.other_ratio)
+    print("📊 FAQ 답변 캐시 벤치마크")
+    print(f"질문 {args.requests}건 (캐시 대상 아님 {args.other_ratio:.0%}), 모델 호출당 {args.first_token_ms}ms, "
+          f"유사도 기준 {runtime.answer_cache.threshold}")
+    print("=" * 92)
+    for label, enabled in (("캐시 끔", False), ("캐시 켬", True)):
+        hits, misses, wrong, model_calls = asyncio.run(run_mode(enabled, traffic, args.first_token_ms))
+        latencies = hits + misses
+        print(f"{label}: 모델 호출 {model_calls}회 | 평균 {statistics.mean(latencies):7.1f}ms | "
+              f"p50 {statistics.median(latencies):7.1f}ms")
+        if enabled:
+            print(f"  적중 {len(hits)}건 (평균 {statistics.mean(hits) if hits else 0:.2f}ms) | "
+                  f"미적중 {len(misses)}건 (평균 {statistics.mean(misses):.1f}ms) | 오답 적중 {len(wrong)}건")
+            print(f"  지표: {runtime.answer_cache.metrics()}")
+            for prompt, source in wrong:
+                print(f"    ❌ '{prompt}' <- '{source}'의 답변")
+        print("-" * 92)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+런타임 콜드 스타트 벤치마크
+
+lab5_runtime_streaming을 새 프로세스에서 띄우고, 포트를 열 수 있는 시점(import 완료),
+healthy 보고 시점, 포트를 열자마자 보낸 첫 요청의 TTFT/전체 시간을 시작 방식별로 비교합니다.
+
+- 워밍업 없음: import 후 바로 서버 시작 (연결 수립 비용을 첫 요청이 부담)
+- 워밍업: import 후 워밍업을 마치고 서버 시작 (기본값)
+- 지연 시작: RUNTIME_LAZY_STARTUP=true, 서버를 먼저 띄우고 백그라운드에서 워밍업
+
+모델은 StubBedrockModel 대역이며, 첫 Bedrock 호출에서 TLS 연결/자격 증명 확인 비용
+(--connect-ms)을 한 번 치르도록 흉내 냅니다.
+
+실행:
+    python benchmarks/bench_cold_start.py --runs 3 --connect-ms 400
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+RUNTIME_DIR = os.path.join(ROOT, "notebooks", "lab-05-agentcore-observability")
+
+MODES = {
+    "워밍업 없음": {"RUNTIME_LAZY_STARTUP": "false", "warmup": "none"},
+    "워밍업": {"RUNTIME_LAZY_STARTUP": "false", "warmup": "sync"},
+    "지연 시작": {"RUNTIME_LAZY_STARTUP": "true", "warmup": "background"},
+}
+
+
+def run_child(warmup_mode: str, connect_ms: float, first_token_ms: float):
+    """자식 프로세스: 런타임 import → (워밍업) → 첫 요청, 각 시점을 JSON으로 출력"""
+    import asyncio
+
+    marks = {}
+    sys.path.insert(0, os.path.dirname(__file__))
+    sys.path.insert(0, RUNTIME_DIR)
+    module = __import__("lab5_runtime_streaming")
+    marks["imported"] = time.time()
+
+    from stub_model import StubBedrockModel
+
+    class _StubClient:
+        """첫 호출에서만 연결 비용을 치르는 bedrock-runtime 클라이언트 대역"""
+
+        def __init__(self):
+            self._lock = threading.Lock()
+            self.connected = False
+
+        def connect(self):
+            with self._lock:
+                if not self.connected:
+                    time.sleep(connect_ms / 1000)
+                    self.connected = True
+
+        def list_async_invokes(self, **kwargs):
+            self.connect()
+            return {"asyncInvokeSummaries": []}
+
+    class ConnectingStubModel(StubBedrockModel):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.client = _StubClient()
+
+        async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+            await asyncio.get_running_loop().run_in_executor(None, self.client.connect)
+            async for event in super().stream(messages, tool_specs, system_prompt, **kwargs):
+                yield event
+
+    stub = ConnectingStubModel(first_token_ms=first_token_ms, token_ms=5)
+    build_model = module.get_model
+
+    def get_model():
+        build_model()  # 실제 BedrockModel 생성 비용은 그대로 치름 (지연 시작이면 워밍업 때)
+        return stub
+
+    module.get_model = get_model
+
+    if warmup_mode == "sync":
+        module.warmup.run(module.create_agent)
+    elif warmup_mode == "background":
+        module.warmup.start(module.create_agent)
+    marks["listening"] = time.time()
+
+    def mark_healthy():
+        module.warmup.wait()
+        marks["healthy"] = time.time()
+
+    threading.Thread(target=mark_healthy).start()
+
+    async def first_request():
+        async for frame in module.invoke({"prompt": "반품 기간이 어떻게 되나요?", "session_id": "cold"}):
+            if "data" in frame and "first_frame" not in marks:
+                marks["first_frame"] = time.time()
+        marks["done"] = time.time()
+
+    asyncio.run(first_request())
+    module.warmup.wait()
+    print(json.dumps({"marks": marks, "profile": module.profiler.report(top=5)}, ensure_ascii=False))
+
+
+def spawn(label: str, args) -> dict:
+    env = dict(os.environ, RUNTIME_LAZY_STARTUP=MODES[label]["RUNTIME_LAZY_STARTUP"])
+    env.setdefault("AWS_REGION", "us-east-1")
+    started = time.time()
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", MODES[label]["warmup"],
+         "--connect-ms", str(args.connect_ms), "--first-token-ms", str(args.first_token_ms)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    # 에이전트 기본 콜백이 응답 텍스트를 stdout에 출력하므로 마지막 JSON만 읽음
+    result = json.loads(output[output.rindex('{"marks"'):])
+    result["ms"] = {name: (at - started) * 1000 for name, at in result["marks"].items()}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="런타임 콜드 스타트 벤치마크")
+    parser.add_argument("--runs", type=int, default=3, help="시작 방식별 프로세스 실행 횟수")
+    parser.add_argument("--connect-ms", type=float, default=400.0, help="첫 Bedrock 연결 수립 비용 (ms)")
+    parser.add_argument("--first-token-ms", type=float, default=300.0, help="모델 첫 토큰 지연 (ms)")
+    parser.add_argument("--child", choices=["none", "sync", "background"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.connect_ms, args.first_token_ms)
+        return
+
+    print("📊 런타임 콜드 스타트 벤치마크")
+    print(f"프로세스 {args.runs}회/방식, 연결 수립 {args.connect_ms}ms, 첫 토큰 {args.first_token_ms}ms "
+          f"(시간은 프로세스 생성 기준, 첫 요청은 포트를 연 직후 전송)")
+    print("=" * 96)
+
+    profile = None
+    for label in MODES:
+        results = [spawn(label, args) for _ in range(args.runs)]
+        ms = {name: statistics.mean(r["ms"][name] for r in results) for name in results[0]["ms"]}
+        print(f"{label:<8} 포트 오픈 {ms['listening']:6.0f}ms | healthy {ms['healthy']:6.0f}ms | "
+              f"첫 요청 TTFT {ms['first_frame'] - ms['listening']:5.0f}ms | "
+              f"첫 요청 전체 {ms['done'] - ms['listening']:5.0f}ms")
+        if MODES[label]["warmup"] == "sync":
+            profile = results[0]["profile"]
+
+    print("-" * 96)
+    print("import 상위:", profile["imports_ms"])
+    print("시작 단계:", profile["steps_ms"])
+
+
+if __name__ == "__main__":
+    main()
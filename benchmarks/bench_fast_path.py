@@ -0,0 +1,124 @@
+"""
+빠른 경로 벤치마크
+
+lab5_runtime_streaming의 invoke()로 자주 들어오는 문의 유형을 보내면서, 빠른 경로(fast_path)를
+켠 경우와 끈 경우의 응답 시간과 모델 호출 수를 비교합니다.
+
+- 모델은 StubBedrockModel 대역 (호출마다 --first-token-ms 지연). 주문번호와 "반품 가능"이 있으면
+  check_return_eligibility, "반품 신청"이면 process_return_request를 호출 (모델 왕복 2회)
+- 세션마다 문의 1건 + 후속 질문 1건("반품 신청할게요")을 보내, 후속 턴의 모델 호출에 첫 턴의
+  도구 결과가 대화 기록으로 들어가는지(맥락 유지)도 확인
+
+실행:
+    python benchmarks/bench_fast_path.py --sessions 30 --first-token-ms 300
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import re
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, "notebooks", "lab-05-agentcore-observability"))
+os.environ.setdefault("AWS_REGION", "us-east-1")
+
+import lab5_runtime_streaming as runtime  # noqa: E402
+from stub_model import StubBedrockModel, last_user_text  # noqa: E402
+
+# 자주 들어오는 문의 유형 ({n}은 주문 일련번호)
+TICKETS = [
+    ("반품 가능 여부 (주문번호만)", "ORD-2024010{n}-001 반품 가능해?"),
+    ("반품 가능 여부 (상품명 포함)", "ORD-2024010{n}-002 주문한 플라워 원피스 반품 가능한가요?"),
+    ("반품 가능 여부 (뷰티)", "ORD-2024010{n}-003 쿠션 파운데이션 반품 돼요?"),
+    ("반품 정책 문의", "반품 기간이 어떻게 되나요?"),
+    ("복합 요청", "ORD-2024010{n}-001 반품 가능하면 비슷한 원피스 추천도 해주세요"),
+]
+FOLLOW_UP = "그럼 반품 신청할게요. 사이즈가 안 맞아요"
+
+ORDER = re.compile(r"ORD-\d{8}-\d{3}")
+
+
+def _history_order(messages):
+    """대화 기록에서 가장 최근 주문번호"""
+    for message in reversed(messages):
+        for block in message["content"]:
+            found = ORDER.search(str(block))
+            if found:
+                return found.group()
+    return None
+
+
+def tool_for(messages):
+    text = last_user_text(messages)
+    order = ORDER.search(text)
+    if order and re.search(r"반품\s*(가능|돼)", text):
+        return {"name": "check_return_eligibility", "input": {"order_number": order.group(), "item_name": "상품"}}
+    if "반품 신청" in text and _history_order(messages):
+        return {"name": "process_return_request", "input": {"order_number": _history_order(messages),
+                                                            "reason": "사이즈 불만족"}}
+    return None
+
+
+async def ask(session_id, prompt):
+    started = time.perf_counter()
+    # 런타임 에이전트의 기본 콜백이 응답 텍스트를 stdout에 출력하므로 숨김
+    with contextlib.redirect_stdout(io.StringIO()):
+        async for frame in runtime.invoke({"prompt": prompt, "session_id": session_id}):
+            pass
+    return (time.perf_counter() - started) * 1000
+
+
+async def run_mode(enabled, sessions, first_token_ms):
+    model = StubBedrockModel(reply="네, 고객님. 확인해 드렸습니다.", first_token_ms=first_token_ms,
+                             tool_call=tool_for)
+    runtime.get_model = lambda: model
+    runtime.fast_path.enabled = enabled
+    runtime.fast_path.stats.clear()
+
+    latencies = {label: [] for label, _ in TICKETS}
+    model_calls = 0
+    context_kept = 0
+    follow_ups = 0
+    for i in range(sessions):
+        label, template = TICKETS[i % len(TICKETS)]
+        session_id = f"{'fast' if enabled else 'model'}-{i}"
+        before = len(model.calls)
+        latencies[label].append(await ask(session_id, template.format(n=i % 9 + 1)))
+        model_calls += len(model.calls) - before
+
+        if "ORD-" in template:
+            # 후속 턴: 첫 턴의 반품 자격 확인 결과가 모델에 전달되는지 확인
+            before = len(model.calls)
+            await ask(session_id, FOLLOW_UP)
+            follow_ups += 1
+            context_kept += any("반품 정책" in str(message) for message in model.calls[before])
+    return latencies, model_calls, context_kept, follow_ups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="빠른 경로 벤치마크")
+    parser.add_argument("--sessions", type=int, default=30, help="세션 수 (세션마다 문의 1건 + 후속 질문)")
+    parser.add_argument("--first-token-ms", type=float, default=300.0, help="모델 호출당 첫 토큰 지연 (ms)")
+    args = parser.parse_args()
+
+    print("📊 빠른 경로 벤치마크")
+    print(f"세션 {args.sessions}개, 모델 호출당 {args.first_token_ms}ms (첫 턴 응답 시간, 문의 유형별 평균)")
+    print("=" * 92)
+    for label, enabled in (("빠른 경로 끔", False), ("빠른 경로 켬", True)):
+        latencies, model_calls, kept, follow_ups = asyncio.run(run_mode(enabled, args.sessions, args.first_token_ms))
+        print(f"{label}: 첫 턴 모델 호출 {model_calls}회 | 후속 턴 맥락 유지 {kept}/{follow_ups} | "
+              f"빠른 경로 {dict(runtime.fast_path.stats)}")
+        for ticket, values in latencies.items():
+            if values:
+                print(f"  {ticket:<22} 평균 {statistics.mean(values):8.1f}ms | 최대 {max(values):8.1f}ms")
+        print("-" * 92)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+대화 기록 압축 벤치마크
+
+30턴짜리 반품/교환 상담 시나리오를 같은 에이전트로 진행하면서, 모델 호출마다
+실제로 전달된 대화 기록의 추정 토큰 수를 대화 관리 방식별로 비교합니다.
+
+- 전체 기록: NullConversationManager (기록을 줄이지 않음)
+- 슬라이딩 윈도우: SlidingWindowConversationManager(window_size=40)
+- 윈도우 + 도구 요약: HistoryCompactionManager()
+- + 대화 요약: HistoryCompactionManager(summary_token_threshold=...)
+
+Bedrock 대신 StubBedrockModel을 사용하며, 질문에 따라 반품 자격 확인/반품 신청/
+상품 추천 도구를 호출합니다. 대화 요약은 모델 대신 주문 관련 줄을 뽑는 대역을 사용합니다.
+
+실행:
+    python benchmarks/bench_history_compaction.py --turns 30 --summary-tokens 1500
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, "notebooks", "lab-05-agentcore-observability"))
+
+from strands import Agent
+from strands.agent.conversation_manager import NullConversationManager, SlidingWindowConversationManager
+
+from ecommerce_tools import (
+    ECOMMERCE_SYSTEM_PROMPT,
+    check_return_eligibility,
+    get_product_recommendations,
+    process_return_request,
+)
+from history_compaction import HistoryCompactionManager, estimate_tokens
+from stub_model import StubBedrockModel, last_user_text
+
+ITEMS = ["플라워 패턴 원피스", "와이드 데님 팬츠", "캐시미어 니트", "레더 크로스백", "쿠션 파운데이션"]
+CATEGORIES = ["원피스", "니트", "가방", "스킨케어", "신발"]
+
+
+def scripted_prompts(turns: int):
+    """주문 5건에 대해 자격 확인 → 반품 신청 → 추천 → 일반 문의를 반복하는 상담 시나리오"""
+    prompts = []
+    for i in range(turns):
+        order = f"ORD-2024010{i % 5 + 1}-00{i % 3 + 1}"
+        item = ITEMS[i % len(ITEMS)]
+        step = i % 4
+        if step == 0:
+            prompts.append(f"{order} 주문한 {item} 반품 가능한가요?")
+        elif step == 1:
+            prompts.append(f"{order} {item} 사이즈가 안 맞아서 반품 신청할게요")
+        elif step == 2:
+            prompts.append(f"대신 {CATEGORIES[i % len(CATEGORIES)]} 추천해 주세요")
+        else:
+            prompts.append(f"{order} 환불은 언제 들어오나요? 배송비는 누가 부담하나요?")
+    return prompts
+
+
+def tool_for(messages):
+    """마지막 질문에 맞는 도구 호출 (일반 문의는 도구 없이 답변)"""
+    text = last_user_text(messages)
+    order = re.search(r"ORD-\d{8}-\d{3}", text)
+    if "반품 가능" in text:
+        item = next((name for name in ITEMS if name in text), "상품")
+        return {"name": "check_return_eligibility", "input": {"order_number": order.group(), "item_name": item}}
+    if "반품 신청" in text:
+        return {"name": "process_return_request", "input": {"order_number": order.group(), "reason": "사이즈 불만족"}}
+    if "추천" in text:
+        category = next((name for name in CATEGORIES if name in text), "원피스")
+        return {"name": "get_product_recommendations", "input": {"category": category}}
+    return None
+
+
+def reply_for(messages):
+    return (f"네, 고객님. '{last_user_text(messages)[:40]}' 문의 확인했습니다. "
+            "반품은 수령 후 14일 이내 가능하며, 단순 변심은 왕복 배송비 6,000원이 차감됩니다. "
+            "환불은 상품 회수 후 3-5 영업일 내 결제 수단으로 진행됩니다. 더 도와드릴 일이 있으실까요?")
+
+
+def order_lines_summarizer(text: str) -> str:
+    """요약 모델 대역: 주문번호가 들어간 줄을 중복 없이 최대 600자까지 모음"""
+    lines, seen = [], set()
+    for line in text.splitlines():
+        if "ORD-" in line and line not in seen:
+            seen.add(line)
+            lines.append(line[:160])
+    return "\n".join(lines)[-600:]
+
+
+def run_session(manager, prompts):
+    model = StubBedrockModel(reply=reply_for, first_token_ms=0, tool_call=tool_for)
+    agent = Agent(
+        model=model,
+        tools=[check_return_eligibility, process_return_request, get_product_recommendations],
+        system_prompt=ECOMMERCE_SYSTEM_PROMPT,
+        conversation_manager=manager,
+        callback_handler=None,
+    )
+    per_turn = []
+    for prompt in prompts:
+        start = len(model.calls)
+        agent(prompt)
+        # 턴 안의 모든 모델 호출에 전달된 대화 기록 토큰 합
+        per_turn.append(sum(estimate_tokens(messages) for messages in model.calls[start:]))
+    return per_turn, len(agent.messages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대화 기록 압축 벤치마크")
+    parser.add_argument("--turns", type=int, default=30, help="상담 턴 수")
+    parser.add_argument("--window", type=int, default=40, help="윈도우 크기 (메시지 수)")
+    parser.add_argument("--summary-tokens", type=int, default=1500, help="대화 요약을 시작할 추정 토큰 수")
+    args = parser.parse_args()
+
+    prompts = scripted_prompts(args.turns)
+    modes = [
+        ("전체 기록", lambda: NullConversationManager()),
+        ("슬라이딩 윈도우", lambda: SlidingWindowConversationManager(window_size=args.window)),
+        ("윈도우 + 도구 요약", lambda: HistoryCompactionManager(window_size=args.window)),
+        ("+ 대화 요약", lambda: HistoryCompactionManager(
+            window_size=args.window,
+            summary_token_threshold=args.summary_tokens,
+            summarizer=order_lines_summarizer,
+        )),
+    ]
+
+    print("📊 대화 기록 압축 벤치마크")
+    print(f"{args.turns}턴 상담 시나리오, 턴당 모델 호출에 전달된 대화 기록의 추정 토큰 "
+          f"(시스템 프롬프트/도구 스펙 제외)")
+    print("=" * 92)
+    checkpoints = [t for t in (10, 20, 30) if t <= args.turns]
+    baseline = None
+    for label, factory in modes:
+        manager = factory()
+        per_turn, kept = run_session(manager, prompts)
+        total = sum(per_turn)
+        baseline = baseline or total
+        at = " | ".join(f"{t}턴 {per_turn[t - 1]:6,d}" for t in checkpoints)
+        print(f"{label:<14} {at} | 평균 {statistics.mean(per_turn):6,.0f} | 합계 {total:8,d} "
+              f"({total / baseline:5.0%}) | 남은 메시지 {kept}")
+        if isinstance(manager, HistoryCompactionManager):
+            print(f"{'':<14} {manager.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+상담 기록 대량 적재기 벤치마크 (LocalMemoryClient)
+
+합성 트랜스크립트(JSONL)를 로컬 대역에 적재하면서 처리량과 스로틀링 대응을 측정하고,
+특정 세션의 create_event가 계속 실패할 때 체크포인트가 실패한 줄 앞에서 멈추는지,
+재개하면 실패했던 줄이 다시 적재되는지 확인합니다.
+
+실행:
+    python benchmarks/bench_memory_bulk_loader.py --sessions 200 --turns 12 --latency-ms 20
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from botocore.exceptions import ClientError
+
+from src.helpers.local_memory_client import LocalMemoryClient
+from src.helpers.memory_bulk_loader import BulkMemoryLoader, _create_local_memory
+
+TURNS = [
+    ("USER", "지난주에 산 원피스 사이즈가 작아요"),
+    ("ASSISTANT", "L 사이즈로 교환 도와드릴게요"),
+    ("USER", "립스틱 색상이 사진과 달라요"),
+    ("ASSISTANT", "색상 차이로 인한 교환은 무료입니다"),
+]
+
+
+class FlakyLocalMemoryClient(LocalMemoryClient):
+    """일정 비율로 스로틀링을 돌려주고, failing_sessions의 쓰기는 항상 거부하는 로컬 대역"""
+
+    def __init__(self, throttle_ratio: float = 0.0, failing_sessions=(), seed: int = 7, **kwargs):
+        super().__init__(**kwargs)
+        self.throttle_ratio = throttle_ratio
+        self.failing_sessions = set(failing_sessions)
+        self._flaky_random = random.Random(seed)
+        self._flaky_lock = threading.Lock()
+
+    def create_event(self, memory_id, actor_id, session_id, messages, **kwargs):
+        if session_id in self.failing_sessions:
+            raise ClientError({"Error": {"Code": "ValidationException", "Message": "rejected"}}, "CreateEvent")
+        with self._flaky_lock:
+            throttled = self._flaky_random.random() < self.throttle_ratio
+        if throttled:
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "CreateEvent")
+        return super().create_event(memory_id, actor_id, session_id, messages, **kwargs)
+
+
+def write_transcripts(path: str, sessions: int, turns: int, seed: int = 7) -> int:
+    """세션이 섞여 있는 합성 트랜스크립트를 쓰고 줄 수를 반환합니다."""
+    rng = random.Random(seed)
+    remaining = {f"s-{i:04d}": turns for i in range(sessions)}
+    lines = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while remaining:
+            session_id = rng.choice(list(remaining))
+            turn = turns - remaining[session_id]
+            role, text = TURNS[turn % len(TURNS)]
+            f.write(json.dumps({
+                "actor_id": f"customer_{session_id[2:]}",
+                "session_id": session_id,
+                "role": role,
+                "text": f"{text} ({turn + 1})",
+            }, ensure_ascii=False) + "\n")
+            lines += 1
+            remaining[session_id] -= 1
+            if not remaining[session_id]:
+                del remaining[session_id]
+    return lines
+
+
+def first_line_of(path: str, session_id: str) -> int:
+    with open(path, encoding="utf-8") as f:
+        return next(no for no, line in enumerate(f, start=1) if json.loads(line)["session_id"] == session_id)
+
+
+def run(client, memory_id, path, checkpoint, args):
+    loader = BulkMemoryLoader(
+        client,
+        memory_id,
+        concurrency=args.concurrency,
+        chunk_size=args.chunk_size,
+        initial_rate=args.initial_rate,
+        max_rate=args.max_rate,
+        checkpoint_path=checkpoint,
+        report_interval=0,
+    )
+    return loader.load(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상담 기록 대량 적재기 벤치마크")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="로컬 대역의 create_event 지연")
+    parser.add_argument("--throttle-ratio", type=float, default=0.05, help="스로틀링 응답 비율")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=4)
+    parser.add_argument("--initial-rate", type=float, default=50.0)
+    parser.add_argument("--max-rate", type=float, default=400.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bulk-loader-")
+    path = os.path.join(workdir, "transcripts.jsonl")
+    checkpoint = os.path.join(workdir, "load.ckpt")
+    lines = write_transcripts(path, args.sessions, args.turns)
+    failing = f"s-{args.sessions // 2:04d}"
+    failing_first = first_line_of(path, failing)
+
+    client = FlakyLocalMemoryClient(
+        throttle_ratio=args.throttle_ratio,
+        failing_sessions={failing},
+        latency_ms={"create_event": args.latency_ms},
+        autosave=False,
+    )
+    memory_id = _create_local_memory(client)
+
+    print("📊 상담 기록 대량 적재기 벤치마크 (LocalMemoryClient)")
+    print(f"세션 {args.sessions}개 × {args.turns}턴 = {lines}줄, create_event 지연 {args.latency_ms}ms, "
+          f"스로틀링 {args.throttle_ratio:.0%}")
+    print("=" * 70)
+
+    stats = run(client, memory_id, path, checkpoint, args)
+    print(f"1차 적재: {stats['events_written']} events ({stats['events_per_second']}/s) | "
+          f"오류 {stats['errors']} | 스로틀 {stats['throttles']} | 최종 속도 {stats['rate']}/s")
+    print(f"  실패 세션 {failing}의 첫 줄 {failing_first} → 체크포인트 {stats['checkpoint_line']}, "
+          f"failed_lines {stats['failed_lines']}")
+    ok = stats["checkpoint_line"] == failing_first - 1
+    print(f"  {'✅' if ok else '❌'} 체크포인트가 실패한 줄 앞에서 멈춤")
+
+    client.failing_sessions.clear()
+    written_before = client.call_counts["create_event"]
+    stats = run(client, memory_id, path, checkpoint, args)
+    print(f"2차 적재 (재개): {stats['events_written']} events | 오류 {stats['errors']} | "
+          f"체크포인트 {stats['checkpoint_line']}/{lines}")
+    events = client.list_events(memory_id, f"customer_{failing[2:]}", failing)
+    ok = stats["checkpoint_line"] == lines and len(events) > 0
+    print(f"  {'✅' if ok else '❌'} 실패했던 세션 이벤트 {len(events)}개 적재, "
+          f"재개 시 create_event 호출 {client.call_counts['create_event'] - written_before}회")
+
+
+if __name__ == "__main__":
+    main()
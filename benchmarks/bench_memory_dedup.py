@@ -0,0 +1,105 @@
+"""
+MinHash 근사 중복 제거 벤치마크
+
+고객이 같은 질문을 표현만 바꿔 반복하는 합성 상담 코퍼스(질문 + 응답)를 만들고,
+메시지당 서명 계산 비용과 임계값별 저장 이벤트 감소율을 측정합니다.
+
+실행:
+    python benchmarks/bench_memory_dedup.py --customers 200 --turns 30
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.helpers.memory_dedup import MinHashSignatureStore
+
+BASE_QUESTIONS = [
+    "사이즈 교환 되나요?",
+    "원피스 반품하고 싶어요",
+    "립스틱 색상이 사진과 달라요",
+    "배송은 언제 도착하나요?",
+    "쿠션 파운데이션 건성 피부에 맞나요?",
+    "니트 세탁은 어떻게 하나요?",
+    "반품 배송비는 누가 부담하나요?",
+    "청바지 허리 사이즈가 커요",
+    "교환 신청한 상품이 아직 안 왔어요",
+    "베이지 가방에 어울리는 코디 추천해 주세요",
+]
+
+VARIATIONS = [
+    lambda q: q,
+    lambda q: q.replace("?", "??"),
+    lambda q: q.replace(" ", ""),
+    lambda q: q + " 빨리 답변 부탁드려요",
+    lambda q: "저기요 " + q,
+    lambda q: q.replace("요", "요!"),
+    lambda q: "혹시 " + q,
+]
+
+UNIQUE_DETAILS = ["주문번호 KS-2024-00{:04d} 건이에요", "지난주 {}일에 받았어요", "{}번째 문의입니다"]
+
+
+def answer_for(question: str) -> str:
+    """질문 유형별 상담 응답 (같은 유형이면 같은 안내)"""
+    base = next(q for q in BASE_QUESTIONS if q.replace(" ", "")[:6] in question.replace(" ", ""))
+    return f"문의하신 '{base}' 건은 주문 내역 확인 후 안내드리겠습니다. 마이페이지에서 진행 상황을 확인하실 수 있어요."
+
+
+def build_corpus(customers: int, turns: int, repeat_ratio: float, seed: int = 7):
+    """고객별로 이전 질문을 변형해 반복하는 합성 트랜스크립트 (고객, 질문, 응답)를 만듭니다."""
+    rng = random.Random(seed)
+    corpus = []
+    for c in range(customers):
+        asked = []
+        for t in range(turns):
+            if asked and rng.random() < repeat_ratio:
+                question = rng.choice(VARIATIONS)(rng.choice(asked))
+            else:
+                question = rng.choice(BASE_QUESTIONS) + " " + rng.choice(UNIQUE_DETAILS).format(rng.randint(1, 9999))
+                asked.append(question)
+            corpus.append((f"customer_{c:04d}", question, answer_for(question)))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MinHash 근사 중복 제거 벤치마크")
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--repeat-ratio", type=float, default=0.4, help="이전 질문을 반복할 확률")
+    parser.add_argument("--num-perm", type=int, default=64)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.customers, args.turns, args.repeat_ratio)
+
+    print("📊 MinHash 근사 중복 제거 벤치마크")
+    print(f"고객 {args.customers}명 × {args.turns}턴 = 상호작용 {len(corpus)}개, 반복 확률 {args.repeat_ratio}")
+    print("=" * 70)
+
+    store = MinHashSignatureStore(num_perm=args.num_perm)
+    timings = []
+    for _, text, _ in corpus[:2000]:
+        started = time.perf_counter()
+        store.hasher.signature(text)
+        timings.append((time.perf_counter() - started) * 1e6)
+    print(f"서명 계산 (num_perm={args.num_perm}): 평균 {statistics.mean(timings):.1f}µs | "
+          f"p50 {statistics.median(timings):.1f}µs | 최대 {max(timings):.1f}µs")
+    print("-" * 70)
+
+    for threshold in (0.5, 0.6, 0.7, 0.8, 0.9):
+        store = MinHashSignatureStore(threshold=threshold, num_perm=args.num_perm)
+        started = time.perf_counter()
+        stored = sum(1 for actor, question, answer in corpus
+                     if store.check_and_add(actor, question, answer) is None)
+        elapsed_us = (time.perf_counter() - started) * 1e6 / len(corpus)
+        print(f"임계값 {threshold:.1f}: 저장 이벤트 {stored:6d}/{len(corpus)} "
+              f"(감소율 {1 - stored / len(corpus):6.1%}) | 메시지당 확인 {elapsed_us:7.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
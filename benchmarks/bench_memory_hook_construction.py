@@ -0,0 +1,76 @@
+"""
+메모리 훅 생성 비용 벤치마크
+
+Streamlit 앱은 메시지마다 EcommerceCustomerMemoryHooks를 새로 만듭니다.
+get_memory_strategies 컨트롤 플레인 호출을 흉내 내는 지연을 넣고,
+메타데이터 캐시가 없을 때(매번 원격 호출)와 있을 때의 생성 시간을 비교합니다.
+
+실행:
+    python benchmarks/bench_memory_hook_construction.py --latency-ms 80 --iterations 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.helpers.ecommerce_memory import (
+    EcommerceCustomerMemoryHooks,
+    invalidate_memory_metadata,
+)
+
+
+class SlowStrategyClient:
+    """get_memory_strategies에 고정 지연을 넣은 MemoryClient 대역"""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.strategy_calls = 0
+
+    def get_memory_strategies(self, memory_id):
+        self.strategy_calls += 1
+        time.sleep(self.latency)
+        return [
+            {"type": "USER_PREFERENCE", "namespaces": ["ecommerce/customer/{actorId}/preferences"]},
+            {"type": "SEMANTIC", "namespaces": ["ecommerce/customer/{actorId}/history"]},
+        ]
+
+
+def measure(client, iterations: int, use_cache: bool) -> list:
+    timings = []
+    invalidate_memory_metadata()
+    for i in range(iterations):
+        if not use_cache:
+            invalidate_memory_metadata()
+        started = time.perf_counter()
+        EcommerceCustomerMemoryHooks(
+            "bench-memory", client, "customer_bench_001", f"session-{i}", write_behind=False
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메모리 훅 생성 시간 벤치마크")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="get_memory_strategies 지연 (ms)")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    print("📊 메모리 훅 생성 시간 벤치마크")
+    print("=" * 60)
+
+    for label, use_cache in [("캐시 없음 (기존)", False), ("메타데이터 캐시", True)]:
+        client = SlowStrategyClient(args.latency_ms)
+        timings = measure(client, args.iterations, use_cache)
+        print(f"{label:<20} "
+              f"평균 {statistics.mean(timings):8.3f}ms | "
+              f"p50 {statistics.median(timings):8.3f}ms | "
+              f"최대 {max(timings):8.3f}ms | "
+              f"원격 호출 {client.strategy_calls}회")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+로컬 MemoryClient 대역으로 메모리 훅 오버헤드를 측정하는 벤치마크
+
+AgentCore Memory 없이 LocalMemoryClient에 인공 지연을 넣고,
+여러 세션이 동시에 대화할 때 턴당 맥락 검색/저장 시간을 측정합니다.
+
+실행:
+    python benchmarks/bench_memory_hooks_local.py --sessions 8 --turns 10 --latency-ms 120
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.helpers.ecommerce_memory import (
+    EcommerceCustomerMemoryHooks,
+    MemoryRetrievalCache,
+    flush_memory_writes,
+    seed_ecommerce_customer_data,
+)
+from src.helpers.local_memory_client import LocalMemoryClient
+
+CONVERSATION = [
+    "지난주에 산 원피스 사이즈가 작아요. 교환 가능한가요?",
+    "네 알겠습니다",
+    "원피스를 L 사이즈로 교환하고 싶어요",
+    "립스틱 색상이 사진이랑 달라요",
+    "립스틱 색상이 사진과 많이 달라요. 반품할게요",
+    "감사합니다",
+    "건성 피부에 맞는 쿠션 파운데이션 추천해 주세요",
+    "베이지 가방이랑 어울리는 코디 알려주세요",
+    "반품 배송비는 누가 부담하나요?",
+    "좋아요",
+]
+
+
+class _Event:
+    def __init__(self, agent):
+        self.agent = agent
+
+
+class _Agent:
+    def __init__(self):
+        self.messages = []
+
+
+def run_session(client, memory_id, session_index, turns, use_cache):
+    """한 세션의 대화를 재생하며 턴별 훅 처리 시간을 측정합니다."""
+    cache = MemoryRetrievalCache() if use_cache else None
+    hooks = EcommerceCustomerMemoryHooks(
+        memory_id, client, f"customer_{session_index:03d}", f"session-{session_index}",
+        retrieval_cache=cache,
+    )
+    agent = _Agent()
+    timings = []
+    for turn in range(turns):
+        query = CONVERSATION[turn % len(CONVERSATION)]
+        agent.messages.append({"role": "user", "content": [{"text": query}]})
+
+        started = time.perf_counter()
+        hooks.retrieve_customer_context(_Event(agent))
+        agent.messages.append({"role": "assistant", "content": [{"text": "확인해 드리겠습니다."}]})
+        hooks.save_ecommerce_interaction(_Event(agent))
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 메모리 훅 오버헤드 벤치마크")
+    parser.add_argument("--sessions", type=int, default=8, help="동시 세션 수")
+    parser.add_argument("--turns", type=int, default=10, help="세션당 턴 수")
+    parser.add_argument("--latency-ms", type=float, default=120.0, help="원격 호출 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=40.0, help="지연 지터 (ms)")
+    parser.add_argument("--persist", default=None, help="로컬 메모리 상태 저장 파일")
+    args = parser.parse_args()
+
+    client = LocalMemoryClient(
+        persist_path=args.persist,
+        latency_ms={
+            "retrieve_memories": args.latency_ms,
+            "create_event": args.latency_ms,
+            "get_memory_strategies": args.latency_ms,
+        },
+        latency_jitter_ms=args.jitter_ms,
+        seed=42,
+    )
+    memory = client.create_memory_and_wait(
+        name="EcommerceCustomerMemory",
+        strategies=[
+            {"userPreferenceMemoryStrategy": {
+                "name": "EcommerceCustomerPreferences",
+                "namespaces": ["ecommerce/customer/{actorId}/preferences"],
+            }},
+            {"semanticMemoryStrategy": {
+                "name": "EcommerceCustomerHistory",
+                "namespaces": ["ecommerce/customer/{actorId}/history"],
+            }},
+        ],
+    )
+    for i in range(args.sessions):
+        seed_ecommerce_customer_data(client, memory["id"], f"customer_{i:03d}")
+
+    print("📊 로컬 메모리 훅 오버헤드 벤치마크")
+    print(f"세션 {args.sessions}개 × {args.turns}턴, 원격 지연 {args.latency_ms}ms ± {args.jitter_ms}ms")
+    print("=" * 70)
+
+    for label, use_cache in [("검색 캐시 없음", False), ("세션 검색 캐시", True)]:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+            results = list(pool.map(
+                lambda i: run_session(client, memory["id"], i, args.turns, use_cache),
+                range(args.sessions),
+            ))
+        flush_memory_writes()
+        elapsed = time.perf_counter() - started
+
+        timings = sorted(t for session in results for t in session)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f"{label:<16} 턴당 평균 {statistics.mean(timings):7.1f}ms | "
+              f"p50 {statistics.median(timings):7.1f}ms | p95 {p95:7.1f}ms | "
+              f"전체 {elapsed:5.2f}초")
+
+    print(f"원격 호출 수: {dict(client.call_counts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+모델 응답 캐시(record/replay) 벤치마크
+
+messages_injection처럼 고정된 대화 기록으로 만든 회귀 시나리오를 같은 에이전트 구성으로 여러 번
+실행하면서, 캐시 없이 / record(첫 실행) / replay fast / replay original의 총 실행 시간,
+실제 모델 호출 수(= Bedrock이었다면 네트워크 호출 수), 응답 일치 여부를 비교합니다.
+마지막으로 deterministic 모드에서 temperature=0.3 호출은 캐시하지 않고 0인 호출만 재생하는지 확인합니다.
+
+- 모델은 StubBedrockModel 대역 (호출마다 --first-token-ms, 델타마다 --token-ms 지연)
+- 주문번호가 있는 시나리오는 check_return_eligibility 도구를 한 번 호출 (모델 호출 2회)
+
+실행:
+    python benchmarks/bench_model_cache.py --scenarios 12 --first-token-ms 400 --token-ms 15
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, "notebooks", "lab-05-agentcore-observability"))
+
+from strands import Agent
+
+import ecommerce_tools
+from model_cache import DETERMINISTIC, ORIGINAL, RECORD, REPLAY, FAST, CachingModel, SqliteResponseStore
+from stub_model import StubBedrockModel, last_user_text
+
+ORDER = re.compile(r"ORD-\d{8}-\d{3}")
+
+# 이전 턴을 고정된 대화 기록으로 주입한 회귀 시나리오 ({n}은 주문 일련번호)
+FAKE_HISTORY = [
+    {"role": "user", "content": [{"text": "안녕하세요, 주문한 상품 문의드려요"}]},
+    {"role": "assistant", "content": [{"text": "안녕하세요, 고객님. 주문번호를 알려주시면 확인해 드리겠습니다."}]},
+]
+PROMPTS = [
+    "ORD-2024010{n}-001 플라워 원피스 반품 가능한가요?",
+    "반품 기간이 어떻게 되나요? ({n})",
+    "ORD-2024010{n}-002 니트 사이즈가 안 맞는데 반품 될까요?",
+]
+
+
+def reply_for(messages):
+    return f"네, 고객님. '{last_user_text(messages)[:20]}' 문의 확인해 드렸습니다. 다른 도움이 필요하시면 말씀해 주세요."
+
+
+def tool_for(messages):
+    order = ORDER.search(last_user_text(messages))
+    if order is None:
+        return None
+    return {"name": "check_return_eligibility", "input": {"order_number": order.group(), "item_name": "상품"}}
+
+
+def make_model(args, temperature=None):
+    model = StubBedrockModel(reply=reply_for, first_token_ms=args.first_token_ms, token_ms=args.token_ms,
+                             tool_call=tool_for)
+    if temperature is not None:
+        model.update_config(temperature=temperature)
+    return model
+
+
+def run_suite(model, scenarios):
+    """시나리오마다 새 에이전트(고정 대화 기록 + 질문 1건) 실행 -> (총 시간 ms, 응답 목록)"""
+    replies = []
+    started = time.perf_counter()
+    for i in range(scenarios):
+        agent = Agent(
+            model=model,
+            tools=[ecommerce_tools.check_return_eligibility],
+            system_prompt=ecommerce_tools.ECOMMERCE_SYSTEM_PROMPT,
+            messages=[dict(message) for message in FAKE_HISTORY],
+            callback_handler=None,
+        )
+        replies.append(str(agent(PROMPTS[i % len(PROMPTS)].format(n=i % 9 + 1))))
+    return (time.perf_counter() - started) * 1000, replies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모델 응답 캐시 벤치마크")
+    parser.add_argument("--scenarios", type=int, default=12, help="회귀 시나리오 수")
+    parser.add_argument("--first-token-ms", type=float, default=400.0, help="모델 호출당 첫 토큰 지연 (ms)")
+    parser.add_argument("--token-ms", type=float, default=15.0, help="델타 사이 지연 (ms)")
+    args = parser.parse_args()
+
+    print("📊 모델 응답 캐시 벤치마크")
+    print(f"시나리오 {args.scenarios}개, 모델 호출당 첫 토큰 {args.first_token_ms}ms + 델타당 {args.token_ms}ms")
+    print("=" * 88)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqliteResponseStore(os.path.join(tmp, "model_cache.sqlite3"))
+
+        baseline = make_model(args)
+        elapsed, expected = run_suite(baseline, args.scenarios)
+        print(f"{'캐시 없음':<18} {elapsed:9.1f}ms | 모델 호출 {len(baseline.calls):3d}회")
+
+        runs = [("record (첫 실행)", RECORD, FAST), ("replay fast", REPLAY, FAST),
+                ("replay original", REPLAY, ORIGINAL)]
+        for label, mode, speed in runs:
+            stub = make_model(args)
+            model = CachingModel(stub, store=store, mode=mode, replay_speed=speed)
+            elapsed, replies = run_suite(model, args.scenarios)
+            same = sum(reply == want for reply, want in zip(replies, expected))
+            print(f"{label:<18} {elapsed:9.1f}ms | 모델 호출 {len(stub.calls):3d}회 | "
+                  f"응답 일치 {same}/{len(expected)} | {dict(model.stats)}")
+        print(f"저장된 응답: {len(store)}건")
+        print("-" * 88)
+
+        for temperature in (0.3, 0.0):
+            for attempt in ("1회차", "2회차"):
+                stub = make_model(args, temperature=temperature)
+                model = CachingModel(stub, store=store, mode=DETERMINISTIC)
+                elapsed, _ = run_suite(model, args.scenarios)
+                print(f"deterministic temperature={temperature} {attempt}: {elapsed:9.1f}ms | "
+                      f"모델 호출 {len(stub.calls):3d}회 | {dict(model.stats)}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+프롬프트 캐시 벤치마크
+
+src/agent.py의 시스템 프롬프트와 도구로 여러 세션(세션마다 새 에이전트)을 진행하면서
+캐시 없음 / 캐시(세션마다 도구 순서가 다름) / 캐시 + 고정 순서(stable_tools)의
+TTFT와 턴별 캐시 읽기/쓰기 토큰(track_turn_usage)을 비교합니다.
+
+모델은 Bedrock 프롬프트 캐시를 흉내 내는 대역입니다.
+- 요청 본문은 실제 BedrockModel.format_request()로 만들어 캐시 체크포인트 위치를 그대로 사용
+- 캐시 읽기/쓰기는 stub_model.PromptCacheSimulator로 계산 (prefix가 --min-cache-tokens 이상일 때만)
+- TTFT = 기본 지연 + 캐시되지 않은 토큰 × prefill 비용 + 캐시 읽기 토큰 × 캐시 비용
+- metadata.usage에 Bedrock과 같은 cacheReadInputTokens/cacheWriteInputTokens 필드를 보고
+
+토큰 수는 글자 수 / 2.5로 추정합니다.
+
+실행:
+    python benchmarks/bench_prompt_cache.py --sessions 5 --turns 6
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("AWS_REGION", "us-east-1")
+
+from strands import Agent
+from strands.models import BedrockModel
+
+from src.agent import MODEL_ID, SYSTEM_PROMPT, process_exchange, process_return, web_search
+from src.helpers.prompt_cache import cache_model_config, stable_tools, track_turn_usage
+from stub_model import PromptCacheSimulator, StubBedrockModel, last_user_text
+
+PROMPTS = [
+    "KS-2024-00{n} 주문한 원피스 사이즈가 작아요. 반품하고 싶어요",
+    "반품 배송비는 얼마인가요?",
+    "그럼 M 사이즈로 교환할 수 있나요?",
+    "교환 상품은 언제 받을 수 있나요?",
+    "이 원피스에 어울리는 신발 추천해 주세요",
+    "감사합니다. 반품 접수 내역 다시 알려주세요",
+]
+
+
+def _tokens(chars: int) -> int:
+    return int(chars / 2.5)
+
+
+class CachingStubModel(StubBedrockModel):
+    """Bedrock 프롬프트 캐시 동작을 흉내 내는 모델 대역"""
+
+    def __init__(self, cache_kwargs, min_cache_tokens, base_ms, prefill_ms_per_token, cached_ms_per_token, **kwargs):
+        super().__init__(**kwargs)
+        self.formatter = BedrockModel(model_id=MODEL_ID, **cache_kwargs)
+        self.simulator = PromptCacheSimulator(min_cache_tokens)
+        self.base_ms = base_ms
+        self.prefill_ms_per_token = prefill_ms_per_token
+        self.cached_ms_per_token = cached_ms_per_token
+        self.ttft_ms = []
+
+    def prefix_tokens(self, tool_specs, system_prompt) -> int:
+        """시스템 프롬프트 + 도구 정의 prefix의 추정 토큰 수"""
+        request = self.formatter.format_request([], tool_specs, system_prompt_content=[{"text": system_prompt}])
+        return self.simulator.prefixes(request)[1]
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        request = self.formatter.format_request(
+            messages, tool_specs, system_prompt_content=kwargs.get("system_prompt_content") or [{"text": system_prompt}]
+        )
+        read, written, total = self.simulator.usage(request)
+        uncached = total - read
+
+        ttft = self.base_ms + uncached * self.prefill_ms_per_token + read * self.cached_ms_per_token
+        self.ttft_ms.append(ttft)
+        await asyncio.sleep(ttft / 1000)
+
+        text = (f"네, 고객님. '{last_user_text(messages)[:30]}' 문의 확인했습니다. "
+                "K-Style은 수령 후 14일 이내 반품/교환이 가능하며, 사이즈 교환은 왕복 배송비 무료입니다. "
+                "단순 변심 반품은 왕복 배송비 6,000원이 환불 금액에서 차감되고, 상품 회수 후 3-5 영업일 내 "
+                "결제 수단으로 환불됩니다. 접수 내역은 마이페이지 > 주문/배송 조회에서 확인하실 수 있습니다. "
+                "더 도와드릴 일이 있으시면 말씀해 주세요! 😊")
+        yield {"messageStart": {"role": "assistant"}}
+        yield {"contentBlockDelta": {"delta": {"text": text}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+        yield {"metadata": {
+            "usage": {"inputTokens": uncached - written, "outputTokens": _tokens(len(text)),
+                      "totalTokens": total + _tokens(len(text)),
+                      "cacheReadInputTokens": read, "cacheWriteInputTokens": written},
+            "metrics": {"latencyMs": int(ttft)},
+        }}
+
+
+def run_mode(model, sessions, turns, shuffle_tools, seed=7):
+    rng = random.Random(seed)
+    usages = []
+    for n in range(sessions):
+        tools = [process_return, process_exchange, web_search]
+        if shuffle_tools:
+            rng.shuffle(tools)
+        else:
+            tools = stable_tools(tools)
+        agent = Agent(model=model, tools=tools, system_prompt=SYSTEM_PROMPT, callback_handler=None)
+        for turn in range(turns):
+            with track_turn_usage(agent) as usage:
+                agent(PROMPTS[turn % len(PROMPTS)].format(n=n + 1))
+            usages.append(usage)
+    return usages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프롬프트 캐시 벤치마크")
+    parser.add_argument("--sessions", type=int, default=5, help="세션 수 (세션마다 새 에이전트)")
+    parser.add_argument("--turns", type=int, default=6, help="세션당 턴 수")
+    parser.add_argument("--min-cache-tokens", type=int, default=1024, help="캐시 가능한 최소 prefix 토큰 수")
+    parser.add_argument("--base-ms", type=float, default=150.0, help="토큰 수와 무관한 기본 지연 (ms)")
+    parser.add_argument("--prefill-ms", type=float, default=0.25, help="캐시되지 않은 입력 토큰당 지연 (ms)")
+    parser.add_argument("--cached-ms", type=float, default=0.025, help="캐시에서 읽은 토큰당 지연 (ms)")
+    args = parser.parse_args()
+
+    modes = [
+        ("캐시 없음", False, False),
+        ("캐시 (도구 순서 섞임)", True, True),
+        ("캐시 + 고정 순서", True, False),
+    ]
+
+    print("📊 프롬프트 캐시 벤치마크")
+    print(f"세션 {args.sessions}개 × {args.turns}턴, 최소 캐시 prefix {args.min_cache_tokens}토큰, "
+          f"prefill {args.prefill_ms}ms/토큰, 캐시 읽기 {args.cached_ms}ms/토큰")
+    prefix = CachingStubModel(cache_model_config(), 0, 0, 0, 0).prefix_tokens(
+        Agent(tools=stable_tools([process_return, process_exchange, web_search]),
+              callback_handler=None).tool_registry.get_all_tool_specs(),
+        SYSTEM_PROMPT,
+    )
+    print(f"시스템 프롬프트 + 도구 정의 prefix ≈ {prefix}토큰"
+          + (" (최소 캐시 크기 미만: 세션 간 공유는 안 되고, 대화 기록이 쌓인 뒤부터 캐시됨)"
+             if prefix < args.min_cache_tokens else ""))
+    print("=" * 100)
+    for label, cache, shuffle in modes:
+        model = CachingStubModel(
+            cache_kwargs=cache_model_config(enabled=cache),
+            min_cache_tokens=args.min_cache_tokens,
+            base_ms=args.base_ms,
+            prefill_ms_per_token=args.prefill_ms,
+            cached_ms_per_token=args.cached_ms,
+        )
+        started = time.perf_counter()
+        usages = run_mode(model, args.sessions, args.turns, shuffle)
+        elapsed = time.perf_counter() - started
+        first = model.ttft_ms[::args.turns]
+        later = [t for i, t in enumerate(model.ttft_ms) if i % args.turns]
+        read = sum(u["cache_read_input_tokens"] for u in usages)
+        write = sum(u["cache_write_input_tokens"] for u in usages)
+        uncached = sum(u["input_tokens"] for u in usages)
+        print(f"{label:<16} TTFT 첫 턴 {statistics.mean(first):6.0f}ms | 이후 턴 {statistics.mean(later):6.0f}ms | "
+              f"입력 {uncached:6,d} / 캐시 읽기 {read:6,d} / 캐시 쓰기 {write:6,d} 토큰 | "
+              f"적중률 {read / max(read + write + uncached, 1):4.0%} | 전체 {elapsed:5.1f}초")
+    print("-" * 100)
+    print("마지막 턴 지표 예시:", usages[-1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+런타임 엔트리포인트 동시성 테스트
+
+lab4_runtime(동기)과 lab5_runtime_streaming(스트리밍)의 invoke를 여러 태스크에서
+동시에 호출하여 다음을 확인합니다.
+- 세션 격리: 각 세션의 대화 기록에 다른 세션의 메시지가 섞이지 않는지
+- 처리량 확장: 동시 세션 수가 늘어날 때 초당 처리 요청 수가 함께 늘어나는지
+
+Bedrock 대신 StubBedrockModel을 사용하므로 AWS 자격 증명 없이 실행됩니다.
+
+실행:
+    python benchmarks/bench_runtime_concurrency.py --sessions 1 4 16 --turns 3 --latency-ms 200
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import inspect
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.dirname(__file__))
+
+from stub_model import StubBedrockModel, last_user_text
+
+RUNTIMES = {
+    "lab4 (동기)": ("notebooks/lab-04-agentcore-runtime", "lab4_runtime"),
+    "lab5 (스트리밍)": ("notebooks/lab-05-agentcore-observability", "lab5_runtime_streaming"),
+}
+
+
+class _Context:
+    def __init__(self, session_id):
+        self.session_id = session_id
+
+
+def load_runtime(directory: str, module_name: str, model):
+    """런타임 모듈을 import하고 공유 모델을 대역으로 교체"""
+    sys.path.insert(0, os.path.join(ROOT, directory))
+    module = importlib.import_module(module_name)
+    module.get_model = lambda: model
+    return module
+
+
+async def run_load(module, label: str, sessions: int, turns: int):
+    """세션 수만큼 태스크를 만들어 각 세션에서 turns번 순차 대화"""
+    streaming = inspect.isasyncgenfunction(module.invoke)
+    run_id = f"{label[:4]}-{sessions}"
+
+    # 동기 invoke는 AgentCore처럼 스레드 풀에서 실행 (세션 수만큼 워커)
+    executor = ThreadPoolExecutor(max_workers=sessions)
+    loop = asyncio.get_running_loop()
+
+    async def session_task(index: int):
+        session_id = f"{run_id}-session-{index}"
+        for turn in range(turns):
+            prompt = f"[{session_id}] {turn}번째 질문: 반품 가능한가요?"
+            if streaming:
+                async for _ in module.invoke({"prompt": prompt}, _Context(session_id)):
+                    pass
+            else:
+                await loop.run_in_executor(executor, module.invoke, {"prompt": prompt}, _Context(session_id))
+        return session_id
+
+    started = time.perf_counter()
+    session_ids = await asyncio.gather(*(session_task(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+
+    leaked = 0
+    for session_id in session_ids:
+        agent = module.agent_pool.get(session_id)
+        for message in agent.messages:
+            for block in message["content"]:
+                text = block.get("text", "")
+                if "[" in text and f"[{session_id}]" not in text:
+                    leaked += 1
+    return elapsed, leaked
+
+
+async def run_levels(module, label: str, levels, turns: int):
+    results = []
+    for sessions in levels:
+        elapsed, leaked = await run_load(module, label, sessions, turns)
+        results.append((sessions, elapsed, leaked))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="런타임 엔트리포인트 동시성 테스트")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16], help="동시 세션 수 목록")
+    parser.add_argument("--turns", type=int, default=3, help="세션당 턴 수")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="모델 응답 지연 (ms)")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="컨테이너당 최대 동시 호출 수")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    os.environ["AGENT_MAX_IN_FLIGHT"] = str(args.max_in_flight)
+    # 모든 턴이 모델까지 가도록 답변 캐시는 끔 (캐시 효과는 bench_answer_cache.py에서 측정)
+    os.environ["ANSWER_CACHE"] = "false"
+
+    # 응답에 질문을 그대로 넣어 세션 간 섞임을 검출
+    model = StubBedrockModel(
+        reply=lambda messages: f"답변: {last_user_text(messages)}",
+        first_token_ms=args.latency_ms,
+    )
+
+    print("📊 런타임 엔트리포인트 동시성 테스트")
+    print(f"세션당 {args.turns}턴, 모델 지연 {args.latency_ms}ms, 최대 동시 호출 {args.max_in_flight}")
+    print("=" * 70)
+
+    failed = False
+    for label, (directory, module_name) in RUNTIMES.items():
+        module = load_runtime(directory, module_name, model)
+        # 런타임은 이벤트 루프 하나에서 동작하므로 모든 부하 단계를 같은 루프에서 실행
+        # (기본 콜백 핸들러가 출력하는 응답 텍스트는 숨김)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = asyncio.run(run_levels(module, label, args.sessions, args.turns))
+
+        baseline = None
+        for sessions, elapsed, leaked in results:
+            throughput = sessions * args.turns / elapsed
+            baseline = baseline or throughput
+            failed |= leaked > 0
+            print(f"{label:<14} 세션 {sessions:3d}개: {elapsed:6.2f}초 | {throughput:6.1f} req/s "
+                  f"(x{throughput / baseline:4.1f}) | 섞인 메시지 {leaked}")
+        print(f"{'':<14} 풀 상태: {module.agent_pool.stats()}")
+        print("-" * 70)
+
+    print("❌ 세션 격리 실패" if failed else "✅ 모든 세션의 대화 기록이 격리됨")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
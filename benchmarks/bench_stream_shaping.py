@@ -0,0 +1,124 @@
+"""
+스트리밍 프레임 정리(StreamShaper) 벤치마크
+
+agent.stream_async()의 원시 이벤트를 그대로 보낼 때와 StreamShaper로 묶어 보낼 때,
+BedrockAgentCoreApp이 실제로 만드는 SSE 바이트를 기준으로 응답당 프레임 수/바이트,
+직렬화 시간, TTFT(첫 텍스트 프레임까지 시간)를 비교합니다.
+
+Bedrock 대신 StubBedrockModel을 사용하며, 턴마다 반품 자격 확인 도구를 한 번 호출합니다.
+
+실행:
+    python benchmarks/bench_stream_shaping.py --responses 10 --token-ms 15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, "notebooks", "lab-05-agentcore-observability"))
+
+from bedrock_agentcore.runtime import BedrockAgentCoreApp
+from strands import Agent
+
+from ecommerce_tools import check_return_eligibility
+from stream_shaper import StreamShaper
+from stub_model import StubBedrockModel
+
+REPLY = (
+    "주문하신 플라워 패턴 원피스는 수령 후 14일 이내라면 반품이 가능합니다. "
+    "상품 태그를 보존하고 착용하지 않은 상태여야 하며, 단순 변심의 경우 반품 배송비는 고객님 부담입니다. "
+    "고객센터 또는 온라인으로 반품을 신청하시면 상품 회수 후 3-5 영업일 내에 환불됩니다. "
+    "추가로 도와드릴 일이 있으실까요?"
+)
+
+
+def frame_text(frame: dict) -> str:
+    """클라이언트(utils._extract_sse_text)와 같은 방식으로 텍스트 추출"""
+    data = frame.get("data")
+    return data if isinstance(data, str) else ""
+
+
+async def run_response(app, model, shaper: StreamShaper):
+    agent = Agent(model=model, tools=[check_return_eligibility], callback_handler=None)
+    frames = 0
+    wire_bytes = 0
+    serialize_s = 0.0
+    text = ""
+    ttft = None
+
+    started = time.perf_counter()
+    async for frame in shaper.shape(agent.stream_async("ORD-20240101-001 원피스 반품 가능한가요?")):
+        t0 = time.perf_counter()
+        sse = app._convert_to_sse(frame)
+        serialize_s += time.perf_counter() - t0
+        frames += 1
+        wire_bytes += len(sse)
+        chunk = frame_text(frame)
+        if chunk and ttft is None:
+            ttft = time.perf_counter() - started
+        text += chunk
+    return frames, wire_bytes, serialize_s, ttft, time.perf_counter() - started, text
+
+
+async def run_mode(app, model, shaper, responses):
+    return [await run_response(app, model, shaper) for _ in range(responses)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스트리밍 프레임 정리 벤치마크")
+    parser.add_argument("--responses", type=int, default=10, help="모드별 응답 수")
+    parser.add_argument("--first-token-ms", type=float, default=300.0, help="모델 첫 토큰 지연 (ms)")
+    parser.add_argument("--token-ms", type=float, default=15.0, help="델타 간 지연 (ms)")
+    parser.add_argument("--chunk-chars", type=int, default=3, help="델타당 글자 수")
+    parser.add_argument("--coalesce-ms", type=float, default=20.0)
+    parser.add_argument("--coalesce-bytes", type=int, default=64)
+    args = parser.parse_args()
+
+    app = BedrockAgentCoreApp()
+    model = StubBedrockModel(
+        reply=REPLY,
+        first_token_ms=args.first_token_ms,
+        token_ms=args.token_ms,
+        chunk_chars=args.chunk_chars,
+        tool_call={"name": "check_return_eligibility",
+                   "input": {"order_number": "ORD-20240101-001", "item_name": "플라워 패턴 원피스"}},
+    )
+
+    print("📊 스트리밍 프레임 정리 벤치마크")
+    print(f"응답 {args.responses}개/모드, 델타 {args.chunk_chars}글자 × {args.token_ms}ms, "
+          f"묶음 기준 {args.coalesce_ms}ms / {args.coalesce_bytes}바이트")
+    print("=" * 78)
+
+    modes = [
+        ("원시 이벤트", StreamShaper(enabled=False)),
+        ("StreamShaper", StreamShaper(max_bytes=args.coalesce_bytes, max_delay_ms=args.coalesce_ms)),
+    ]
+    texts = {}
+    for label, shaper in modes:
+        results = asyncio.run(run_mode(app, model, shaper, args.responses))
+        frames, wire_bytes, serialize_s, ttft, total, text = zip(*results)
+        texts[label] = set(text)
+        print(f"{label:<14} 프레임 {statistics.mean(frames):6.1f}개 | {statistics.mean(wire_bytes) / 1024:7.1f}KB | "
+              f"직렬화 {statistics.mean(serialize_s) * 1000:6.2f}ms | TTFT {statistics.mean(ttft) * 1000:6.1f}ms | "
+              f"전체 {statistics.mean(total) * 1000:6.0f}ms")
+
+    same = texts["원시 이벤트"] == texts["StreamShaper"]
+    print("-" * 78)
+    print("✅ 클라이언트가 받는 텍스트 동일" if same else "❌ 클라이언트가 받는 텍스트가 다름")
+    print("프레임 예시:", json.dumps(asyncio.run(_sample_frames(model, modes[1][1]))[:6], ensure_ascii=False))
+
+
+async def _sample_frames(model, shaper):
+    """묶인 프레임 예시 (처음 몇 개)"""
+    agent = Agent(model=model, tools=[check_return_eligibility], callback_handler=None)
+    return [frame async for frame in shaper.shape(agent.stream_async("원피스 반품 가능한가요?"))]
+
+
+if __name__ == "__main__":
+    main()
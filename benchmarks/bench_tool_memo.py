@@ -0,0 +1,149 @@
+"""
+멱등 도구 결과 재사용(ToolMemoizer) 벤치마크
+
+세션마다 같은 조회를 여러 번 반복하는 대화 스크립트(인자 순서/공백/생략한 기본값만 다른 호출 포함)를
+여러 세션으로 실행하면서, 훅이 없을 때와 있을 때의 도구 실행 횟수, 반복 호출 턴의 응답 시간,
+부수 효과 도구(process_return)의 실행 횟수를 비교합니다.
+
+- 모델은 StubBedrockModel 대역 (호출마다 --first-token-ms 지연), 턴마다 스크립트의 도구를 한 번 호출
+- 도구: src/tools의 web_search, get_color_matching_advice, check_size_availability, check_return_policy,
+  process_return를 --tool-ms 지연으로 감싸 실행
+- 세션마다 에이전트 하나 + ToolMemoizer 하나 (런타임의 세션 에이전트 풀과 같은 구성), GLOBAL 결과는
+  세션끼리 공유
+- 메모리 span 익스포터로 도구 span의 tool.memo.hit 속성을 집계해 트레이스에 적중이 남는지 확인
+
+실행:
+    python benchmarks/bench_tool_memo.py --sessions 5 --tool-ms 400 --first-token-ms 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from opentelemetry import trace as trace_api
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+# strands 트레이서가 만들어지기 전에 span을 메모리에 모으도록 설정
+SPANS = InMemorySpanExporter()
+_provider = TracerProvider()
+_provider.add_span_processor(SimpleSpanProcessor(SPANS))
+trace_api.set_tracer_provider(_provider)
+
+from strands import Agent  # noqa: E402
+from strands.types.tools import AgentTool  # noqa: E402
+
+from src.helpers.tool_memo import GLOBAL_STORE, ToolMemoizer  # noqa: E402
+from src.tools.exchange_tools import check_size_availability  # noqa: E402
+from src.tools.return_tools import check_return_policy, process_return  # noqa: E402
+from src.tools.search_tools import get_color_matching_advice, web_search  # noqa: E402
+from stub_model import StubBedrockModel, last_user_text  # noqa: E402
+
+RETURN_REQUEST = {"order_id": "ORD-20240101-001", "item_id": "KDRESS003", "reason": "사이즈 불만족",
+                  "customer_id": "customer_001"}
+
+# (고객 메시지, 모델이 호출할 도구, 인자, 앞선 호출의 반복인지)
+SCRIPT = [
+    ("여름 원피스 코디 추천해 주세요", "web_search", {"query": "여름 원피스 코디"}, False),
+    ("네이비 원피스에 어울리는 색은요?", "get_color_matching_advice",
+     {"primary_color": "네이비", "item_type": "원피스"}, False),
+    ("아까 코디 다시 보여 주세요", "web_search", {"query": "여름  원피스 코디 ", "search_type": "styling"}, True),
+    ("KDRESS003 M 사이즈 있어요?", "check_size_availability", {"item_id": "KDRESS003", "size": "M"}, False),
+    ("의류 반품 정책 알려주세요", "check_return_policy", {"product_category": "의류"}, False),
+    ("M 사이즈 재고 한 번 더 확인해 주세요", "check_size_availability", {"size": "M", "item_id": "KDRESS003"}, True),
+    ("반품 신청할게요", "process_return", RETURN_REQUEST, False),
+    ("반품 정책 다시 한 번만 알려주세요", "check_return_policy", {"product_category": "의류"}, True),
+    ("반품 신청 다시 해 주세요", "process_return", RETURN_REQUEST, False),
+    ("네이비랑 어울리는 색 다시 알려주세요", "get_color_matching_advice",
+     {"item_type": "원피스", "primary_color": "네이비"}, True),
+]
+CALLS = {prompt: {"name": name, "input": tool_input} for prompt, name, tool_input, _ in SCRIPT}
+EXECUTED = Counter()
+
+
+class SlowTool(AgentTool):
+    """네트워크 조회처럼 지연을 주고 실행 횟수를 세는 도구"""
+
+    def __init__(self, tool: AgentTool, delay_ms: float):
+        super().__init__()
+        self._tool = tool
+        self._delay_ms = delay_ms
+
+    @property
+    def tool_name(self) -> str:
+        return self._tool.tool_name
+
+    @property
+    def tool_spec(self):
+        return self._tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self._tool.tool_type
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        EXECUTED[self.tool_name] += 1
+        await asyncio.sleep(self._delay_ms / 1000)
+        async for event in self._tool.stream(tool_use, invocation_state, **kwargs):
+            yield event
+
+
+def tool_for(messages):
+    return CALLS.get(last_user_text(messages))
+
+
+async def run(sessions, tool_ms, first_token_ms, memo):
+    EXECUTED.clear()
+    GLOBAL_STORE.clear()
+    SPANS.clear()
+    tools = [SlowTool(t, tool_ms) for t in (web_search, get_color_matching_advice, check_size_availability,
+                                            check_return_policy, process_return)]
+    model = StubBedrockModel(reply="확인해 드렸습니다.", first_token_ms=first_token_ms, tool_call=tool_for)
+    first, repeated, stats = [], [], Counter()
+    for _ in range(sessions):
+        memoizer = ToolMemoizer() if memo else None
+        agent = Agent(model=model, tools=tools, hooks=[memoizer] if memoizer else [], callback_handler=None)
+        for prompt, _, _, is_repeat in SCRIPT:
+            started = time.perf_counter()
+            async for _ in agent.stream_async(prompt):
+                pass
+            (repeated if is_repeat else first).append((time.perf_counter() - started) * 1000)
+        if memoizer:
+            stats.update(memoizer.stats)
+    hit_spans = sum(1 for span in SPANS.get_finished_spans() if span.attributes.get("tool.memo.hit") is True)
+    return first, repeated, stats, hit_spans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="멱등 도구 결과 재사용 벤치마크")
+    parser.add_argument("--sessions", type=int, default=5, help="세션 수 (세션마다 스크립트 전체 실행)")
+    parser.add_argument("--tool-ms", type=float, default=400.0, help="도구 실행 지연 (ms)")
+    parser.add_argument("--first-token-ms", type=float, default=200.0, help="모델 호출당 첫 토큰 지연 (ms)")
+    args = parser.parse_args()
+
+    print("📊 멱등 도구 결과 재사용 벤치마크")
+    print(f"세션 {args.sessions}개 x 턴 {len(SCRIPT)}개 (반복 조회 {sum(s[3] for s in SCRIPT)}턴), "
+          f"도구 {args.tool_ms}ms, 모델 호출당 {args.first_token_ms}ms")
+    print("=" * 92)
+    for label, memo in (("재사용 없음", False), ("ToolMemoizer", True)):
+        first, repeated, stats, hit_spans = asyncio.run(run(args.sessions, args.tool_ms, args.first_token_ms, memo))
+        print(f"{label:<12} 도구 실행 {sum(EXECUTED.values()):3d}회 | process_return 실행 "
+              f"{EXECUTED['process_return']}회 | 첫 조회 턴 평균 {statistics.mean(first):7.1f}ms | "
+              f"반복 조회 턴 평균 {statistics.mean(repeated):7.1f}ms")
+        if memo:
+            print(f"  {dict(stats)}")
+            print(f"  tool.memo.hit=True 도구 span {hit_spans}개")
+        print("-" * 92)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+요청별 도구 선택 벤치마크
+
+Streamlit 앱 구성(로컬 도구 3개 + Gateway MCP 도구)에 Gateway 타깃이 늘어난 상황을 가정하고,
+스크립트로 만든 상담 대화 세트를 도구 선택 없이 / ToolSelectingModel(직전 목록 유지 안 함/유지)로 실행해
+모델 호출당 추정 프롬프트 토큰(도구 정의 토큰 포함), 도구 선택 정확도(모델이 써야 할 도구가 요청에 들어
+있었는지), 턴별 캐시 읽기/쓰기 토큰(track_turn_usage)을 비교합니다.
+
+- 모델은 StubBedrockModel 대역 (호출마다 --first-token-ms 지연). 받은 도구 정의를 기록하고, 턴마다 정답
+  도구를 호출 (대화 기록에 도구 호출이 남아 후속 질문의 도구 유지도 함께 확인)
+- 도구: src/tools의 process_return, process_exchange, web_search + setup/lambda/api_spec.json의
+  check_return_eligibility + 가상의 Gateway 타깃 도구 (실행하면 고정 문자열 반환)
+- 토큰은 글자 수 / 2.5로 추정 (history_compaction.estimate_tokens와 같은 기준)
+- 캐시: cache_model_config() 체크포인트로 만든 요청 본문을 stub_model.PromptCacheSimulator로 계산
+  (도구 부분집합이 바뀌면 도구 정의 뒤의 prefix도 모두 달라짐). 과금 기준 입력은 Bedrock 가격 비율대로
+  캐시 읽기 0.1배, 캐시 쓰기 1.25배로 환산
+
+실행:
+    python benchmarks/bench_tool_selection.py --top-k 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("AWS_REGION", "us-east-1")
+
+from strands import Agent
+from strands.models import BedrockModel
+from strands.types.tools import AgentTool
+
+from src.helpers.history_compaction import estimate_tokens
+from src.helpers.lab1_strands_agent import ECOMMERCE_MODEL_ID, ECOMMERCE_SYSTEM_PROMPT
+from src.helpers.prompt_cache import cache_model_config, track_turn_usage
+from src.helpers.tool_selection import ToolSelectingModel, ToolSelector
+from src.tools.exchange_tools import process_exchange
+from src.tools.return_tools import process_return
+from src.tools.search_tools import web_search
+from stub_model import PromptCacheSimulator, StubBedrockModel, last_user_text
+
+CHARS_PER_TOKEN = 2.5
+# 입력 토큰 대비 캐시 읽기/쓰기 토큰 가격 비율
+CACHE_READ_PRICE, CACHE_WRITE_PRICE = 0.1, 1.25
+TARGET = "EcommerceLambdaTarget"
+
+# 가상의 Gateway 타깃 도구 (이름, 설명, 인자 -> 설명)
+GATEWAY_TOOLS = [
+    ("OrderTarget", "get_order_status", "주문번호로 주문 상태(결제 완료, 상품 준비 중, 배송 중, 배송 완료)를 조회합니다.",
+     {"order_number": "주문번호"}),
+    ("OrderTarget", "cancel_order", "배송 전 주문을 취소하고 결제를 취소합니다.", {"order_number": "주문번호", "reason": "취소 사유"}),
+    ("OrderTarget", "change_shipping_address", "배송 전 주문의 배송지 주소를 변경합니다.",
+     {"order_number": "주문번호", "address": "새 배송지 주소"}),
+    ("DeliveryTarget", "track_delivery", "택배 송장번호로 배송 위치와 도착 예정일을 추적합니다.", {"tracking_number": "송장번호"}),
+    ("PaymentTarget", "get_refund_status", "반품/취소 건의 환불 진행 상태와 환불 예정일을 조회합니다.",
+     {"order_number": "주문번호"}),
+    ("BenefitTarget", "get_coupons", "고객이 보유한 쿠폰 목록과 사용 기한, 할인 조건을 조회합니다.", {"customer_id": "고객 ID"}),
+    ("BenefitTarget", "get_point_balance", "적립금 잔액과 소멸 예정 적립금을 조회합니다.", {"customer_id": "고객 ID"}),
+    ("BenefitTarget", "get_membership_benefits", "VIP/골드/실버 멤버십 등급별 혜택과 다음 등급 조건을 안내합니다.",
+     {"customer_id": "고객 ID"}),
+    ("ProductTarget", "check_size_availability", "상품의 사이즈별 재고 여부를 확인합니다.",
+     {"item_id": "상품 번호", "size": "사이즈"}),
+    ("ProductTarget", "get_size_guide", "상품 카테고리별 사이즈 표(가슴둘레, 허리, 총장)와 핏 정보를 안내합니다.",
+     {"category": "상품 카테고리"}),
+    ("ProductTarget", "request_restock_alert", "품절 상품이 재입고되면 알림을 보내도록 신청합니다.",
+     {"item_id": "상품 번호", "size": "사이즈"}),
+    ("ProductTarget", "get_color_matching_advice", "옷 색상에 어울리는 컬러 조합과 코디를 추천합니다.",
+     {"primary_color": "기본 색상", "item_type": "아이템 종류"}),
+    ("StoreTarget", "check_store_stock", "오프라인 매장별 상품 재고와 매장 위치, 영업시간을 조회합니다.",
+     {"item_id": "상품 번호", "region": "지역"}),
+    ("ReviewTarget", "write_review", "구매한 상품의 리뷰와 별점을 등록합니다.",
+     {"order_number": "주문번호", "rating": "별점", "content": "리뷰 내용"}),
+    ("ServiceTarget", "request_gift_wrap", "선물 포장과 메시지 카드를 추가합니다.", {"order_number": "주문번호", "message": "카드 문구"}),
+    ("ServiceTarget", "check_warranty_status", "시리얼 번호로 뷰티 디바이스의 보증 기간과 무상 수리 가능 여부를 확인합니다.",
+     {"serial_number": "시리얼 번호"}),
+]
+
+# 상담 대화 (고객 메시지, 모델이 호출해야 하는 도구 또는 None)
+CONVERSATIONS = [
+    [("ORD-20240101-001 원피스 반품 가능한지 확인해 주세요", "check_return_eligibility"),
+     ("그럼 반품 신청해 주세요. 사이즈가 안 맞아요", "process_return"),
+     ("환불은 언제 들어오나요?", "get_refund_status")],
+    [("니트를 M 사이즈로 교환하고 싶어요", "process_exchange"),
+     ("KTOP001 M 사이즈 재고 있나요?", "check_size_availability"),
+     ("재고가 없으면 재입고 알림 신청할게요", "request_restock_alert")],
+    [("여름 원피스 코디 트렌드 검색해 주세요", "web_search"),
+     ("네이비 원피스에 어울리는 색 조합 알려주세요", "get_color_matching_advice"),
+     ("고마워요!", None)],
+    [("주문한 상품이 지금 어디쯤 왔나요? 주문번호 ORD-20240105-002", "get_order_status"),
+     ("송장번호 123456789012 배송 추적해 주세요", "track_delivery"),
+     ("배송지 주소를 회사로 바꿀 수 있나요?", "change_shipping_address")],
+    [("제 적립금 얼마나 남았어요?", "get_point_balance"),
+     ("쓸 수 있는 쿠폰도 있나요?", "get_coupons"),
+     ("골드 등급 혜택이 뭐예요?", "get_membership_benefits")],
+    [("주문 취소하고 싶어요 ORD-20240110-003", "cancel_order"),
+     ("선물 포장 추가되나요?", "request_gift_wrap")],
+    [("바지 사이즈 표 보여 주세요", "get_size_guide"),
+     ("강남 매장에 이 상품 재고 있나요?", "check_store_stock")],
+    [("뷰티 디바이스 시리얼 SN-1234 보증 기간 확인해 주세요", "check_warranty_status"),
+     ("받은 가디건 리뷰 남기고 싶어요, 별점 5점", "write_review"),
+     ("안녕하세요", None)],
+]
+
+
+class SpecTool(AgentTool):
+    """도구 정의만 있는 대역 도구 (실행하면 고정 문자열 반환)"""
+
+    def __init__(self, tool_spec):
+        super().__init__()
+        self._tool_spec = tool_spec
+
+    @property
+    def tool_name(self) -> str:
+        return self._tool_spec["name"]
+
+    @property
+    def tool_spec(self):
+        return self._tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return "python"
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        yield {"toolUseId": tool_use["toolUseId"], "status": "success",
+               "content": [{"text": f"{self.tool_name} 처리 결과"}]}
+
+
+def gateway_spec(target, name, description, arguments):
+    return {
+        "name": f"{target}___{name}",
+        "description": description,
+        "inputSchema": {"json": {
+            "type": "object",
+            "properties": {arg: {"type": "string", "description": desc} for arg, desc in arguments.items()},
+            "required": list(arguments),
+        }},
+    }
+
+
+def make_tools():
+    specs = [process_return.tool_spec, process_exchange.tool_spec, web_search.tool_spec]
+    with open(os.path.join(ROOT, "setup", "lambda", "api_spec.json"), encoding="utf-8") as f:
+        for spec in json.load(f):
+            specs.append({"name": f"{TARGET}___{spec['name']}", "description": spec["description"],
+                          "inputSchema": {"json": spec["inputSchema"]}})
+    specs += [gateway_spec(*tool) for tool in GATEWAY_TOOLS]
+    return [SpecTool(spec) for spec in specs]
+
+
+def full_name(tools, name):
+    return next(t.tool_name for t in tools if t.tool_name == name or t.tool_name.endswith(f"___{name}"))
+
+
+class RecordingStub(StubBedrockModel):
+    """받은 도구 정의와 추정 프롬프트 토큰을 기록하고, 캐시 읽기/쓰기 토큰을 usage로 보고하는 모델 대역"""
+
+    def __init__(self, min_cache_tokens, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = []
+        self.formatter = BedrockModel(model_id=ECOMMERCE_MODEL_ID, **cache_model_config())
+        self.simulator = PromptCacheSimulator(min_cache_tokens)
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        tool_tokens = len(json.dumps(tool_specs or [], ensure_ascii=False)) / CHARS_PER_TOKEN
+        prompt_tokens = tool_tokens + len(system_prompt or "") / CHARS_PER_TOKEN + estimate_tokens(messages)
+        self.requests.append({"user": last_user_text(messages), "tools": [s["name"] for s in tool_specs or []],
+                              "tool_tokens": tool_tokens, "prompt_tokens": prompt_tokens})
+        request = self.formatter.format_request(messages, tool_specs, system_prompt_content=[{"text": system_prompt}])
+        read, written, total = self.simulator.usage(request)
+        async for event in super().stream(messages, tool_specs, system_prompt, **kwargs):
+            if "metadata" in event:
+                output_tokens = event["metadata"]["usage"]["outputTokens"]
+                event["metadata"]["usage"] = {
+                    "inputTokens": total - read - written, "outputTokens": output_tokens,
+                    "totalTokens": total + output_tokens,
+                    "cacheReadInputTokens": read, "cacheWriteInputTokens": written,
+                }
+            yield event
+
+
+async def run(tools, first_token_ms, min_cache_tokens, selector):
+    expected = {text: (full_name(tools, name) if name else None) for conv in CONVERSATIONS for text, name in conv}
+
+    def tool_for(messages):
+        name = expected.get(last_user_text(messages))
+        if name is None:
+            return None
+        spec = next(t.tool_spec for t in tools if t.tool_name == name)
+        return {"name": name, "input": {arg: "X" for arg in spec["inputSchema"]["json"].get("required", [])}}
+
+    stub = RecordingStub(min_cache_tokens, reply="확인해 드렸습니다.", first_token_ms=first_token_ms,
+                         tool_call=tool_for)
+    model = ToolSelectingModel(stub, selector) if selector else stub
+    usages = []
+    for conversation in CONVERSATIONS:
+        agent = Agent(model=model, tools=tools, system_prompt=ECOMMERCE_SYSTEM_PROMPT, callback_handler=None)
+        for text, _ in conversation:
+            with track_turn_usage(agent) as usage:
+                async for _ in agent.stream_async(text):
+                    pass
+            usages.append(usage)
+
+    # 턴 첫 호출에 정답 도구가 들어 있었는지 (도구 결과 뒤 후속 호출은 같은 턴)
+    first_calls = {}
+    for request in stub.requests:
+        first_calls.setdefault(request["user"], request)
+    graded = [(first_calls[text], name) for text, name in expected.items() if name]
+    correct = sum(name in request["tools"] for request, name in graded)
+    misses = [(request["user"], name) for request, name in graded if name not in request["tools"]]
+    return stub.requests, correct, len(graded), misses, usages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="요청별 도구 선택 벤치마크")
+    parser.add_argument("--top-k", type=int, default=5, help="점수순으로 넣을 도구 수")
+    parser.add_argument("--pinned", default="", help="항상 넣을 도구 이름 (쉼표 구분)")
+    parser.add_argument("--first-token-ms", type=float, default=50.0, help="모델 호출당 첫 토큰 지연 (ms)")
+    parser.add_argument("--min-cache-tokens", type=int, default=1024, help="캐시 가능한 최소 prefix 토큰 수")
+    args = parser.parse_args()
+    pinned = [name.strip() for name in args.pinned.split(",") if name.strip()]
+
+    tools = make_tools()
+    turns = sum(len(conversation) for conversation in CONVERSATIONS)
+    print("📊 요청별 도구 선택 벤치마크")
+    print(f"도구 {len(tools)}개 (로컬 3 + Gateway {len(tools) - 3}), 대화 {len(CONVERSATIONS)}개 / 턴 {turns}개, "
+          f"top_k={args.top_k}, pinned={pinned or '없음'}")
+    print("=" * 96)
+    modes = (
+        ("도구 선택 없음", None),
+        ("선택 (목록 매번 갱신)", ToolSelector(top_k=args.top_k, pinned=pinned, keep_previous=False)),
+        ("선택 (직전 목록 유지)", ToolSelector(top_k=args.top_k, pinned=pinned)),
+    )
+    for label, selector in modes:
+        requests, correct, graded, misses, usages = asyncio.run(
+            run(tools, args.first_token_ms, args.min_cache_tokens, selector))
+        read = sum(u["cache_read_input_tokens"] for u in usages)
+        write = sum(u["cache_write_input_tokens"] for u in usages)
+        uncached = sum(u["input_tokens"] for u in usages)
+        print(f"{label:<14} 모델 호출 {len(requests)}회 | 호출당 도구 {statistics.mean(len(r['tools']) for r in requests):5.1f}개 | "
+              f"도구 정의 {statistics.mean(r['tool_tokens'] for r in requests):7.0f} 토큰 | "
+              f"프롬프트 {statistics.mean(r['prompt_tokens'] for r in requests):7.0f} 토큰 | "
+              f"정확도 {correct}/{graded} ({correct / graded:.0%})")
+        billed = uncached + read * CACHE_READ_PRICE + write * CACHE_WRITE_PRICE
+        print(f"  입력 {uncached:6,d} / 캐시 읽기 {read:7,d} / 캐시 쓰기 {write:6,d} 토큰 | "
+              f"적중률 {read / max(read + write + uncached, 1):4.0%} | 과금 기준 입력 {billed:8,.0f} 토큰")
+        if selector:
+            print(f"  {dict(selector.stats)}")
+            for text, name in misses:
+                print(f"    ❌ '{text}' -> {name} 누락")
+        print("-" * 96)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+도구 선실행 벤치마크
+
+주문번호가 들어간 문의를 같은 에이전트 구성으로 보내면서, SpeculativePrefetch 훅이 없을 때와
+있을 때의 턴 시간과 선실행 통계(적중/폐기)를 비교합니다.
+
+- 모델은 StubBedrockModel 대역 (호출마다 --first-token-ms 지연)
+- 도구는 lab 05의 ecommerce_tools를 감싸 --tool-ms만큼 I/O 지연(주문 DB 조회 등)을 흉내 냄
+- 문의 유형: 모델이 메시지의 상품명 그대로 자격 확인 (적중) / 다른 상품명으로 확인 (폐기) /
+  반품 신청 (부수 효과 도구라 선실행하지 않음)
+
+실행:
+    python benchmarks/bench_tool_speculation.py --requests 30 --tool-ms 250
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, "notebooks", "lab-05-agentcore-observability"))
+
+from strands import Agent, tool
+
+import ecommerce_tools
+from stub_model import StubBedrockModel, last_user_text
+from tool_speculation import SpeculativePrefetch
+
+TOOL_MS = 250.0
+
+PROMPTS = [
+    ("자격 확인 (같은 인자)", "ORD-2024010{n}-001 플라워 원피스 반품 가능한가요?"),
+    ("자격 확인 (다른 인자)", "ORD-2024010{n}-002 산 니트 반품 될까요?"),
+    ("반품 신청 (선실행 금지)", "ORD-2024010{n}-003 사이즈가 안 맞아서 반품 신청할게요"),
+]
+
+
+@tool
+def check_return_eligibility(order_number: str, item_name: str) -> str:
+    """
+    주문 상품의 반품 가능 여부를 확인합니다.
+
+    Args:
+        order_number: 주문번호 (예: 'ORD-20240101-001')
+        item_name: 상품명 (예: '플라워 패턴 원피스')
+    """
+    time.sleep(TOOL_MS / 1000)
+    return ecommerce_tools.check_return_eligibility(order_number=order_number, item_name=item_name)
+
+
+@tool
+def process_return_request(order_number: str, reason: str) -> str:
+    """
+    반품 요청을 처리합니다.
+
+    Args:
+        order_number: 주문번호
+        reason: 반품 사유
+    """
+    time.sleep(TOOL_MS / 1000)
+    return ecommerce_tools.process_return_request(order_number=order_number, reason=reason)
+
+
+def tool_for(messages):
+    """모델 대역의 도구 선택: 두 번째 유형은 모델이 상품명을 다르게 적는 경우"""
+    text = last_user_text(messages)
+    order = re.search(r"ORD-\d{8}-\d{3}", text).group()
+    if "반품 신청" in text:
+        return {"name": "process_return_request", "input": {"order_number": order, "reason": "사이즈 불만족"}}
+    item = "플라워 원피스" if "원피스" in text else "울 니트"
+    return {"name": "check_return_eligibility", "input": {"order_number": order, "item_name": item}}
+
+
+def run(requests, first_token_ms, speculate):
+    hook = SpeculativePrefetch(enabled=speculate)
+    model = StubBedrockModel(reply="네, 고객님. 확인해 드렸습니다.", first_token_ms=first_token_ms, tool_call=tool_for)
+    agent = Agent(
+        model=model,
+        tools=[check_return_eligibility, process_return_request],
+        system_prompt=ecommerce_tools.ECOMMERCE_SYSTEM_PROMPT,
+        hooks=[hook],
+        callback_handler=None,
+    )
+    latencies = {label: [] for label, _ in PROMPTS}
+    for i in range(requests):
+        label, template = PROMPTS[i % len(PROMPTS)]
+        started = time.perf_counter()
+        agent(template.format(n=i % 9 + 1))
+        latencies[label].append((time.perf_counter() - started) * 1000)
+    return latencies, hook.stats
+
+
+def main():
+    global TOOL_MS
+    parser = argparse.ArgumentParser(description="도구 선실행 벤치마크")
+    parser.add_argument("--requests", type=int, default=30, help="보낼 문의 수")
+    parser.add_argument("--first-token-ms", type=float, default=300.0, help="모델 호출당 첫 토큰 지연 (ms)")
+    parser.add_argument("--tool-ms", type=float, default=250.0, help="도구 호출당 I/O 지연 (ms)")
+    args = parser.parse_args()
+    TOOL_MS = args.tool_ms
+
+    print("📊 도구 선실행 벤치마크")
+    print(f"문의 {args.requests}건, 모델 호출당 {args.first_token_ms}ms, 도구 호출당 {args.tool_ms}ms "
+          f"(턴 = 모델 → 도구 → 모델)")
+    print("=" * 88)
+    for label, speculate in (("선실행 없음", False), ("선실행", True)):
+        latencies, stats = run(args.requests, args.first_token_ms, speculate)
+        print(f"{label}: {dict(stats) or '-'}")
+        for prompt, values in latencies.items():
+            print(f"  {prompt:<18} 평균 {statistics.mean(values):7.1f}ms | 최대 {max(values):7.1f}ms")
+        print("-" * 88)
+
+
+if __name__ == "__main__":
+    main()
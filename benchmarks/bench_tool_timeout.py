@@ -0,0 +1,104 @@
+"""
+도구 제한 시간 벤치마크
+
+Gateway 검색 도구(MCP처럼 비동기로 호출되는 '타깃___web_search')가 가끔 매우 느려지는 상황에서,
+ToolTimeouts 훅이 없을 때와 있을 때의 턴 시간(p50/p95/최대)과 대체 도구 사용 횟수를 비교합니다.
+
+- 모델은 StubBedrockModel 대역 (호출마다 --first-token-ms 지연), 턴마다 Gateway 검색을 한 번 호출
+- Gateway 검색: 평소 --tool-ms, --slow-ratio 비율로 --slow-ms 지연 (취소되면 취소 횟수 집계)
+- 대체 도구: 로컬 web_search (src/tools/search_tools.py)
+- 런타임처럼 stream_async()로 실행
+
+실행:
+    python benchmarks/bench_tool_timeout.py --turns 40 --slow-ratio 0.2 --slow-ms 8000 --timeout 1.5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from strands import Agent, tool
+
+from src.helpers.tool_timeout import ToolTimeouts
+from src.tools.search_tools import web_search
+from stub_model import StubBedrockModel
+
+SETTINGS = {"tool_ms": 300.0, "slow_ms": 8000.0, "slow_ratio": 0.2}
+CANCELLED = []
+CALLS = []
+
+
+@tool
+async def search_target___web_search(query: str) -> str:
+    """
+    Gateway를 통한 웹 검색 (Lambda)
+
+    Args:
+        query: 검색 쿼리
+    """
+    # 느린 호출을 고르게 섞음 (slow_ratio=0.2이면 5번째 호출마다)
+    CALLS.append(query)
+    slow = SETTINGS["slow_ratio"] > 0 and len(CALLS) % round(1 / SETTINGS["slow_ratio"]) == 0
+    try:
+        await asyncio.sleep((SETTINGS["slow_ms"] if slow else SETTINGS["tool_ms"]) / 1000)
+    except asyncio.CancelledError:
+        CANCELLED.append(query)
+        raise
+    return f"'{query}' 검색 결과: 여름 린넨 원피스 코디 가이드"
+
+
+def search_call(messages):
+    return {"name": "search_target___web_search", "input": {"query": "여름 원피스 코디"}}
+
+
+async def run(turns, first_token_ms, hook):
+    CALLS.clear()
+    CANCELLED.clear()
+    model = StubBedrockModel(reply="검색 결과를 바탕으로 안내드립니다.", first_token_ms=first_token_ms,
+                             tool_call=search_call)
+    latencies = []
+    for _ in range(turns):
+        agent = Agent(model=model, tools=[search_target___web_search, web_search],
+                      hooks=[hook] if hook else [], callback_handler=None)
+        started = time.perf_counter()
+        async for _ in agent.stream_async("여름 원피스 코디 찾아주세요"):
+            pass
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="도구 제한 시간 벤치마크")
+    parser.add_argument("--turns", type=int, default=40, help="턴 수")
+    parser.add_argument("--first-token-ms", type=float, default=300.0, help="모델 호출당 첫 토큰 지연 (ms)")
+    parser.add_argument("--tool-ms", type=float, default=300.0, help="Gateway 검색 평소 지연 (ms)")
+    parser.add_argument("--slow-ms", type=float, default=8000.0, help="Gateway 검색이 느려졌을 때 지연 (ms)")
+    parser.add_argument("--slow-ratio", type=float, default=0.2, help="느린 호출 비율")
+    parser.add_argument("--timeout", type=float, default=1.5, help="Gateway 도구 제한 시간 (초)")
+    args = parser.parse_args()
+    SETTINGS.update(tool_ms=args.tool_ms, slow_ms=args.slow_ms, slow_ratio=args.slow_ratio)
+
+    print("📊 도구 제한 시간 벤치마크")
+    print(f"턴 {args.turns}개, Gateway 검색 {args.tool_ms}ms (느린 호출 {args.slow_ratio:.0%}는 {args.slow_ms}ms), "
+          f"제한 시간 {args.timeout}초")
+    print("=" * 92)
+    modes = (("제한 시간 없음", None), ("ToolTimeouts", ToolTimeouts(timeouts={"*___*": args.timeout})))
+    for label, hook in modes:
+        latencies = asyncio.run(run(args.turns, args.first_token_ms, hook))
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"{label:<14} p50 {statistics.median(latencies):8.1f}ms | p95 {p95:8.1f}ms | "
+              f"최대 {max(latencies):8.1f}ms | 취소된 호출 {len(CANCELLED)}건")
+        if hook:
+            print(f"  {dict(hook.stats)}")
+        print("-" * 92)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+모델 라우터 오프라인 평가
+
+학습에 쓰지 않은 라벨 발화로 IntentClassifier/ModelRouter를 평가합니다 (네트워크 없음).
+
+- 의도 정확도, 의도별 정밀도/재현율
+- 등급 정확도와 fast 모델로 보내는 비율
+- 위험한 오분류: full이어야 하는 요청을 fast로 보낸 수 (품질 저하)
+- 아까운 오분류: fast로 충분한 요청을 full로 보낸 수 (비용/지연만 손해)
+- 분류 지연 p50/p95
+
+실행:
+    python benchmarks/eval_model_router.py --min-confidence 0.5 --show-errors
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from src.helpers.model_router import DEFAULT_ROUTES, FAST, FULL, IntentClassifier, ModelRouter, parse_overrides
+
+# (발화, 의도) - TRAINING_UTTERANCES와 겹치지 않는 평가용 발화
+EVAL_UTTERANCES = [
+    ("안녕하세요~", "greeting"),
+    ("상담 감사합니다", "greeting"),
+    ("도와주셔서 고마워요", "greeting"),
+    ("네 수고 많으셨어요", "greeting"),
+    ("반품은 며칠 안에 해야 하나요?", "faq"),
+    ("교환 배송비 누가 내요?", "faq"),
+    ("포장 뜯으면 반품 안 되나요?", "faq"),
+    ("환불 수수료가 있나요?", "faq"),
+    ("주말에도 고객센터 운영하나요?", "faq"),
+    ("해외 배송도 되나요?", "faq"),
+    ("향수도 반품 가능한가요?", "faq"),
+    ("반품은 어떤 방법으로 보내면 되나요?", "faq"),
+    ("착용한 옷도 교환되나요?", "faq"),
+    ("적립금으로 환불받을 수 있는 조건이 뭐예요?", "faq"),
+    ("ORD-20240105-002 지금 어디쯤이에요?", "order_status"),
+    ("스커트 언제 와요?", "order_status"),
+    ("주문한 지 3일 됐는데 아직 출고 안 됐나요?", "order_status"),
+    ("반품 신청한 거 진행 상황 알려주세요", "order_status"),
+    ("환불 처리됐는지 확인 부탁드려요", "order_status"),
+    ("교환 상품 송장 나왔나요?", "order_status"),
+    ("배송 상태 조회해 주세요", "order_status"),
+    ("ORD-20240104-001 바지 길이가 너무 길어서 반품하고 싶어요", "return"),
+    ("립스틱 쓰고 입술이 부어서 환불받고 싶어요", "return"),
+    ("실밥이 다 풀려 있어요 반품 신청합니다", "return"),
+    ("주문한 것과 다른 상품이 와서 반품할게요", "return"),
+    ("ORD-20240102-003 크로스백 반품 가능해요?", "return"),
+    ("생각보다 별로라서 반품 접수해 주세요", "return"),
+    ("니트 S 사이즈로 교환해 주세요", "exchange"),
+    ("베이지 말고 네이비로 바꿔 주세요", "exchange"),
+    ("ORD-20240103-001 운동화 240으로 교환하고 싶어요", "exchange"),
+    ("쿠션 호수를 21호로 바꾸고 싶어요", "exchange"),
+    ("원피스 색상 변경 신청할게요", "exchange"),
+    ("결혼식 하객룩 추천해 주세요", "recommendation"),
+    ("지성 피부에 좋은 선크림 뭐가 좋아요?", "recommendation"),
+    ("청바지에 어울리는 신발 골라 주세요", "recommendation"),
+    ("가을 니트 코디 알려주세요", "recommendation"),
+    ("20대 데일리 가방 추천 부탁드려요", "recommendation"),
+    ("블레이저 스타일링 어떻게 해요?", "recommendation"),
+    ("티셔츠는 반품하고 니트는 L로 교환해 주세요", "complex"),
+    ("원피스 환불받고 비슷한 스타일 추천도 같이 해주세요", "complex"),
+    ("ORD-20240101-002 반품하고 그다음에 같은 상품 다른 색으로 사고 싶어요", "complex"),
+    ("세 개 주문했는데 하나는 교환하고 나머지는 반품할게요", "complex"),
+    ("운동화 교환하면서 어울리는 양말도 추천해 주세요", "complex"),
+    ("반품이랑 교환 중에 뭐가 나을지 비용 비교해 주세요", "complex"),
+]
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모델 라우터 오프라인 평가")
+    parser.add_argument("--min-confidence", type=float, default=0.5, help="이 확률 미만이면 full 모델")
+    parser.add_argument("--overrides", default="", help="의도별 재정의 (예: recommendation=fast)")
+    parser.add_argument("--repeat", type=int, default=200, help="지연 측정 반복 횟수")
+    parser.add_argument("--show-errors", action="store_true", help="오분류 발화 출력")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    classifier = IntentClassifier()
+    train_ms = (time.perf_counter() - started) * 1000
+    router = ModelRouter(classifier, overrides=parse_overrides(args.overrides), min_confidence=args.min_confidence)
+    routes = {**DEFAULT_ROUTES, **router.overrides}
+
+    rows = []
+    for text, label in EVAL_UTTERANCES:
+        decision = router.route(text)
+        rows.append((text, label, decision))
+
+    print("📊 모델 라우터 오프라인 평가")
+    print(f"평가 발화 {len(rows)}개, 학습 {train_ms:.0f}ms, min_confidence={args.min_confidence}, "
+          f"재정의={router.overrides or '없음'}")
+    print("=" * 80)
+
+    correct = sum(label == d.intent for _, label, d in rows)
+    print(f"의도 정확도: {correct / len(rows):.1%} ({correct}/{len(rows)})")
+    for intent in DEFAULT_ROUTES:
+        predicted = [d.intent == intent for _, _, d in rows]
+        actual = [label == intent for _, label, _ in rows]
+        hits = sum(p and a for p, a in zip(predicted, actual))
+        precision = hits / max(sum(predicted), 1)
+        recall = hits / max(sum(actual), 1)
+        print(f"  {intent:<15} 정밀도 {precision:5.0%} | 재현율 {recall:5.0%} | 발화 {sum(actual):2d}개 | "
+              f"등급 {routes[intent]}")
+
+    print("-" * 80)
+    tier_correct = sum(routes[label] == d.tier for _, label, d in rows)
+    fast_share = sum(d.tier == FAST for _, _, d in rows) / len(rows)
+    risky = [(t, l, d) for t, l, d in rows if routes[l] == FULL and d.tier == FAST]
+    wasted = [(t, l, d) for t, l, d in rows if routes[l] == FAST and d.tier == FULL]
+    reasons = {}
+    for _, _, d in rows:
+        reasons[d.reason] = reasons.get(d.reason, 0) + 1
+    print(f"등급 정확도: {tier_correct / len(rows):.1%} | fast 모델 비율 {fast_share:.0%} "
+          f"(정답 기준 {sum(routes[l] == FAST for _, l, _ in rows) / len(rows):.0%})")
+    print(f"위험한 오분류 (full → fast): {len(risky)}건 | 아까운 오분류 (fast → full): {len(wasted)}건")
+    print(f"결정 이유: {reasons}")
+
+    latencies = []
+    for _ in range(args.repeat):
+        for text, _ in EVAL_UTTERANCES:
+            latencies.append(router.route(text).latency_ms)
+    print(f"분류 지연: p50 {statistics.median(latencies):.3f}ms | p95 {percentile(latencies, 0.95):.3f}ms")
+
+    if args.show_errors:
+        print("-" * 80)
+        for text, label, d in rows:
+            if label != d.intent or routes[label] != d.tier:
+                print(f"  [{label} → {d.intent} {d.confidence:.2f} {d.tier}/{d.reason}] {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+벤치마크용 Bedrock 모델 대역
+
+strands Model 인터페이스를 구현하고, 네트워크 없이 Bedrock ConverseStream과
+같은 형태의 이벤트를 인공 지연과 함께 스트리밍합니다.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+from typing import Callable, List, Optional, Tuple, Union
+
+from strands.models.model import Model
+
+
+class StubBedrockModel(Model):
+    """
+    고정 지연으로 응답하는 모델 대역
+
+    Args:
+        reply: 응답 텍스트 또는 (messages -> 텍스트) 함수
+        first_token_ms: 첫 토큰까지의 지연
+        token_ms: 이후 델타 사이의 지연
+        chunk_chars: 델타 하나에 담을 글자 수
+        model_id: get_config()에 노출할 모델 ID
+        tool_call: 도구 결과가 없는 턴에서 호출할 도구 {"name": ..., "input": {...}}
+            또는 (messages -> 도구 호출 또는 None) 함수
+    """
+
+    def __init__(
+        self,
+        reply: Union[str, Callable[[list], str]] = "네, 확인해 드리겠습니다.",
+        first_token_ms: float = 200.0,
+        token_ms: float = 0.0,
+        chunk_chars: int = 4,
+        model_id: str = "stub-model",
+        tool_call: Union[None, dict, Callable[[list], Optional[dict]]] = None,
+    ):
+        self.reply = reply
+        self.first_token_ms = first_token_ms
+        self.token_ms = token_ms
+        self.chunk_chars = chunk_chars
+        self.config = {"model_id": model_id}
+        self.tool_call = tool_call
+        self.calls: List[list] = []
+
+    def update_config(self, **model_config):
+        self.config.update(model_config)
+
+    def get_config(self):
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError("StubBedrockModel은 structured_output을 지원하지 않습니다")
+
+    def _reply_text(self, messages: list) -> str:
+        return self.reply(messages) if callable(self.reply) else self.reply
+
+    def _pending_tool_call(self, messages: list) -> Optional[dict]:
+        """직전 메시지가 도구 결과가 아니면 호출할 도구 반환"""
+        if not self.tool_call or not messages:
+            return None
+        if any("toolResult" in block for block in messages[-1]["content"]):
+            return None
+        return self.tool_call(messages) if callable(self.tool_call) else self.tool_call
+
+    async def stream(self, messages, tool_specs=None, system_prompt: Optional[str] = None, **kwargs):
+        self.calls.append(copy.deepcopy(messages))
+
+        yield {"messageStart": {"role": "assistant"}}
+        await asyncio.sleep(self.first_token_ms / 1000)
+
+        tool_call = self._pending_tool_call(messages)
+        if tool_call:
+            tool_use_id = f"tooluse_{len(self.calls)}"
+            yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": tool_use_id, "name": tool_call["name"]}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(tool_call["input"])}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+            yield {"metadata": {"usage": {"inputTokens": 100, "outputTokens": 20, "totalTokens": 120},
+                                "metrics": {"latencyMs": int(self.first_token_ms)}}}
+            return
+
+        text = self._reply_text(messages)
+        for i in range(0, len(text), self.chunk_chars):
+            if i and self.token_ms:
+                await asyncio.sleep(self.token_ms / 1000)
+            yield {"contentBlockDelta": {"delta": {"text": text[i:i + self.chunk_chars]}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+        yield {
+            "metadata": {
+                "usage": {"inputTokens": 100, "outputTokens": len(text), "totalTokens": 100 + len(text)},
+                "metrics": {"latencyMs": int(self.first_token_ms)},
+            }
+        }
+
+
+class PromptCacheSimulator:
+    """
+    Bedrock 프롬프트 캐시 대역
+
+    BedrockModel.format_request()로 만든 요청 본문을 toolConfig → system → messages 순서로 블록마다
+    prefix를 해시하여, 이전 요청이 체크포인트에 써 둔 prefix와 일치하는 가장 긴 부분은 캐시 읽기,
+    이번 체크포인트까지 새로운 부분은 캐시 쓰기로 셉니다 (prefix가 min_cache_tokens 이상일 때만).
+    토큰 수는 글자 수 / 2.5로 추정합니다.
+    """
+
+    def __init__(self, min_cache_tokens: int = 1024):
+        self.min_cache_tokens = min_cache_tokens
+        self.cache = {}
+
+    @staticmethod
+    def tokens(chars: int) -> int:
+        return int(chars / 2.5)
+
+    def prefixes(self, request: dict) -> Tuple[list, int]:
+        """블록 경계마다 (prefix 해시, prefix 토큰 수, 체크포인트 여부)와 전체 토큰 수"""
+        digest = hashlib.sha256()
+        chars = 0
+        prefixes = []
+        sections = [request.get("toolConfig", {}).get("tools", []), request.get("system", [])]
+        sections += [message["content"] for message in request["messages"]]
+        for blocks in sections:
+            for block in blocks:
+                if "cachePoint" in block:
+                    prefixes[-1] = (prefixes[-1][0], prefixes[-1][1], True)
+                    continue
+                text = json.dumps(block, ensure_ascii=False, sort_keys=True)
+                digest.update(text.encode("utf-8"))
+                chars += len(text)
+                prefixes.append((digest.hexdigest(), self.tokens(chars), False))
+        return prefixes, self.tokens(chars)
+
+    def usage(self, request: dict) -> Tuple[int, int, int]:
+        """요청 하나의 (캐시 읽기, 캐시 쓰기, 전체) 토큰 수 (이번 체크포인트를 캐시에 씀)"""
+        prefixes, total = self.prefixes(request)
+        read = max((tokens for key, tokens, _ in prefixes if key in self.cache), default=0)
+        written = 0
+        for key, tokens, checkpoint in prefixes:
+            if checkpoint and tokens >= self.min_cache_tokens and key not in self.cache:
+                self.cache[key] = tokens
+                written = max(written, tokens - read)
+        return read, written, total
+
+
+def last_user_text(messages: list) -> str:
+    """마지막 사용자 메시지의 텍스트"""
+    for message in reversed(messages):
+        if message["role"] == "user":
+            for block in message["content"]:
+                if "text" in block:
+                    return block["text"]
+    return ""
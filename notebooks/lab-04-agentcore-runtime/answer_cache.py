@@ -0,0 +1,355 @@
+"""
+자주 묻는 정책 질문의 유사 질문 답변 캐시
+"반품 기간이 어떻게 되나요?", "반품 기간 며칠이에요?"처럼 표현만 조금 다른 정책 질문이 트래픽의 큰
+부분을 차지합니다. 이전에 모델이 답한 질문과 충분히 비슷하면 저장된 답변으로 바로 응답해 모델 호출을
+건너뜁니다.
+
+1. 정규화: NFKC, 소문자, 문장 부호 제거, 띄어쓰기 무시 (한국어는 띄어쓰기가 제각각이므로)
+2. 캐시 대상 판별: 의도 분류기(model_router)가 캐시 가능 의도(기본값 faq)로 분류하고, 주문번호/
+   시리얼 번호나 "제가 산", "그럼 그건" 같은 개인 정보/앞 대화 의존 표현이 없을 때만.
+   모든 세션이 공유하므로 저장은 더 엄격하게: 앞 대화가 없고 도구를 호출하지 않은 턴의 답변만,
+   답변에도 주문번호나 "고객님의 주문", "말씀하신" 같은 고객별/맥락 의존 표현이 없을 때만 저장
+3. 검색: 문자 2-3-gram TF-IDF 코사인 유사도 (메모리 역색인) >= threshold, 그리고 주제어 집합
+   (반품/교환/배송/비용/기간 등)이 같아야 적중. "반품 기간"과 "교환 기간"처럼 글자는 비슷해도
+   다른 질문에 잘못 답하지 않도록 함
+4. TTL, 최대 항목 수(LRU), 적중률 지표(stats, metrics())
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Sequence, Set, Tuple
+
+try:
+    from helpers.fast_path import extract_entities
+    from helpers.model_router import IntentClassifier
+except ImportError:
+    try:
+        from src.helpers.fast_path import extract_entities
+        from src.helpers.model_router import IntentClassifier
+    except ImportError:  # 런타임 컨테이너 (같은 디렉토리)
+        from fast_path import extract_entities
+        from model_router import IntentClassifier
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_ENABLED = os.environ.get("ANSWER_CACHE", "true").lower() == "true"
+CACHEABLE_INTENTS = tuple(
+    intent.strip() for intent in os.environ.get("ANSWER_CACHE_INTENTS", "faq").split(",") if intent.strip()
+)
+
+# 같은 질문으로 볼 주제어 (주제어 집합이 다르면 유사도가 높아도 다른 질문)
+TOPICS: Dict[str, re.Pattern] = {
+    "반품": re.compile(r"반품|돌려보내"),
+    "교환": re.compile(r"교환|바꾸|바꿔"),
+    "환불": re.compile(r"환불"),
+    "배송": re.compile(r"배송|택배|도착|출고"),
+    "비용": re.compile(r"얼마(?!나)|비용|요금|수수료|배송비|택배비|무료|유료|부담"),
+    "기간": re.compile(r"기간|며칠|기한|언제까지|이내|걸려|걸리"),
+    "고객센터": re.compile(r"고객센터|상담|운영\s*시간|전화|연락"),
+    "변심": re.compile(r"변심"),
+    "뷰티": re.compile(r"화장품|뷰티|개봉|사용한"),
+    "해외": re.compile(r"해외"),
+    "적립": re.compile(r"적립|포인트|쿠폰"),
+    "부정": re.compile(r"안\s*되|안\s*돼|불가|못\s*하"),
+}
+# 고객 본인의 주문/상품에 대한 질문 (답변이 사람마다 다름)
+PERSONAL = re.compile(r"(?:^|\s)(?:제|내|저의|나의)\s|제가|내가|저희|주문한|구매한|받은|산\s|샀")
+# 앞 대화에 의존하는 질문 (저장된 답변이 맥락과 맞지 않을 수 있음)
+CONTEXTUAL = re.compile(r"그럼|그거|그건|그것|그게|이거|이건|저거|아까|방금|위에서")
+# 특정 고객의 주문/계정이나 앞 대화를 전제로 한 답변 (다른 세션에 돌려주면 안 됨)
+PERSONAL_ANSWER = re.compile(
+    r"고객님의\s*(?:주문|상품|계정|회원|포인트|쿠폰|배송|반품|교환|환불)|회원님의|접수\s*번호|말씀하신|앞서|아까"
+)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+# 뜻에 영향이 없는 질문 어미/군말 (n-gram 비교에서만 제외)
+_FILLER = re.compile(
+    r"어떻게|알려\s*주세요|알고\s*싶어요|궁금(?:합니다|해요)|혹시|보통|가능한가요|가능해요|가능|인가요|이에요|"
+    r"예요|되나요|돼요|되요|나요|까요|해요|요$"
+)
+_PARTICLE = re.compile(r"(?<=[가-힣])(?:은|는|이|가|을|를|도|까지|으로|로|에서|에|의)(?=\s|$)")
+
+
+def normalize(text: str) -> str:
+    """비교용 정규화: NFKC, 소문자, 문장 부호 제거, 공백 정리"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _SPACES.sub(" ", _PUNCTUATION.sub(" ", text)).strip()
+
+
+def content_text(normalized: str) -> str:
+    """질문 어미/군말과 어절 끝 조사를 뺀 내용어 (정규화된 텍스트 기준)"""
+    text = _PARTICLE.sub("", _FILLER.sub(" ", normalized))
+    return _SPACES.sub(" ", text).strip()
+
+
+def char_ngrams(normalized: str, sizes: Sequence[int] = (2, 3)) -> Counter:
+    """질문 어미와 띄어쓰기를 뺀 문자 n-gram 빈도"""
+    compact = content_text(normalized).replace(" ", "")
+    return Counter(compact[i:i + n] for n in sizes for i in range(len(compact) - n + 1))
+
+
+def topics(text: str) -> FrozenSet[str]:
+    return frozenset(name for name, pattern in TOPICS.items() if pattern.search(text))
+
+
+class CachedAnswer:
+    """캐시 항목: 원래 질문, n-gram, 주제어, 답변, 의도, 저장 시각, 적중 횟수"""
+
+    def __init__(self, question: str, grams: Counter, topic_set: FrozenSet[str], answer: str, intent: str):
+        self.question = question
+        self.grams = grams
+        self.topics = topic_set
+        self.answer = answer
+        self.intent = intent
+        self.created_at = time.monotonic()
+        self.hits = 0
+
+
+class AnswerCacheHit:
+    """적중 결과: 답변, 저장된 질문, 유사도, 검색 시간"""
+
+    def __init__(self, answer: str, question: str, similarity: float, latency_ms: float):
+        self.answer = answer
+        self.question = question
+        self.similarity = similarity
+        self.latency_ms = latency_ms
+
+
+class AnswerCache:
+    """
+    유사 질문 답변 캐시 (프로세스 메모리, 모든 세션이 공유)
+
+    lookup()으로 적중하면 record()로 대화 기록에 질문/답변을 남기고, 모델이 답한 턴은 store_turn()으로
+    저장합니다. 캐시 대상이 아닌 질문은 둘 다 아무것도 하지 않습니다.
+
+    Args:
+        threshold: 적중으로 볼 최소 코사인 유사도
+        ttl_seconds: 답변 유지 시간 (정책이 바뀌면 이 시간 안에 반영)
+        max_entries: 최대 항목 수 (넘으면 가장 오래 쓰이지 않은 항목부터 제거)
+        intents: 캐시할 의도 (의도 분류 결과가 이 중 하나일 때만)
+        min_confidence: 의도 분류 확률이 이보다 낮으면 캐시하지 않음
+        max_chars: 이보다 긴 질문은 여러 내용을 담고 있을 가능성이 높으므로 캐시하지 않음
+        classifier: 의도 분류기 (기본값: 첫 사용 때 학습하는 IntentClassifier)
+        enabled: False이면 항상 미적중 (ANSWER_CACHE=false)
+
+    stats: hits, misses, stored, expired, evicted, skip:<이유> (empty/long/personal/contextual/intent,
+    저장 시 history/tool/answer)
+    """
+
+    def __init__(
+        self,
+        threshold: float = float(os.environ.get("ANSWER_CACHE_THRESHOLD", "0.45")),
+        ttl_seconds: float = float(os.environ.get("ANSWER_CACHE_TTL_SECONDS", "3600")),
+        max_entries: int = int(os.environ.get("ANSWER_CACHE_MAX_ENTRIES", "512")),
+        intents: Sequence[str] = CACHEABLE_INTENTS,
+        min_confidence: float = 0.6,
+        max_chars: int = 80,
+        classifier: Optional[IntentClassifier] = None,
+        enabled: bool = ANSWER_CACHE_ENABLED,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.intents = frozenset(intents)
+        self.min_confidence = min_confidence
+        self.max_chars = max_chars
+        self.enabled = enabled
+        self.stats: Counter = Counter()
+        self._classifier = classifier
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        self._index: Dict[str, Set[int]] = {}
+        self._df: Counter = Counter()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def classifier(self) -> IntentClassifier:
+        # 학습에 수십 ms가 걸리므로 시작 시간이 아닌 첫 요청에서
+        if self._classifier is None:
+            self._classifier = IntentClassifier()
+        return self._classifier
+
+    def cacheable(self, text: str) -> Tuple[bool, str]:
+        """(캐시 대상 여부, 이유 또는 의도)"""
+        if not text or not text.strip():
+            return False, "empty"
+        if len(text) > self.max_chars:
+            return False, "long"
+        entities = extract_entities(text)
+        if entities["order_numbers"] or "serial_number" in entities or PERSONAL.search(text):
+            return False, "personal"
+        if CONTEXTUAL.search(text):
+            return False, "contextual"
+        prediction = self.classifier.predict(text)
+        if prediction.intent not in self.intents or prediction.confidence < self.min_confidence:
+            return False, "intent"
+        return True, prediction.intent
+
+    def _similarity(self, grams: Counter, entry: CachedAnswer, idf: Dict[str, float]) -> float:
+        dot = sum(count * entry.grams.get(gram, 0) * idf[gram] ** 2 for gram, count in grams.items())
+        if not dot:
+            return 0.0
+        query_norm = math.sqrt(sum((count * idf[gram]) ** 2 for gram, count in grams.items()))
+        entry_norm = math.sqrt(sum((count * self._idf(gram)) ** 2 for gram, count in entry.grams.items()))
+        return dot / (query_norm * entry_norm)
+
+    def _idf(self, gram: str) -> float:
+        return math.log((1 + len(self._entries)) / (1 + self._df.get(gram, 0))) + 1
+
+    def _best(self, grams: Counter, topic_set: FrozenSet[str]) -> Tuple[Optional[int], float]:
+        """주제어가 같은 항목 중 유사도가 가장 높은 (항목 id, 유사도)"""
+        candidates: Set[int] = set()
+        for gram in grams:
+            candidates |= self._index.get(gram, set())
+        idf = {gram: self._idf(gram) for gram in grams}
+        best_id, best_similarity = None, 0.0
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            if entry.topics != topic_set:
+                continue
+            similarity = self._similarity(grams, entry, idf)
+            if similarity > best_similarity:
+                best_id, best_similarity = entry_id, similarity
+        return best_id, best_similarity
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        for gram in entry.grams:
+            self._df[gram] -= 1
+            if not self._df[gram]:
+                del self._df[gram]
+            ids = self._index.get(gram)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._index[gram]
+
+    def _expire(self) -> None:
+        deadline = time.monotonic() - self.ttl_seconds
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry.created_at < deadline]
+        for entry_id in expired:
+            self._remove(entry_id)
+        if expired:
+            self.stats["expired"] += len(expired)
+
+    def lookup(self, text: str) -> Optional[AnswerCacheHit]:
+        if not self.enabled:
+            return None
+        start = time.perf_counter()
+        ok, reason = self.cacheable(text)
+        if not ok:
+            self.stats[f"skip:{reason}"] += 1
+            return None
+        normalized = normalize(text)
+        grams = char_ngrams(normalized)
+        with self._lock:
+            self._expire()
+            entry_id, similarity = self._best(grams, topics(normalized))
+            if entry_id is None or similarity < self.threshold:
+                self.stats["misses"] += 1
+                return None
+            entry = self._entries[entry_id]
+            self._entries.move_to_end(entry_id)
+            entry.hits += 1
+            self.stats["hits"] += 1
+        latency_ms = (time.perf_counter() - start) * 1000
+        logger.info("답변 캐시 적중: similarity=%.2f '%s' -> '%s' (%.2fms)",
+                    similarity, text, entry.question, latency_ms)
+        return AnswerCacheHit(entry.answer, entry.question, similarity, latency_ms)
+
+    def store(self, text: str, answer: str) -> bool:
+        """모델이 답한 질문/답변 저장 (캐시 대상이 아니거나 이미 비슷한 질문이 있으면 False)"""
+        if not self.enabled or not answer or not answer.strip():
+            return False
+        ok, intent = self.cacheable(text)
+        if not ok:
+            return False
+        if not self.answer_cacheable(answer):
+            self.stats["skip:answer"] += 1
+            return False
+        normalized = normalize(text)
+        grams = char_ngrams(normalized)
+        if not grams:
+            return False
+        topic_set = topics(normalized)
+        with self._lock:
+            self._expire()
+            entry_id, similarity = self._best(grams, topic_set)
+            if entry_id is not None and similarity >= self.threshold:
+                return False
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats["evicted"] += 1
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = CachedAnswer(text, grams, topic_set, answer, intent)
+            for gram in grams:
+                self._df[gram] += 1
+                self._index.setdefault(gram, set()).add(entry_id)
+            self.stats["stored"] += 1
+        return True
+
+    def answer_cacheable(self, answer: str) -> bool:
+        """답변에 주문번호/시리얼 번호나 특정 고객·앞 대화를 전제로 한 표현이 없는지"""
+        entities = extract_entities(answer)
+        return not (entities["order_numbers"] or "serial_number" in entities or PERSONAL_ANSWER.search(answer))
+
+    def store_turn(self, agent, text: str) -> bool:
+        """
+        방금 끝난 턴의 마지막 assistant 텍스트를 답변으로 저장
+
+        앞 대화가 있거나 도구를 호출한 턴은 답변이 그 세션의 맥락/조회 결과에 따라 달라질 수 있으므로
+        저장하지 않습니다.
+        """
+        messages = agent.messages
+        if not self.enabled or not messages or messages[-1]["role"] != "assistant":
+            return False
+        # 이번 턴의 시작 = 마지막 고객 메시지 (도구 결과를 담은 user 메시지는 제외)
+        start = next((index for index in range(len(messages) - 1, -1, -1)
+                      if messages[index]["role"] == "user"
+                      and not any("toolResult" in block for block in messages[index]["content"])), None)
+        if start != 0:
+            self.stats["skip:history"] += 1
+            return False
+        if any("toolUse" in block for message in messages for block in message["content"]):
+            self.stats["skip:tool"] += 1
+            return False
+        answer = "".join(block["text"] for block in messages[-1]["content"] if "text" in block)
+        return self.store(text, answer)
+
+    @staticmethod
+    def record(agent, text: str, answer: str) -> None:
+        """캐시 답변도 대화 기록에 남겨 다음 턴에서 맥락 유지"""
+        agent.messages.extend([
+            {"role": "user", "content": [{"text": text}]},
+            {"role": "assistant", "content": [{"text": answer}]},
+        ])
+        agent.conversation_manager.apply_management(agent)
+
+    def clear(self) -> None:
+        """저장된 답변을 모두 지움 (정책이 바뀌었을 때, 또는 벤치마크 사이에)"""
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+            self._df.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def metrics(self) -> Dict[str, Any]:
+        """항목 수, 적중/미적중, 적중률 (캐시 대상 질문 기준)"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "hits": self.stats["hits"],
+            "misses": self.stats["misses"],
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            **{name: count for name, count in self.stats.items() if name not in ("hits", "misses")},
+        }
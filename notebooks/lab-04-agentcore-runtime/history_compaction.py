@@ -0,0 +1,278 @@
+"""
+긴 상담 세션의 대화 기록 압축
+반품/교환 협의처럼 턴이 길어지는 세션에서 매 모델 호출마다 이전 턴 전체(장황한 도구
+결과 포함)를 다시 보내지 않도록 agent.messages를 줄입니다.
+
+- 슬라이딩 윈도우: 최근 window_size개 메시지만 유지 (항상 사용자 텍스트 메시지에서 시작)
+- 도구 결과 요약: 최근 메시지가 아닌 toolResult는 도구명/상태/핵심 줄만 남긴 짧은 요약으로 교체
+- 대화 요약(선택): 추정 토큰 수가 summary_token_threshold를 넘으면 오래된 턴을 요약문으로 대체
+  (호출이 끝난 뒤 AfterInvocationEvent에서 요약 모델을 별도 스레드로 호출하므로 이벤트 루프를 막지 않음)
+
+strands ConversationManager이므로 Agent(conversation_manager=...)에 그대로 넣으면 됩니다.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from strands.agent.conversation_manager import ConversationManager
+from strands.hooks import AfterInvocationEvent, HookRegistry
+from strands.types.exceptions import ContextWindowOverflowException
+
+logger = logging.getLogger(__name__)
+
+DIGEST_PREFIX = "[도구 결과 요약]"
+SUMMARY_PREFIX = "[이전 대화 요약]"
+
+SUMMARY_PROMPT = """당신은 고객 상담 기록을 요약하는 도우미입니다.
+다음 대화를 이어서 상담할 직원이 읽을 요약을 한국어로 작성하세요.
+- 주문번호, 상품명, 사이즈/색상, 반품·교환 사유와 진행 상태를 빠짐없이 포함
+- 고객이 요청했지만 아직 처리되지 않은 일을 명시
+- 인사말이나 반복 표현은 생략하고 10줄 이내로 작성"""
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], chars_per_token: float = 2.5) -> int:
+    """
+    메시지 목록의 대략적인 토큰 수 (한국어/영어 혼합 텍스트 기준 글자 수 / chars_per_token)
+
+    정확한 토크나이저 없이 요약 시점을 정하는 데만 사용합니다.
+    """
+    chars = 0
+    for message in messages:
+        for block in message.get("content", []):
+            if "text" in block:
+                chars += len(block["text"])
+            else:
+                chars += len(json.dumps(block, ensure_ascii=False, default=str))
+    return int(chars / chars_per_token)
+
+
+def _tool_names(messages: List[Dict[str, Any]]) -> Dict[str, str]:
+    """toolUseId -> 도구 이름"""
+    names = {}
+    for message in messages:
+        for block in message.get("content", []):
+            tool_use = block.get("toolUse")
+            if tool_use:
+                names[tool_use.get("toolUseId")] = tool_use.get("name", "unknown")
+    return names
+
+
+def _result_text(result: Dict[str, Any]) -> str:
+    parts = []
+    for item in result.get("content", []):
+        if "text" in item:
+            parts.append(item["text"])
+        elif "json" in item:
+            parts.append(json.dumps(item["json"], ensure_ascii=False, default=str))
+    return "\n".join(parts)
+
+
+def digest_tool_result(name: str, result: Dict[str, Any], max_chars: int = 120) -> str:
+    """
+    도구 결과를 한 줄 요약으로 변환
+
+    형식: [도구 결과 요약] 도구명 (상태): 핵심 줄 | 핵심 줄 ... (원본 N자)
+    "키: 값" 형태의 줄(주문번호, 상태, 금액 등)을 우선으로 남깁니다.
+    """
+    text = _result_text(result)
+    lines = [line.strip(" -•*\t") for line in text.splitlines() if line.strip(" -•*\t")]
+    key_lines = [line for line in lines if ":" in line]
+    # 첫 줄은 보통 결과 제목("✅ 반품 가능" 등)이므로 항상 포함
+    picked = lines[:1] + [line for line in key_lines if line not in lines[:1]]
+
+    summary = ""
+    for line in picked:
+        candidate = f"{summary} | {line}" if summary else line
+        if len(candidate) > max_chars:
+            break
+        summary = candidate
+    if not summary:
+        summary = text[:max_chars]
+    return f"{DIGEST_PREFIX} {name} ({result.get('status', 'success')}): {summary} (원본 {len(text)}자)"
+
+
+def transcript(messages: List[Dict[str, Any]]) -> str:
+    """요약 모델에 넘길 대화 텍스트 (도구 호출/결과는 한 줄로)"""
+    lines = []
+    names = _tool_names(messages)
+    for message in messages:
+        role = "고객" if message["role"] == "user" else "상담원"
+        for block in message.get("content", []):
+            if "text" in block:
+                lines.append(f"{role}: {block['text']}")
+            elif "toolUse" in block:
+                tool_use = block["toolUse"]
+                lines.append(f"상담원 도구 호출: {tool_use.get('name')} {json.dumps(tool_use.get('input'), ensure_ascii=False)}")
+            elif "toolResult" in block:
+                result = block["toolResult"]
+                text = _result_text(result)
+                if not text.startswith(DIGEST_PREFIX):
+                    text = digest_tool_result(names.get(result.get("toolUseId"), "unknown"), result, max_chars=400)
+                lines.append(text)
+    return "\n".join(lines)
+
+
+def model_summarizer(model, system_prompt: str = SUMMARY_PROMPT) -> Callable[[str], str]:
+    """에이전트와 같은 모델로 대화 요약문을 만드는 함수 (도구 없이 한 번 호출)"""
+
+    def summarize(text: str) -> str:
+        from strands import Agent
+
+        summary_agent = Agent(model=model, system_prompt=system_prompt, callback_handler=None)
+        return str(summary_agent(text)).strip()
+
+    return summarize
+
+
+class HistoryCompactionManager(ConversationManager):
+    """
+    슬라이딩 윈도우 + 도구 결과 요약 + (선택) 대화 요약
+
+    매 에이전트 호출이 끝날 때 다음 순서로 적용됩니다.
+    1. 최근 keep_tool_results_messages개 메시지 밖의 도구 결과를 요약으로 교체 (apply_management)
+    2. summarizer가 있고 추정 토큰이 summary_token_threshold를 넘으면 오래된 턴을 요약
+       (AfterInvocationEvent, summarizer는 asyncio.to_thread로 호출)
+    3. 메시지 수가 window_size를 넘으면 오래된 턴 삭제 (요약할 차례이면 요약 뒤에 삭제)
+
+    요약문은 별도 메시지가 아니라 남은 첫 사용자 메시지의 원래 내용 뒤에 텍스트 블록으로 붙이므로
+    user/assistant 순서와 content[0](고객 질문)이 그대로 유지됩니다.
+
+    Args:
+        window_size: 유지할 최대 메시지 수
+        keep_tool_results_messages: 원본 도구 결과를 유지할 최근 메시지 수
+        digest_chars: 도구 결과 요약의 최대 글자 수
+        summary_token_threshold: 대화 요약을 시작할 추정 토큰 수 (None이면 요약하지 않음)
+        summary_keep_messages: 요약 후에도 원문으로 남길 최근 메시지 수
+        summarizer: 대화 텍스트 -> 요약문 함수 (예: model_summarizer(model))
+    """
+
+    def __init__(
+        self,
+        window_size: int = 40,
+        keep_tool_results_messages: int = 4,
+        digest_chars: int = 120,
+        summary_token_threshold: Optional[int] = None,
+        summary_keep_messages: int = 10,
+        summarizer: Optional[Callable[[str], str]] = None,
+    ):
+        super().__init__()
+        self.window_size = window_size
+        self.keep_tool_results_messages = keep_tool_results_messages
+        self.digest_chars = digest_chars
+        self.summary_token_threshold = summary_token_threshold
+        self.summary_keep_messages = summary_keep_messages
+        self.summarizer = summarizer
+        self.summary: Optional[str] = None
+        self.stats = {"digested_tool_results": 0, "summaries": 0, "trimmed_messages": 0}
+
+    # ------------------------------------------------------------
+    # ConversationManager 인터페이스
+    # ------------------------------------------------------------
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        super().register_hooks(registry, **kwargs)
+        registry.add_callback(AfterInvocationEvent, self.summarize_history)
+
+    def apply_management(self, agent, **kwargs: Any) -> None:
+        messages = agent.messages
+        self._digest_tool_results(messages, len(messages) - self.keep_tool_results_messages)
+
+        # 요약할 차례이면 오래된 턴을 요약한 뒤에 자르도록 summarize_history에 맡김
+        if len(messages) > self.window_size and not self._needs_summary(messages):
+            self._trim(messages, len(messages) - self.window_size)
+
+    async def summarize_history(self, event: AfterInvocationEvent) -> None:
+        """추정 토큰이 임계값을 넘으면 오래된 턴을 요약문으로 대체합니다."""
+        messages = event.agent.messages
+        if not self._needs_summary(messages):
+            return
+        index = self._trim_point(messages, len(messages) - self.summary_keep_messages)
+        if index is not None:
+            text = transcript(messages[:index])
+            if self.summary:
+                text = f"{SUMMARY_PREFIX}\n{self.summary}\n\n{text}"
+            try:
+                # 요약 모델 호출은 동기 함수이므로 다른 세션의 스트림이 멈추지 않도록 스레드에서 실행
+                self.summary = await asyncio.to_thread(self.summarizer, text)
+            except Exception as e:
+                # 요약 실패 시에는 윈도우만으로 관리
+                logger.warning("대화 요약 실패: %s", e)
+            else:
+                self.stats["summaries"] += 1
+                self._trim(messages, index)
+
+        if len(messages) > self.window_size:
+            self._trim(messages, len(messages) - self.window_size)
+
+    def reduce_context(self, agent, e: Optional[Exception] = None, **kwargs: Any) -> None:
+        """컨텍스트 초과 시: 마지막 메시지를 제외한 도구 결과를 모두 요약하고, 그래도 안 되면 절반 삭제"""
+        messages = agent.messages
+        if self._digest_tool_results(messages, len(messages) - 1):
+            return
+        if not self._trim(messages, max(2, len(messages) // 2)) and e is not None:
+            raise ContextWindowOverflowException("대화 기록을 더 줄일 수 없습니다") from e
+
+    def get_state(self) -> Dict[str, Any]:
+        return {**super().get_state(), "summary": self.summary}
+
+    def restore_from_session(self, state: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        super().restore_from_session(state)
+        self.summary = state.get("summary")
+        return None
+
+    # ------------------------------------------------------------
+    # 압축 단계
+    # ------------------------------------------------------------
+    def _digest_tool_results(self, messages: List[Dict[str, Any]], end: int) -> int:
+        """messages[:end]의 원본 도구 결과를 요약으로 교체하고 교체한 개수 반환"""
+        names = None
+        digested = 0
+        for message in messages[:max(end, 0)]:
+            for block in message.get("content", []):
+                result = block.get("toolResult")
+                if not result or _result_text(result).startswith(DIGEST_PREFIX):
+                    continue
+                names = names or _tool_names(messages)
+                digest = digest_tool_result(names.get(result.get("toolUseId"), "unknown"), result, self.digest_chars)
+                # 짧은 결과는 요약이 더 길어질 수 있으므로 줄어드는 경우에만 교체
+                if len(digest) < len(_result_text(result)):
+                    result["content"] = [{"text": digest}]
+                    digested += 1
+        self.stats["digested_tool_results"] += digested
+        return digested
+
+    def _trim_point(self, messages: List[Dict[str, Any]], start: int) -> Optional[int]:
+        """start 이후 첫 '사용자 텍스트' 메시지 위치 (도구 결과 메시지에서는 자르지 않음)"""
+        for index in range(max(start, 1), len(messages)):
+            message = messages[index]
+            if message["role"] == "user" and not any("toolResult" in block for block in message["content"]):
+                return index
+        return None
+
+    def _trim(self, messages: List[Dict[str, Any]], start: int) -> bool:
+        """messages[:trim_point] 삭제 후 요약문을 새 첫 메시지에 다시 붙임"""
+        index = self._trim_point(messages, start)
+        if index is None:
+            logger.debug("대화 기록을 자를 위치가 없습니다 (메시지 %d개)", len(messages))
+            return False
+        del messages[:index]
+        self.removed_message_count += index
+        self.stats["trimmed_messages"] += index
+        self._attach_summary(messages)
+        return True
+
+    def _needs_summary(self, messages: List[Dict[str, Any]]) -> bool:
+        return bool(
+            self.summarizer
+            and self.summary_token_threshold
+            and estimate_tokens(messages) > self.summary_token_threshold
+        )
+
+    def _attach_summary(self, messages: List[Dict[str, Any]]):
+        if not self.summary or not messages:
+            return
+        # 메모리 훅 등은 content[0]을 고객 질문으로 읽으므로 요약은 원래 내용 뒤에 붙임
+        content = [block for block in messages[0]["content"]
+                   if not block.get("text", "").startswith(SUMMARY_PREFIX)]
+        messages[0]["content"] = content + [{"text": f"{SUMMARY_PREFIX}\n{self.summary}"}]
@@ -0,0 +1,275 @@
+"""
+멱등 도구 결과 재사용 (memoization)
+한 세션에서 모델은 web_search, check_return_policy, get_color_matching_advice, check_size_availability
+같은 조회 도구를 같은 인자로 여러 번 호출합니다. 멱등(idempotent)으로 지정한 도구만 결과를 저장해 두고,
+같은 호출이 오면 도구를 실행하지 않고 저장된 결과를 바로 돌려줍니다.
+
+- BeforeToolCallEvent: 저장된 결과가 있으면 selected_tool을 결과를 돌려주는 도구로 교체
+  (tool_speculation과 같은 방식), 도구 span에 tool.memo.* 속성을 남겨 트레이스에서 적중 확인
+- AfterToolCallEvent: 성공한 결과만 저장 (오류/시간 초과 결과는 저장하지 않음)
+- 키: 도구 이름 + 정규화한 인자 (스키마 기본값 채움, None 제거, 공백/유니코드 정규화, 인자 순서 무관)
+- 범위: SESSION은 ToolMemoizer 인스턴스(= 세션)마다, GLOBAL은 프로세스 전체가 공유
+  (주문/재고처럼 고객이나 시점에 따라 달라지는 조회는 SESSION + 짧은 TTL)
+
+대상은 DEFAULT_POLICIES(도구 이름/패턴)나 도구에 붙인 idempotent 표시로 지정합니다. 반품/교환 신청처럼
+부수 효과가 있는 도구(NEVER_SPECULATE)는 지정하면 ValueError가 발생하고, 어떤 경우에도 저장하지 않습니다.
+"""
+
+import fnmatch
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from opentelemetry import trace as trace_api
+from strands.hooks import AfterToolCallEvent, BeforeToolCallEvent, HookProvider, HookRegistry
+from strands.types.tools import AgentTool
+
+try:
+    from helpers.tool_speculation import NEVER_SPECULATE, base_tool_name, call_key
+except ImportError:
+    try:
+        from src.helpers.tool_speculation import NEVER_SPECULATE, base_tool_name, call_key
+    except ImportError:  # 런타임 컨테이너 (같은 디렉토리)
+        from tool_speculation import NEVER_SPECULATE, base_tool_name, call_key
+
+logger = logging.getLogger(__name__)
+
+SESSION, GLOBAL = "session", "global"
+
+TOOL_MEMO_ENABLED = os.environ.get("TOOL_MEMO", "true").lower() == "true"
+MAX_ENTRIES = int(os.environ.get("TOOL_MEMO_MAX_ENTRIES", "1024"))
+
+# 절대 저장하지 않는 부수 효과 도구 (도구 선실행과 같은 목록)
+NEVER_MEMOIZE = NEVER_SPECULATE
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class MemoPolicy:
+    """도구 결과 재사용 설정"""
+    ttl_seconds: float
+    scope: str = SESSION
+
+
+# 도구 이름/패턴 -> 재사용 설정. 정확히 같은 이름이 우선이고, 그다음은 앞에서부터 처음 맞는 패턴
+DEFAULT_POLICIES: Dict[str, MemoPolicy] = {
+    "web_search": MemoPolicy(600, GLOBAL),
+    "*___web_search": MemoPolicy(600, GLOBAL),
+    "check_return_policy": MemoPolicy(3600, GLOBAL),
+    "get_color_matching_advice": MemoPolicy(3600, GLOBAL),
+    "get_styling_recommendations": MemoPolicy(3600, GLOBAL),
+    "get_product_recommendations": MemoPolicy(600, GLOBAL),
+    "check_size_availability": MemoPolicy(60, SESSION),  # 재고는 바뀌므로 짧게
+    "get_size_alternatives": MemoPolicy(60, SESSION),
+    "check_return_eligibility": MemoPolicy(300, SESSION),  # 고객 주문 정보
+}
+
+
+def _check_policy(tool_name: str, policy: MemoPolicy) -> MemoPolicy:
+    if tool_name in NEVER_MEMOIZE or base_tool_name(tool_name) in NEVER_MEMOIZE:
+        raise ValueError(f"부수 효과가 있는 도구는 결과를 재사용할 수 없습니다: {tool_name}")
+    if policy.scope not in (SESSION, GLOBAL):
+        raise ValueError(f"알 수 없는 범위: {policy.scope}")
+    return policy
+
+
+def idempotent(ttl_seconds: float = 300, scope: str = SESSION):
+    """
+    도구를 멱등으로 표시하는 데코레이터 (@tool 위에 붙임)
+
+        @idempotent(ttl_seconds=600, scope=GLOBAL)
+        @tool
+        def lookup_faq(question: str) -> str: ...
+    """
+
+    def mark(agent_tool: AgentTool) -> AgentTool:
+        agent_tool.memo_policy = _check_policy(agent_tool.tool_name, MemoPolicy(ttl_seconds, scope))
+        return agent_tool
+
+    return mark
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", value)).strip()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def canonical_input(tool_spec: Dict[str, Any], tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    """같은 호출이면 같은 값이 되도록 인자 정규화 (생략한 인자는 스키마 기본값으로 채움)"""
+    properties = tool_spec.get("inputSchema", {}).get("json", {}).get("properties", {})
+    defaults = {name: prop["default"] for name, prop in properties.items() if "default" in prop}
+    return _normalize({**defaults, **(tool_input or {})})
+
+
+class MemoStore:
+    """TTL/개수 제한이 있는 결과 저장소 (LRU, 여러 스레드에서 사용)"""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[Tuple[Dict[str, Any], float]]:
+        """(결과, 저장 후 지난 초) 또는 None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, expires_at, result = entry
+            if now >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result, now - stored_at
+
+    def put(self, key: Tuple[str, str], result: Dict[str, Any], ttl_seconds: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now, now + ttl_seconds, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# GLOBAL 범위 결과는 모든 세션이 공유
+GLOBAL_STORE = MemoStore()
+
+
+class _MemoizedTool(AgentTool):
+    """저장된 결과를 바로 돌려주는 도구 (memoized 표시가 있는 도구는 다른 도구 훅이 감싸지 않음)"""
+
+    memoized = True
+
+    def __init__(self, tool: AgentTool, result: Dict[str, Any]):
+        super().__init__()
+        self._tool = tool
+        self._result = result
+
+    @property
+    def tool_name(self) -> str:
+        return self._tool.tool_name
+
+    @property
+    def tool_spec(self):
+        return self._tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self._tool.tool_type
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        yield {**self._result, "toolUseId": tool_use["toolUseId"]}
+
+
+class ToolMemoizer(HookProvider):
+    """
+    멱등 도구 결과 재사용 훅 (세션마다 하나, 에이전트 풀/세션 상태에 에이전트와 함께 보관)
+
+    SESSION 범위 결과는 이 인스턴스에, GLOBAL 범위 결과는 GLOBAL_STORE에 저장합니다.
+    적중하면 selected_tool이 memoized 표시가 있는 도구로 바뀌고, SpeculativePrefetch/ToolTimeouts는
+    이 표시가 있는 도구를 감싸지 않습니다. 두 훅보다 앞에 등록해야 적중한 호출이 선실행 결과를
+    기다리거나 제한 시간에 걸리지 않습니다.
+
+    Args:
+        policies: 도구 이름/패턴 -> MemoPolicy (기본값에 덮어씀)
+        global_store: GLOBAL 범위 저장소 (기본값: GLOBAL_STORE)
+        enabled: False이면 아무것도 하지 않음 (TOOL_MEMO=false)
+
+    stats: hits, misses, stored, hit:<도구>
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, MemoPolicy]] = None,
+        global_store: Optional[MemoStore] = None,
+        enabled: bool = TOOL_MEMO_ENABLED,
+    ):
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        for name, policy in self.policies.items():
+            _check_policy(name, policy)
+        self.session_store = MemoStore()
+        self.global_store = global_store if global_store is not None else GLOBAL_STORE
+        self.enabled = enabled
+        self.stats: Counter = Counter()
+        self._hit_ids = set()
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeToolCallEvent, self.on_before_tool_call)
+        registry.add_callback(AfterToolCallEvent, self.on_after_tool_call)
+
+    def policy_for(self, agent, tool_name: str) -> Optional[MemoPolicy]:
+        if tool_name in NEVER_MEMOIZE or base_tool_name(tool_name) in NEVER_MEMOIZE:
+            return None
+        # 도구에 붙인 idempotent 표시 (앞선 훅이 selected_tool을 감쌌을 수 있어 등록된 도구에서 확인)
+        registered = agent.tool_registry.registry.get(tool_name)
+        policy = getattr(registered, "memo_policy", None)
+        if policy is not None:
+            return policy
+        if tool_name in self.policies:
+            return self.policies[tool_name]
+        return next((policy for pattern, policy in self.policies.items()
+                     if fnmatch.fnmatchcase(tool_name, pattern)), None)
+
+    def _key(self, tool: AgentTool, tool_use: Dict[str, Any]) -> Tuple[str, str]:
+        return call_key(tool_use["name"], canonical_input(tool.tool_spec, tool_use.get("input") or {}))
+
+    def _store(self, policy: MemoPolicy) -> MemoStore:
+        return self.global_store if policy.scope == GLOBAL else self.session_store
+
+    def on_before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        if not self.enabled or event.selected_tool is None:
+            return
+        tool_name = event.tool_use["name"]
+        policy = self.policy_for(event.agent, tool_name)
+        if policy is None:
+            return
+        cached = self._store(policy).get(self._key(event.selected_tool, event.tool_use))
+        span = trace_api.get_current_span()
+        if cached is None:
+            self.stats["misses"] += 1
+            span.set_attribute("tool.memo.hit", False)
+            return
+        result, age = cached
+        self.stats["hits"] += 1
+        self.stats[f"hit:{tool_name}"] += 1
+        span.set_attributes({"tool.memo.hit": True, "tool.memo.scope": policy.scope,
+                             "tool.memo.age_seconds": round(age, 3)})
+        logger.info("도구 결과 재사용 (%s, %s, %.0f초 전)", tool_name, policy.scope, age)
+        self._hit_ids.add(event.tool_use["toolUseId"])
+        event.selected_tool = _MemoizedTool(event.selected_tool, result)
+
+    def on_after_tool_call(self, event: AfterToolCallEvent) -> None:
+        if event.tool_use["toolUseId"] in self._hit_ids:
+            # 재사용한 결과는 다시 저장하지 않음 (TTL이 늘어나지 않도록)
+            self._hit_ids.discard(event.tool_use["toolUseId"])
+            return
+        if not self.enabled or event.selected_tool is None:
+            return
+        result = event.result
+        if event.exception is not None or not isinstance(result, dict) or result.get("status") != "success":
+            return
+        policy = self.policy_for(event.agent, event.tool_use["name"])
+        if policy is None:
+            return
+        self._store(policy).put(self._key(event.selected_tool, event.tool_use), result, policy.ttl_seconds)
+        self.stats["stored"] += 1
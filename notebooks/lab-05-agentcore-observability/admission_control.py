@@ -0,0 +1,222 @@
+"""
+런타임 엔트리포인트 승인 제어 (admission control)
+트래픽이 몰릴 때 모든 요청이 동시에 모델을 호출해 Bedrock 스로틀링이 연쇄적으로
+퍼지지 않도록, 동시 실행 수를 제한하고 나머지는 짧게 대기시키거나 즉시 거절합니다.
+
+- 동시 실행 제한: max_concurrency
+- 대기열: 최대 max_queue개, queue_timeout_seconds 안에 슬롯을 얻지 못하면 거절
+- 즉시 거절: 대기열이 가득 차면 바로 AdmissionRejected (retry_after_seconds 힌트 포함)
+- 게이지: 실행 중/대기 중 요청 수, 대기 시간 p50/p95, 거절/시간 초과 횟수
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """동시 실행 한도와 대기열이 모두 찬 경우"""
+
+    def __init__(self, reason: str, retry_after_seconds: float):
+        super().__init__(f"{reason} ({retry_after_seconds:.1f}초 후 재시도)")
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
+
+class _Waiter:
+    """대기열 항목 (동기: threading.Event, 비동기: 이벤트 루프 Future)"""
+
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.granted = False
+        self.loop = loop
+        self.future = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+
+    def wake(self):
+        if self.loop:
+            self.loop.call_soon_threadsafe(lambda: self.future.done() or self.future.set_result(True))
+        else:
+            self.event.set()
+
+
+class Ticket:
+    """승인된 요청 정보"""
+
+    def __init__(self, wait_ms: float):
+        self.wait_ms = wait_ms
+
+
+class AdmissionController:
+    """
+    동시 실행 한도 + 마감 시간이 있는 FIFO 대기열
+
+    슬롯이 반환되면 대기 중인 요청에게 바로 넘겨주므로 늦게 온 요청이 끼어들 수 없습니다.
+
+    Args:
+        max_concurrency: 동시에 실행할 최대 요청 수
+        max_queue: 대기열 최대 길이 (초과 시 즉시 거절)
+        queue_timeout_seconds: 대기열에서 기다릴 수 있는 최대 시간
+        min_retry_after_seconds: 거절 시 안내할 최소 재시도 대기 시간
+        log_interval_seconds: 거절 로그(게이지 포함)를 남기는 최소 간격
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_queue: int = 16,
+        queue_timeout_seconds: float = 5.0,
+        min_retry_after_seconds: float = 1.0,
+        log_interval_seconds: float = 10.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.min_retry_after_seconds = min_retry_after_seconds
+        self.log_interval_seconds = log_interval_seconds
+        self._last_log = float("-inf")
+        self._lock = threading.Lock()
+        self._waiters: Deque[_Waiter] = deque()
+        self._in_flight = 0
+        self._service_ewma_s = 0.0
+        self._wait_samples: Deque[float] = deque(maxlen=512)
+        self._counts = {"admitted": 0, "rejected": 0, "timed_out": 0}
+
+    # ------------------------------------------------------------
+    # 슬롯 관리
+    # ------------------------------------------------------------
+    def _enqueue(self, waiter: _Waiter) -> bool:
+        """즉시 승인되면 True, 대기열에 들어가면 False, 가득 찼으면 AdmissionRejected"""
+        with self._lock:
+            if self._in_flight < self.max_concurrency and not self._waiters:
+                self._in_flight += 1
+                return True
+            if len(self._waiters) >= self.max_queue:
+                self._counts["rejected"] += 1
+                retry_after = self._retry_after_locked()
+            else:
+                self._waiters.append(waiter)
+                return False
+        self._log_rejection("대기열 가득 참")
+        raise AdmissionRejected("동시 요청이 많아 처리할 수 없습니다", retry_after)
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """대기 포기. 그 사이에 슬롯을 이미 받았다면 True"""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            self._counts["timed_out"] += 1
+            retry_after = self._retry_after_locked()
+        self._log_rejection("대기 시간 초과")
+        raise AdmissionRejected("대기 시간이 초과되었습니다", retry_after)
+
+    def _log_rejection(self, reason: str):
+        """혼잡 시 로그가 폭주하지 않도록 log_interval_seconds마다 한 번만 게이지 기록"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_log < self.log_interval_seconds:
+                return
+            self._last_log = now
+        logger.warning("요청 거절 (%s): %s", reason, self.gauges())
+
+    def _release(self, service_s: float):
+        with self._lock:
+            self._service_ewma_s = service_s if not self._service_ewma_s else 0.8 * self._service_ewma_s + 0.2 * service_s
+            if self._waiters:
+                # 실행 중 수는 그대로 두고 슬롯을 다음 대기자에게 넘김
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                waiter.wake()
+            else:
+                self._in_flight -= 1
+
+    def _admitted(self, started: float) -> Ticket:
+        wait_ms = (time.monotonic() - started) * 1000
+        with self._lock:
+            self._counts["admitted"] += 1
+            self._wait_samples.append(wait_ms)
+        return Ticket(wait_ms)
+
+    def _retry_after_locked(self) -> float:
+        """대기열을 비우는 데 걸릴 예상 시간 (최근 평균 처리 시간 기준)"""
+        backlog = (len(self._waiters) + 1) / max(self.max_concurrency, 1)
+        return round(max(self.min_retry_after_seconds, backlog * self._service_ewma_s), 1)
+
+    # ------------------------------------------------------------
+    # 엔트리포인트용 컨텍스트 매니저
+    # ------------------------------------------------------------
+    @contextmanager
+    def admit(self):
+        """동기 엔트리포인트용. 승인되면 Ticket을 제공하고 종료 시 슬롯 반환"""
+        started = time.monotonic()
+        waiter = _Waiter()
+        if not self._enqueue(waiter):
+            if not waiter.event.wait(self.queue_timeout_seconds):
+                self._abandon(waiter)
+        ticket = self._admitted(started)
+        try:
+            yield ticket
+        finally:
+            self._release(time.monotonic() - started - ticket.wait_ms / 1000)
+
+    @asynccontextmanager
+    async def admit_async(self):
+        """비동기(스트리밍) 엔트리포인트용. 대기 중에도 이벤트 루프를 막지 않음"""
+        started = time.monotonic()
+        waiter = _Waiter(asyncio.get_running_loop())
+        if not self._enqueue(waiter):
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout_seconds)
+            except asyncio.TimeoutError:
+                self._abandon(waiter)
+            except asyncio.CancelledError:
+                # 클라이언트가 대기 중에 떠난 경우: 이미 받은 슬롯은 다음 대기자에게 넘김
+                with self._lock:
+                    granted = waiter.granted
+                    if not granted:
+                        self._waiters.remove(waiter)
+                if granted:
+                    self._release(0.0)
+                raise
+        ticket = self._admitted(started)
+        try:
+            yield ticket
+        finally:
+            self._release(time.monotonic() - started - ticket.wait_ms / 1000)
+
+    # ------------------------------------------------------------
+    # 상태 조회
+    # ------------------------------------------------------------
+    def is_busy(self) -> bool:
+        """모든 슬롯이 사용 중이면 True (ping의 HealthyBusy 판단용)"""
+        with self._lock:
+            return self._in_flight >= self.max_concurrency
+
+    def rejection_event(self, error: AdmissionRejected) -> Dict[str, Any]:
+        """스트리밍 응답에서 거절을 알리는 이벤트 (런타임 오류 이벤트와 같은 형태)"""
+        return {
+            "error": str(error),
+            "error_type": "ServerBusy",
+            "message": error.reason,
+            "retry_after_seconds": error.retry_after_seconds,
+        }
+
+    def gauges(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._wait_samples)
+            return {
+                "in_flight": self._in_flight,
+                "queued": len(self._waiters),
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "wait_ms_p50": round(waits[len(waits) // 2], 1) if waits else 0.0,
+                "wait_ms_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 1) if waits else 0.0,
+                **self._counts,
+            }
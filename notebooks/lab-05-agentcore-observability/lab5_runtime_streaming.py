@@ -5,55 +5,205 @@ Lab 05: AgentCore 관측성 테스트용
 이 파일은 Lab 04의 non-streaming 버전과 달리:
 - async def invoke() 사용
 - agent.stream_async() 사용
-- yield로 이벤트 스트리밍
+- yield로 이벤트 스트리밍 (stream_shaper로 묶어서 전송)
 """
-from bedrock_agentcore.runtime import BedrockAgentCoreApp
-from strands import Agent
-from strands.models import BedrockModel
-
-from ecommerce_tools import (
-    check_return_eligibility,
-    process_return_request,
-    get_product_recommendations,
-    ECOMMERCE_SYSTEM_PROMPT,
-    ECOMMERCE_MODEL_ID,
-)
+import functools
+import os
+
+# 모듈별 import 시간을 기록하려면 다른 import보다 먼저 프로파일러를 설치해야 함
+from runtime_startup import StartupProfiler, WarmUp, load_module
+
+profiler = StartupProfiler(enabled=os.environ.get("STARTUP_PROFILE", "true").lower() == "true").install()
+
+from bedrock_agentcore.runtime import BedrockAgentCoreApp, PingStatus  # noqa: E402
+from strands import Agent  # noqa: E402
+from strands.models import BedrockModel  # noqa: E402
+from strands.models.model import Model  # noqa: E402
+
+from admission_control import AdmissionController, AdmissionRejected  # noqa: E402
+from agent_session_pool import AgentSessionPool  # noqa: E402
+from answer_cache import AnswerCache  # noqa: E402
+from fast_path import FastPath  # noqa: E402
+from history_compaction import HistoryCompactionManager, model_summarizer  # noqa: E402
+from model_cache import cached_model  # noqa: E402
+from model_router import FAST_MODEL_ID, MODEL_ROUTING_ENABLED, routing_model  # noqa: E402
+from prompt_cache import cache_model_config, stable_tools, track_turn_usage  # noqa: E402
+from stream_shaper import StreamShaper  # noqa: E402
+from tool_memo import ToolMemoizer  # noqa: E402
+from tool_speculation import SpeculativePrefetch  # noqa: E402
+from tool_timeout import ToolTimeouts  # noqa: E402
 
 # ============================================================
 # 에이전트 및 런타임 앱 설정
 # ============================================================
-model = BedrockModel(model_id=ECOMMERCE_MODEL_ID)
+# RUNTIME_LAZY_STARTUP=true이면 도구 모듈 로드와 모델 생성을 서버 시작 후
+# 백그라운드 워밍업으로 미룸 (워밍업 동안 ping은 HealthyBusy, 요청은 워밍업 완료까지 대기)
+LAZY_STARTUP = os.environ.get("RUNTIME_LAZY_STARTUP", "false").lower() == "true"
+
+# 같은 디렉토리의 ecommerce_tools에서 도구와 설정 사용
+with profiler.step("ecommerce_tools"):
+    ecommerce_tools = load_module("ecommerce_tools", lazy=LAZY_STARTUP)
+
+
+@functools.lru_cache(maxsize=None)
+def get_full_model() -> Model:
+    """
+    모든 세션이 공유하는 모델 클라이언트 (PROMPT_CACHE=false가 아니면 시스템 프롬프트/도구 정의 캐시,
+    MODEL_CACHE=record/replay/deterministic이면 같은 모델 호출의 응답을 저장해 재생)
+    """
+    with profiler.step("BedrockModel"):
+        return cached_model(BedrockModel(model_id=ecommerce_tools.ECOMMERCE_MODEL_ID, **cache_model_config()))
+
+
+@functools.lru_cache(maxsize=None)
+def get_model() -> Model:
+    """세션 에이전트용 모델: 단순 FAQ/상태 문의는 빠른 모델로 라우팅 (MODEL_ROUTING=false이면 full 모델만)"""
+    if not MODEL_ROUTING_ENABLED:
+        return get_full_model()
+    with profiler.step("ModelRouter"):
+        return routing_model(get_full_model(),
+                             cached_model(BedrockModel(model_id=FAST_MODEL_ID, **cache_model_config())))
+
+
+def get_tools() -> list:
+    """캐시 prefix가 바뀌지 않도록 순서를 고정한 도구 목록"""
+    return stable_tools([
+        ecommerce_tools.check_return_eligibility,
+        ecommerce_tools.process_return_request,
+        ecommerce_tools.get_product_recommendations,
+    ])
+
+
+if not LAZY_STARTUP:
+    get_model()
+
+# 세션별 대화 기록 상한 (메시지 수), 대화 요약을 시작할 추정 토큰 수 (0이면 요약 안 함),
+# 컨테이너당 최대 동시 호출 수
+HISTORY_WINDOW_SIZE = int(os.environ.get("AGENT_HISTORY_WINDOW_SIZE", "40"))
+HISTORY_SUMMARY_TOKENS = int(os.environ.get("AGENT_HISTORY_SUMMARY_TOKENS", "0"))
+MAX_IN_FLIGHT = int(os.environ.get("AGENT_MAX_IN_FLIGHT", "8"))
 
-agent = Agent(
-    model=model,
-    tools=[check_return_eligibility, process_return_request, get_product_recommendations],
-    system_prompt=ECOMMERCE_SYSTEM_PROMPT,
+
+def create_conversation_manager() -> HistoryCompactionManager:
+    """세션별 대화 기록 압축 (윈도우 + 오래된 도구 결과 요약 + 선택적 대화 요약)"""
+    return HistoryCompactionManager(
+        window_size=HISTORY_WINDOW_SIZE,
+        summary_token_threshold=HISTORY_SUMMARY_TOKENS or None,
+        summarizer=model_summarizer(get_full_model()) if HISTORY_SUMMARY_TOKENS else None,
+    )
+
+
+# 도구별 제한 시간 (시간 초과 시 실행 취소 -> 대체 도구 -> 시간 초과 결과, 모든 세션이 카운터 공유)
+tool_timeouts = ToolTimeouts()
+
+
+def create_agent() -> Agent:
+    """세션용 에이전트 생성 (모델 클라이언트와 도구는 모든 세션이 공유)"""
+    return Agent(
+        model=get_model(),
+        tools=get_tools(),
+        system_prompt=ecommerce_tools.ECOMMERCE_SYSTEM_PROMPT,
+        conversation_manager=create_conversation_manager(),
+        # 같은 인자로 반복되는 조회 도구 호출은 저장된 결과로 바로 응답 (세션 범위 결과는 에이전트와 함께 보관),
+        # 주문번호/시리얼 번호가 있는 메시지는 조회 도구를 모델 추론과 동시에 선실행,
+        # 모든 도구 호출에 제한 시간 적용 (선실행 결과를 기다리는 시간도 포함)
+        hooks=[ToolMemoizer(), SpeculativePrefetch(), tool_timeouts],
+    )
+
+
+# 세션마다 독립된 대화 기록을 갖는 에이전트 풀
+agent_pool = AgentSessionPool(
+    agent_factory=create_agent,
+    max_sessions=int(os.environ.get("AGENT_POOL_MAX_SESSIONS", "256")),
+    idle_ttl_seconds=float(os.environ.get("AGENT_POOL_IDLE_TTL_SECONDS", "1800")),
+)
+
+# 승인 제어: 동시 실행 한도를 넘는 요청은 잠시 대기시키고, 대기열이 차면 즉시 거절
+admission = AdmissionController(
+    max_concurrency=MAX_IN_FLIGHT,
+    max_queue=int(os.environ.get("ADMISSION_MAX_QUEUE", "16")),
+    queue_timeout_seconds=float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECONDS", "5")),
 )
 
+# 스트리밍 프레임 정리: 텍스트 델타를 20ms 또는 64바이트 단위로 묶고 제어 이벤트는 버림
+# (STREAM_SHAPING=false이면 원시 이벤트를 그대로 전달)
+stream_shaper = StreamShaper(
+    max_bytes=int(os.environ.get("STREAM_COALESCE_BYTES", "64")),
+    max_delay_ms=float(os.environ.get("STREAM_COALESCE_MS", "20")),
+    enabled=os.environ.get("STREAM_SHAPING", "true").lower() == "true",
+)
+
+# 구조화된 요청(주문번호 + 반품 가능 여부/교환 등)은 모델 없이 도구 결과를 템플릿으로 바로 응답
+# (FAST_PATH=false이면 사용 안 함)
+fast_path = FastPath()
+
+# 자주 묻는 정책 질문(FAQ)은 이전 모델 답변과 충분히 비슷하면 캐시된 답변으로 바로 응답
+# (주문번호 등 개인 정보가 있거나 앞 대화에 의존하는 질문은 제외, ANSWER_CACHE=false이면 사용 안 함).
+# 모든 세션이 공유하므로 앞 대화 없이 도구를 쓰지 않고 답한 턴만, 답변에도 고객별 내용이 없을 때만 저장
+answer_cache = AnswerCache()
+
+warmup = WarmUp(profiler)
+
 app = BedrockAgentCoreApp()
 
 
+@app.ping
+def ping():
+    """워밍업 중이거나 모든 실행 슬롯이 사용 중이면 HealthyBusy를 보고"""
+    return PingStatus.HEALTHY_BUSY if warmup.pending or admission.is_busy() else PingStatus.HEALTHY
+
+
 @app.entrypoint
-async def invoke(payload):
+async def invoke(payload, context=None):
     """
     AgentCore Runtime 엔트리포인트 - STREAMING 버전
 
     Lab 04 (Non-streaming):
-        def invoke(payload):
+        def invoke(payload, context=None):
             response = agent(user_input)
             return response.message["content"][0]["text"]
 
     Lab 05 (Streaming):
-        async def invoke(payload):
-            async for event in agent.stream_async(user_input):
-                yield event
+        async def invoke(payload, context=None):
+            async for frame in stream_shaper.shape(agent.stream_async(user_input)):
+                yield frame          # {"data": "..."} 프레임
+            yield {"usage": usage}   # 마지막 프레임: 토큰 사용량
     """
     user_input = payload.get("prompt", "")
+    # payload의 session_id 우선, 없으면 런타임 세션 헤더 사용
+    session_id = payload.get("session_id") or getattr(context, "session_id", None)
+
+    # 지연 시작 모드에서 워밍업 전에 도착한 요청은 워밍업이 끝날 때까지 대기
+    await warmup.wait_async()
 
     # stream_async()를 사용하여 스트리밍 응답 생성
-    async for event in agent.stream_async(user_input):
-        yield event
+    try:
+        # 세션 잠금을 먼저 잡고 승인 (같은 세션의 연속 요청이 잠금을 기다리며 실행 슬롯을 차지하지 않도록)
+        async with agent_pool.session_async(session_id) as agent, admission.admit_async():
+            with track_turn_usage(agent) as usage:
+                hit = answer_cache.lookup(user_input)
+                if hit:
+                    answer_cache.record(agent, user_input, hit.answer)
+                    yield {"data": hit.answer}
+                else:
+                    answer = await fast_path.try_answer_async(agent, user_input)
+                    if answer:
+                        yield {"data": answer.text}
+                    else:
+                        async for frame in stream_shaper.shape(agent.stream_async(user_input)):
+                            yield frame
+                        # 캐시 대상 질문이면 모델 답변을 저장
+                        answer_cache.store_turn(agent, user_input)
+            # 마지막 프레임: 이번 턴의 토큰 사용량 (캐시 읽기/쓰기 포함)
+            yield {"usage": usage}
+    except AdmissionRejected as e:
+        yield admission.rejection_event(e)
 
 
 if __name__ == "__main__":
+    if LAZY_STARTUP:
+        warmup.start(create_agent)
+    else:
+        # 워밍업이 끝난 뒤에 포트를 열어 첫 ping부터 healthy
+        warmup.run(create_agent)
     app.run()
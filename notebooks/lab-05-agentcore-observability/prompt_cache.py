@@ -0,0 +1,80 @@
+"""
+Bedrock 프롬프트 캐시 설정 및 캐시 토큰 지표
+시스템 프롬프트와 도구 정의는 매 호출마다 같으므로 그 끝에 캐시 체크포인트를 두어
+Bedrock이 prefix를 다시 처리하지 않도록 합니다.
+
+- cache_model_config(): BedrockModel 생성 인자 (시스템 프롬프트/도구 정의/최근 대화에 체크포인트)
+- stable_tools(): 도구 정의 순서 고정 (순서가 바뀌면 prefix가 달라져 캐시가 무효화됨)
+- track_turn_usage(): 턴 단위 입력/출력/캐시 읽기/캐시 쓰기 토큰
+
+Bedrock은 체크포인트 앞 prefix가 모델별 최소 토큰 수(Claude Sonnet 기준 1,024) 이상일 때만
+캐시하며, 캐시 항목은 마지막 사용 후 기본 5분간 유지됩니다.
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+try:
+    from strands.models import CacheConfig
+except ImportError:  # CacheConfig 이전 버전의 strands
+    CacheConfig = None
+
+PROMPT_CACHE_ENABLED = os.environ.get("PROMPT_CACHE", "true").lower() == "true"
+
+USAGE_KEYS = ("inputTokens", "outputTokens", "cacheReadInputTokens", "cacheWriteInputTokens")
+
+
+def cache_model_config(enabled: bool = PROMPT_CACHE_ENABLED, ttl: Optional[str] = None) -> Dict[str, Any]:
+    """
+    BedrockModel(**cache_model_config())에 넘길 캐시 설정
+
+    Args:
+        enabled: False이면 빈 dict (캐시 사용 안 함)
+        ttl: 캐시 유지 시간 (예: "1h"). None이면 Bedrock 기본값
+    """
+    if not enabled:
+        return {}
+    if CacheConfig is None:
+        return {"cache_prompt": "default", "cache_tools": "default"}
+    return {"cache_config": CacheConfig(strategy="auto", ttl=ttl, system_prompt_ttl=True, tools_ttl=True)}
+
+
+def stable_tools(tools: list) -> list:
+    """도구를 이름순으로 정렬해 에이전트 인스턴스가 달라도 toolConfig가 같도록 함"""
+    return sorted(tools, key=lambda t: getattr(t, "tool_name", None) or getattr(t, "__name__", repr(t)))
+
+
+def usage_snapshot(agent) -> Dict[str, int]:
+    """에이전트의 누적 토큰 사용량"""
+    usage = agent.event_loop_metrics.accumulated_usage
+    return {key: usage.get(key, 0) for key in USAGE_KEYS}
+
+
+def turn_usage(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, Any]:
+    """두 누적 사용량의 차이 = 한 턴의 토큰 사용량과 캐시 적중률"""
+    diff = {key: after.get(key, 0) - before.get(key, 0) for key in USAGE_KEYS}
+    # Bedrock의 inputTokens에는 캐시에서 읽거나 캐시에 쓴 토큰이 포함되지 않음
+    prompt_tokens = diff["inputTokens"] + diff["cacheReadInputTokens"] + diff["cacheWriteInputTokens"]
+    return {
+        "input_tokens": diff["inputTokens"],
+        "output_tokens": diff["outputTokens"],
+        "cache_read_input_tokens": diff["cacheReadInputTokens"],
+        "cache_write_input_tokens": diff["cacheWriteInputTokens"],
+        "cache_hit_ratio": round(diff["cacheReadInputTokens"] / prompt_tokens, 3) if prompt_tokens else 0.0,
+    }
+
+
+@contextmanager
+def track_turn_usage(agent):
+    """
+    블록 안에서 실행된 턴의 토큰 사용량을 dict로 제공 (블록이 끝난 뒤 채워짐)
+
+    같은 에이전트를 동시에 호출하지 않는 경우(세션별 에이전트)에만 정확합니다.
+    """
+    usage: Dict[str, Any] = {}
+    before = usage_snapshot(agent)
+    try:
+        yield usage
+    finally:
+        usage.update(turn_usage(before, usage_snapshot(agent)))
@@ -0,0 +1,138 @@
+"""
+세션별 에이전트 풀
+session_id마다 Agent를 재사용하여 대화 기록을 컨테이너 안에서 유지합니다.
+
+- LRU: 최대 max_sessions개 세션만 보관
+- 유휴 TTL: idle_ttl_seconds 동안 사용되지 않은 세션은 폐기
+- 세션 잠금: 같은 세션의 동시 요청은 순서대로 처리 (다른 세션은 병렬)
+- 동시 실행 제한: 컨테이너당 최대 max_in_flight개 호출만 동시에 실행
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, Optional
+
+
+class _PooledAgent:
+    """풀에 보관되는 에이전트와 세션 잠금"""
+
+    def __init__(self, agent: Any):
+        self.agent = agent
+        self.lock = threading.Lock()
+        self.async_lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+
+class AgentSessionPool:
+    """
+    session_id로 키가 지정된 Agent 풀
+
+    Args:
+        agent_factory: 새 세션용 Agent를 만드는 함수 (model/tools는 공유 객체 사용 권장)
+        max_sessions: 보관할 최대 세션 수 (초과 시 가장 오래 사용하지 않은 세션 제거)
+        idle_ttl_seconds: 이 시간 동안 요청이 없으면 세션 폐기
+        max_in_flight: 컨테이너 전체의 최대 동시 호출 수 (None이면 제한 없음)
+    """
+
+    def __init__(
+        self,
+        agent_factory: Callable[[], Any],
+        max_sessions: int = 256,
+        idle_ttl_seconds: float = 1800.0,
+        max_in_flight: Optional[int] = None,
+    ):
+        self.agent_factory = agent_factory
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_in_flight = max_in_flight
+        self._slots = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self._async_slots = asyncio.Semaphore(max_in_flight) if max_in_flight else None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _PooledAgent]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evicted": 0, "expired": 0, "peak_in_flight": 0}
+
+    def _expire_idle(self, now: float):
+        """유휴 TTL이 지난 세션 제거 (LRU 순서이므로 앞에서부터 확인)"""
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if now - entry.last_used < self.idle_ttl_seconds:
+                break
+            self._entries.pop(session_id)
+            self._stats["expired"] += 1
+
+    def _entry(self, session_id: str) -> _PooledAgent:
+        now = time.monotonic()
+        with self._lock:
+            self._expire_idle(now)
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                self._entries.move_to_end(session_id)
+                self._stats["hits"] += 1
+            else:
+                entry = _PooledAgent(self.agent_factory())
+                self._entries[session_id] = entry
+                self._stats["misses"] += 1
+                while len(self._entries) > self.max_sessions:
+                    self._entries.popitem(last=False)
+                    self._stats["evicted"] += 1
+            entry.last_used = now
+            return entry
+
+    def _enter(self):
+        with self._lock:
+            self._in_flight += 1
+            self._stats["peak_in_flight"] = max(self._stats["peak_in_flight"], self._in_flight)
+
+    def _exit(self, entry: _PooledAgent):
+        entry.last_used = time.monotonic()
+        with self._lock:
+            self._in_flight -= 1
+
+    def get(self, session_id: Optional[str]) -> Any:
+        """세션의 Agent 반환 (session_id가 없으면 풀에 넣지 않는 일회용 Agent)"""
+        if not session_id:
+            return self.agent_factory()
+        return self._entry(session_id).agent
+
+    @contextmanager
+    def session(self, session_id: Optional[str]):
+        """동기 엔트리포인트용: 세션 잠금과 실행 슬롯을 잡은 상태로 Agent 제공"""
+        entry = self._entry(session_id) if session_id else _PooledAgent(self.agent_factory())
+        # 세션 잠금을 먼저 잡아 같은 세션의 대기 요청이 슬롯을 점유하지 않게 함
+        with entry.lock:
+            if self._slots:
+                self._slots.acquire()
+            self._enter()
+            try:
+                yield entry.agent
+            finally:
+                self._exit(entry)
+                if self._slots:
+                    self._slots.release()
+
+    @asynccontextmanager
+    async def session_async(self, session_id: Optional[str]):
+        """비동기(스트리밍) 엔트리포인트용: 세션 잠금과 실행 슬롯을 잡은 상태로 Agent 제공"""
+        entry = self._entry(session_id) if session_id else _PooledAgent(self.agent_factory())
+        async with entry.async_lock:
+            if self._async_slots:
+                await self._async_slots.acquire()
+            self._enter()
+            try:
+                yield entry.agent
+            finally:
+                self._exit(entry)
+                if self._async_slots:
+                    self._async_slots.release()
+
+    def discard(self, session_id: str):
+        """세션 강제 폐기 (예: 대화 초기화 요청)"""
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, sessions=len(self._entries), in_flight=self._in_flight)
@@ -0,0 +1,235 @@
+"""
+구조화된 요청의 모델 우회 빠른 경로
+"ORD-20240101-001 반품 가능해?"처럼 주문번호와 의도가 분명한 요청은 모델 왕복 두 번(도구 선택,
+답변 작성) 없이 바로 도구를 호출하고 템플릿으로 답합니다.
+
+1. 엔티티 추출: 주문번호, 시리얼 번호, 옵션 변경(M에서 L로), 상품명 (미리 컴파일한 정규식)
+2. 의도 매칭: 규칙별 의도 정규식이 맞고, 다른 요청이 섞이지 않았을 때만 (확신이 높은 경우)
+3. 도구 직접 호출 -> 템플릿 응답 -> 일반 턴과 같은 형태(user/toolUse/toolResult/assistant)로
+   agent.messages에 추가하여 다음 턴에서도 맥락 유지
+
+규칙에 필요한 도구가 에이전트에 없거나 엔티티가 부족하면 None을 반환하고 평소대로 모델을 사용합니다.
+규칙에는 조회 도구만 넣습니다. 반품/교환 신청처럼 부수 효과가 있는 도구는 모델이 내용을 확인한 뒤에만
+호출되어야 하므로 빠른 경로로 실행하지 않습니다.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Pattern, Sequence
+
+logger = logging.getLogger(__name__)
+
+FAST_PATH_ENABLED = os.environ.get("FAST_PATH", "true").lower() == "true"
+
+ORDER_NUMBER = re.compile(r"\b(?:ORD-\d{8}-\d{3}|KS-\d{4}-\d{3,6})\b", re.IGNORECASE)
+SERIAL_NUMBER = re.compile(r"(?:시리얼|serial|S/N|SN)\s*(?:번호)?\s*[:#]?\s*([A-Z0-9]{8,20})\b", re.IGNORECASE)
+OPTION_CHANGE = re.compile(r"(?P<current>[\w/]+?)\s*(?:에서|->|→)\s*(?P<desired>[\w/]+?)(?:으로|로)(?=\s|$|[.,!?])")
+ITEM_NAME = re.compile(
+    r"(?:(?<![\w/])(?P<modifier>[가-힣A-Za-z]+)\s+)?(?P<noun>원피스|블라우스|티셔츠|셔츠|니트|가디건|스커트|청바지|바지|팬츠|"
+    r"코트|재킷|자켓|블레이저|크로스백|가방|운동화|신발|구두|샌들|립스틱|쿠션|파운데이션|크림|로션|세럼|향수|선크림)"
+)
+# 상품명 앞 단어가 이런 어미/조사로 끝나면 수식어가 아님 ("주문한 원피스", "제가 산 니트")
+_NOT_MODIFIER = re.compile(r"(?:한|은|는|을|를|의|산|온|에서)$")
+# 다른 요청이 섞였다는 신호 (빠른 경로 대신 모델이 판단)
+MIXED_REQUEST = re.compile(r"그리고|그다음|그 다음|하면서|동시에|같이|추천|랑\s|하나는|나머지")
+
+
+def extract_entities(text: str) -> Dict[str, Any]:
+    """요청에서 주문번호/시리얼 번호/옵션 변경/상품명 추출 (주문번호는 모두, 나머지는 첫 번째)"""
+    entities: Dict[str, Any] = {"order_numbers": [match.upper() for match in ORDER_NUMBER.findall(text)]}
+    serial = SERIAL_NUMBER.search(text)
+    if serial:
+        entities["serial_number"] = serial.group(1).upper()
+    # 주문번호 안의 숫자가 옵션으로, 옵션 뒤 조사가 상품명 수식어로 잡히지 않도록 제거하며 검색
+    rest = ORDER_NUMBER.sub(" ", text)
+    option = OPTION_CHANGE.search(rest)
+    if option:
+        entities["current_option"] = option.group("current")
+        entities["desired_option"] = option.group("desired")
+        rest = rest[:option.start()] + " " + rest[option.end():]
+    item = ITEM_NAME.search(rest)
+    if item:
+        modifier = item.group("modifier")
+        if modifier and not _NOT_MODIFIER.search(modifier):
+            entities["item_name"] = f"{modifier} {item.group('noun')}"
+        else:
+            entities["item_name"] = item.group("noun")
+    return entities
+
+
+class FastPathRule:
+    """
+    빠른 경로 규칙 하나
+
+    Args:
+        name: 규칙 이름 (로그/통계용)
+        tool: 호출할 도구 이름
+        intent: 요청이 맞아야 하는 의도 정규식
+        required: 반드시 있어야 하는 엔티티 이름
+        build_input: 엔티티 -> 도구 입력
+        template: 응답 템플릿 ({result}와 엔티티 이름 사용 가능)
+        exclude: 맞으면 규칙을 적용하지 않는 정규식 (다른 의도가 섞인 경우)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tool: str,
+        intent: Pattern,
+        required: Sequence[str],
+        build_input: Callable[[Dict[str, Any]], Dict[str, Any]],
+        template: str,
+        exclude: Optional[Pattern] = None,
+    ):
+        self.name = name
+        self.tool = tool
+        self.intent = intent
+        self.required = tuple(required)
+        self.build_input = build_input
+        self.template = template
+        self.exclude = exclude
+
+    def matches(self, text: str, entities: Dict[str, Any]) -> bool:
+        if any(not entities.get(name) for name in self.required):
+            return False
+        # 주문번호가 여러 개면 어느 주문에 대한 요청인지 모델이 판단
+        if len(entities["order_numbers"]) > 1:
+            return False
+        if not self.intent.search(text):
+            return False
+        return not (self.exclude and self.exclude.search(text)) and not MIXED_REQUEST.search(text)
+
+
+def _order_number(entities: Dict[str, Any]) -> str:
+    return entities["order_numbers"][0]
+
+
+DEFAULT_RULES: List[FastPathRule] = [
+    FastPathRule(
+        name="return_eligibility",
+        tool="check_return_eligibility",
+        intent=re.compile(r"반품\s*(?:가능|돼|되나|되나요|될까|할\s*수\s*있)"),
+        required=("order_numbers",),
+        build_input=lambda e: {"order_number": _order_number(e), "item_name": e.get("item_name", "주문 상품")},
+        template="주문번호 {order_number} 반품 가능 여부를 확인했습니다.\n\n{result}\n\n"
+                 "반품을 진행하시려면 반품 사유와 함께 말씀해 주세요.",
+        exclude=re.compile(r"교환|신청|접수|환불해"),
+    ),
+]
+
+
+class FastPathAnswer:
+    """빠른 경로 응답: 규칙, 엔티티, 응답 텍스트, 도구 결과 상태, 소요 시간"""
+
+    def __init__(self, rule: str, tool: str, entities: Dict[str, Any], text: str, latency_ms: float):
+        self.rule = rule
+        self.tool = tool
+        self.entities = entities
+        self.text = text
+        self.latency_ms = latency_ms
+
+
+def registered_tool(agent, name: str) -> Optional[str]:
+    """에이전트에 등록된 도구 이름 (Gateway 도구는 '타깃___도구' 형식이므로 접미사로도 찾음)"""
+    registry = agent.tool_registry.registry
+    if name in registry:
+        return name
+    return next((registered for registered in registry if registered.endswith(f"___{name}")), None)
+
+
+def _result_text(result: Dict[str, Any]) -> str:
+    return "\n".join(item["text"] for item in result.get("content", []) if "text" in item)
+
+
+class FastPath:
+    """
+    모델 호출 전에 적용하는 결정적 빠른 경로
+
+    try_answer()는 규칙이 맞으면 도구를 호출하고 응답과 대화 기록을 만든 뒤 FastPathAnswer를,
+    아니면 None을 반환합니다. 도구는 agent.tool로 호출하므로 도구 훅은 그대로 실행되지만,
+    모델/호출 단위 훅(BeforeModelCallEvent, AfterInvocationEvent 등)은 실행되지 않습니다.
+
+    Args:
+        rules: 적용할 규칙 (앞에서부터 처음 맞는 규칙 사용)
+        enabled: False이면 항상 None (FAST_PATH=false)
+        max_chars: 이보다 긴 요청은 여러 내용을 담고 있을 가능성이 높으므로 모델에 맡김
+    """
+
+    def __init__(self, rules: Sequence[FastPathRule] = DEFAULT_RULES, enabled: bool = FAST_PATH_ENABLED,
+                 max_chars: int = 120):
+        self.rules = list(rules)
+        self.enabled = enabled
+        self.max_chars = max_chars
+        self.stats: Counter = Counter()
+
+    def match(self, agent, text: str):
+        """(규칙, 등록된 도구 이름, 엔티티) 또는 None"""
+        if not self.enabled or not text or len(text) > self.max_chars:
+            return None
+        entities = extract_entities(text)
+        for rule in self.rules:
+            if rule.matches(text, entities):
+                tool_name = registered_tool(agent, rule.tool)
+                if tool_name:
+                    return rule, tool_name, entities
+        return None
+
+    def try_answer(self, agent, text: str) -> Optional[FastPathAnswer]:
+        matched = self.match(agent, text)
+        if matched is None:
+            self.stats["miss"] += 1
+            return None
+        return self._answer(agent, text, *matched)
+
+    async def try_answer_async(self, agent, text: str) -> Optional[FastPathAnswer]:
+        """비동기 엔트리포인트용: 매칭은 바로, 도구 호출은 이벤트 루프를 막지 않도록 스레드에서"""
+        matched = self.match(agent, text)
+        if matched is None:
+            self.stats["miss"] += 1
+            return None
+        return await asyncio.to_thread(self._answer, agent, text, *matched)
+
+    def _answer(self, agent, text: str, rule: FastPathRule, tool_name: str,
+                entities: Dict[str, Any]) -> Optional[FastPathAnswer]:
+        start = time.perf_counter()
+        tool_input = rule.build_input(entities)
+        try:
+            result = getattr(agent.tool, tool_name)(record_direct_tool_call=False, **tool_input)
+        except Exception as e:
+            logger.warning("빠른 경로 도구 호출 실패 (%s), 모델로 처리: %s", tool_name, e)
+            self.stats["fallback"] += 1
+            return None
+        if result.get("status") != "success":
+            self.stats["fallback"] += 1
+            return None
+
+        fields = {**tool_input, **{k: v for k, v in entities.items() if isinstance(v, str)}}
+        answer_text = rule.template.format(result=_result_text(result), **fields)
+        self._record(agent, text, tool_name, tool_input, result, answer_text)
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.stats[rule.name] += 1
+        logger.info("빠른 경로 응답: rule=%s tool=%s %.1fms", rule.name, tool_name, latency_ms)
+        return FastPathAnswer(rule.name, tool_name, entities, answer_text, latency_ms)
+
+    @staticmethod
+    def _record(agent, text: str, tool_name: str, tool_input: Dict[str, Any], result: Dict[str, Any],
+                answer_text: str):
+        """모델이 도구를 호출했을 때와 같은 형태로 대화 기록 추가 후 대화 관리 적용"""
+        tool_use_id = f"tooluse_fastpath_{uuid.uuid4().hex[:12]}"
+        agent.messages.extend([
+            {"role": "user", "content": [{"text": text}]},
+            {"role": "assistant", "content": [
+                {"toolUse": {"toolUseId": tool_use_id, "name": tool_name, "input": tool_input}},
+            ]},
+            {"role": "user", "content": [
+                {"toolResult": {"toolUseId": tool_use_id, "status": result["status"], "content": result["content"]}},
+            ]},
+            {"role": "assistant", "content": [{"text": answer_text}]},
+        ])
+        agent.conversation_manager.apply_management(agent)
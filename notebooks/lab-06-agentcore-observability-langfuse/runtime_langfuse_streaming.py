@@ -6,35 +6,139 @@ Lab 05와의 차이점:
 - StrandsTelemetry로 OTEL 익스포터 설정 (Langfuse로 전송)
 - trace_attributes로 세션/사용자 추적
 - AWS ADOT 대신 Langfuse 사용
+- session_id별 에이전트 풀로 멀티턴 대화 기록을 컨테이너 안에서 유지
 """
-from bedrock_agentcore.runtime import BedrockAgentCoreApp
-from strands import Agent
-from strands.models import BedrockModel
-from strands.telemetry import StrandsTelemetry
-
-from ecommerce_tools import (
-    check_return_eligibility,
-    process_return_request,
-    get_product_recommendations,
-    ECOMMERCE_SYSTEM_PROMPT,
-    ECOMMERCE_MODEL_ID,
-)
+import functools
+import os
+
+# 모듈별 import 시간을 기록하려면 다른 import보다 먼저 프로파일러를 설치해야 함
+from runtime_startup import StartupProfiler, WarmUp, load_module
+
+profiler = StartupProfiler(enabled=os.environ.get("STARTUP_PROFILE", "true").lower() == "true").install()
+
+from bedrock_agentcore.runtime import BedrockAgentCoreApp, PingStatus  # noqa: E402
+from strands import Agent  # noqa: E402
+from strands.models import BedrockModel  # noqa: E402
+from strands.models.model import Model  # noqa: E402
+from strands.telemetry import StrandsTelemetry  # noqa: E402
+
+from admission_control import AdmissionController, AdmissionRejected  # noqa: E402
+from agent_session_pool import AgentSessionPool  # noqa: E402
+from answer_cache import AnswerCache  # noqa: E402
+from fast_path import FastPath  # noqa: E402
+from history_compaction import HistoryCompactionManager, model_summarizer  # noqa: E402
+from model_cache import cached_model  # noqa: E402
+from model_router import FAST_MODEL_ID, MODEL_ROUTING_ENABLED, routing_model  # noqa: E402
+from prompt_cache import cache_model_config, stable_tools, track_turn_usage  # noqa: E402
+from stream_shaper import StreamShaper  # noqa: E402
+from tool_memo import ToolMemoizer  # noqa: E402
+from tool_speculation import SpeculativePrefetch  # noqa: E402
+from tool_timeout import ToolTimeouts  # noqa: E402
 
 # ============================================================
 # Langfuse 텔레메트리 설정
 # OTEL_EXPORTER_OTLP_ENDPOINT 및 OTEL_EXPORTER_OTLP_HEADERS
 # 환경 변수를 통해 Langfuse로 트레이스 전송
 # ============================================================
-StrandsTelemetry().setup_otlp_exporter()
+with profiler.step("StrandsTelemetry"):
+    StrandsTelemetry().setup_otlp_exporter()
 
 # ============================================================
-# 모델 설정
+# 모델 및 도구 설정
+# RUNTIME_LAZY_STARTUP=true이면 도구 모듈 로드와 모델 생성을 서버 시작 후
+# 백그라운드 워밍업으로 미룸 (워밍업 동안 ping은 HealthyBusy, 요청은 워밍업 완료까지 대기)
 # ============================================================
-model = BedrockModel(model_id=ECOMMERCE_MODEL_ID)
+LAZY_STARTUP = os.environ.get("RUNTIME_LAZY_STARTUP", "false").lower() == "true"
+
+with profiler.step("ecommerce_tools"):
+    ecommerce_tools = load_module("ecommerce_tools", lazy=LAZY_STARTUP)
+
+
+@functools.lru_cache(maxsize=None)
+def get_full_model() -> Model:
+    """
+    모든 세션이 공유하는 모델 클라이언트 (PROMPT_CACHE=false가 아니면 시스템 프롬프트/도구 정의 캐시,
+    MODEL_CACHE=record/replay/deterministic이면 같은 모델 호출의 응답을 저장해 재생)
+    """
+    with profiler.step("BedrockModel"):
+        return cached_model(BedrockModel(model_id=ecommerce_tools.ECOMMERCE_MODEL_ID, **cache_model_config()))
+
+
+@functools.lru_cache(maxsize=None)
+def get_model() -> Model:
+    """세션 에이전트용 모델: 단순 FAQ/상태 문의는 빠른 모델로 라우팅 (MODEL_ROUTING=false이면 full 모델만)"""
+    if not MODEL_ROUTING_ENABLED:
+        return get_full_model()
+    with profiler.step("ModelRouter"):
+        return routing_model(get_full_model(),
+                             cached_model(BedrockModel(model_id=FAST_MODEL_ID, **cache_model_config())))
+
+
+def get_tools() -> list:
+    """캐시 prefix가 바뀌지 않도록 순서를 고정한 도구 목록"""
+    return stable_tools([
+        ecommerce_tools.check_return_eligibility,
+        ecommerce_tools.process_return_request,
+        ecommerce_tools.get_product_recommendations,
+    ])
+
+
+if not LAZY_STARTUP:
+    get_model()
+
+# 세션별 대화 기록 상한 (메시지 수), 대화 요약을 시작할 추정 토큰 수 (0이면 요약 안 함)
+HISTORY_WINDOW_SIZE = int(os.environ.get("AGENT_HISTORY_WINDOW_SIZE", "40"))
+HISTORY_SUMMARY_TOKENS = int(os.environ.get("AGENT_HISTORY_SUMMARY_TOKENS", "0"))
+
+# Langfuse 태그 (선택사항)
+LANGFUSE_TAGS = ["ecommerce", "agentcore", "customer-support", "lab-06"]
+
+# 구조화된 요청(주문번호 + 반품 가능 여부/교환 등)은 모델 없이 도구 결과를 템플릿으로 바로 응답
+# (FAST_PATH=false이면 사용 안 함)
+fast_path = FastPath()
+
+# 자주 묻는 정책 질문(FAQ)은 이전 모델 답변과 충분히 비슷하면 캐시된 답변으로 바로 응답
+# (주문번호 등 개인 정보가 있거나 앞 대화에 의존하는 질문은 제외, ANSWER_CACHE=false이면 사용 안 함).
+# 모든 세션이 공유하므로 앞 대화 없이 도구를 쓰지 않고 답한 턴만, 답변에도 고객별 내용이 없을 때만 저장
+answer_cache = AnswerCache()
+
+warmup = WarmUp(profiler)
 
 app = BedrockAgentCoreApp()
 
 
+@app.ping
+def ping():
+    """워밍업 중이거나 모든 실행 슬롯이 사용 중이면 HealthyBusy를 보고"""
+    return PingStatus.HEALTHY_BUSY if warmup.pending or admission.is_busy() else PingStatus.HEALTHY
+
+
+def build_trace_attributes(session_id: str = None, user_id: str = None) -> dict:
+    """Langfuse에서 세션/사용자별로 트레이스를 묶기 위한 속성"""
+    trace_attributes = {}
+
+    if session_id:
+        trace_attributes["session.id"] = session_id
+    if user_id:
+        trace_attributes["user.id"] = user_id
+
+    trace_attributes["langfuse.tags"] = LANGFUSE_TAGS
+    return trace_attributes
+
+
+def create_conversation_manager() -> HistoryCompactionManager:
+    """세션별 대화 기록 압축 (윈도우 + 오래된 도구 결과 요약 + 선택적 대화 요약)"""
+    return HistoryCompactionManager(
+        window_size=HISTORY_WINDOW_SIZE,
+        summary_token_threshold=HISTORY_SUMMARY_TOKENS or None,
+        summarizer=model_summarizer(get_full_model()) if HISTORY_SUMMARY_TOKENS else None,
+    )
+
+
+# 도구별 제한 시간 (시간 초과 시 실행 취소 -> 대체 도구 -> 시간 초과 결과, 모든 세션이 카운터 공유)
+tool_timeouts = ToolTimeouts()
+
+
 def create_agent(session_id: str = None, user_id: str = None) -> Agent:
     """
     Langfuse 추적이 가능한 에이전트 생성
@@ -46,22 +150,47 @@ def create_agent(session_id: str = None, user_id: str = None) -> Agent:
     Returns:
         trace_attributes가 설정된 Agent 인스턴스
     """
-    trace_attributes = {}
+    return Agent(
+        model=get_model(),
+        tools=get_tools(),
+        system_prompt=ecommerce_tools.ECOMMERCE_SYSTEM_PROMPT,
+        trace_attributes=build_trace_attributes(session_id, user_id),
+        conversation_manager=create_conversation_manager(),
+        # 같은 인자로 반복되는 조회 도구 호출은 저장된 결과로 바로 응답 (세션 범위 결과는 에이전트와 함께 보관),
+        # 주문번호/시리얼 번호가 있는 메시지는 조회 도구를 모델 추론과 동시에 선실행,
+        # 모든 도구 호출에 제한 시간 적용 (선실행 결과를 기다리는 시간도 포함)
+        hooks=[ToolMemoizer(), SpeculativePrefetch(), tool_timeouts],
+    )
 
-    if session_id:
-        trace_attributes["session.id"] = session_id
-    if user_id:
-        trace_attributes["user.id"] = user_id
 
-    # Langfuse 태그 추가 (선택사항)
-    trace_attributes["langfuse.tags"] = ["ecommerce", "agentcore", "customer-support", "lab-06"]
+# ============================================================
+# 세션별 에이전트 풀
+# 같은 session_id의 요청은 같은 Agent를 재사용하므로 클라이언트가
+# 이전 대화를 다시 보내지 않아도 멀티턴 맥락이 유지됩니다.
+# ============================================================
+agent_pool = AgentSessionPool(
+    agent_factory=create_agent,
+    max_sessions=int(os.environ.get("AGENT_POOL_MAX_SESSIONS", "256")),
+    idle_ttl_seconds=float(os.environ.get("AGENT_POOL_IDLE_TTL_SECONDS", "1800")),
+)
 
-    return Agent(
-        model=model,
-        tools=[check_return_eligibility, process_return_request, get_product_recommendations],
-        system_prompt=ECOMMERCE_SYSTEM_PROMPT,
-        trace_attributes=trace_attributes if trace_attributes else None,
-    )
+# 컨테이너당 최대 동시 호출 수
+MAX_IN_FLIGHT = int(os.environ.get("AGENT_MAX_IN_FLIGHT", "8"))
+
+# 승인 제어: 동시 실행 한도를 넘는 요청은 잠시 대기시키고, 대기열이 차면 즉시 거절
+admission = AdmissionController(
+    max_concurrency=MAX_IN_FLIGHT,
+    max_queue=int(os.environ.get("ADMISSION_MAX_QUEUE", "16")),
+    queue_timeout_seconds=float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECONDS", "5")),
+)
+
+# 스트리밍 프레임 정리: 텍스트 델타를 20ms 또는 64바이트 단위로 묶고 제어 이벤트는 버림
+# (STREAM_SHAPING=false이면 원시 이벤트를 그대로 전달)
+stream_shaper = StreamShaper(
+    max_bytes=int(os.environ.get("STREAM_COALESCE_BYTES", "64")),
+    max_delay_ms=float(os.environ.get("STREAM_COALESCE_MS", "20")),
+    enabled=os.environ.get("STREAM_SHAPING", "true").lower() == "true",
+)
 
 
 @app.entrypoint
@@ -86,13 +215,41 @@ async def invoke(payload):
     session_id = payload.get("session_id")
     user_id = payload.get("user_id")
 
-    # 세션/사용자 ID가 포함된 에이전트 생성
-    agent = create_agent(session_id=session_id, user_id=user_id)
-
-    # 스트리밍 응답 생성
-    async for event in agent.stream_async(user_input):
-        yield event
+    # 지연 시작 모드에서 워밍업 전에 도착한 요청은 워밍업이 끝날 때까지 대기
+    await warmup.wait_async()
+
+    try:
+        # 세션 에이전트 재사용, 요청마다 trace 속성만 갱신
+        # 세션 잠금을 먼저 잡고 승인 (같은 세션의 연속 요청이 잠금을 기다리며 실행 슬롯을 차지하지 않도록)
+        async with agent_pool.session_async(session_id) as agent, admission.admit_async() as ticket:
+            agent.trace_attributes = build_trace_attributes(session_id=session_id, user_id=user_id)
+            agent.trace_attributes["admission.wait_ms"] = round(ticket.wait_ms, 1)
+
+            # 스트리밍 응답 생성
+            with track_turn_usage(agent) as usage:
+                hit = answer_cache.lookup(user_input)
+                if hit:
+                    answer_cache.record(agent, user_input, hit.answer)
+                    yield {"data": hit.answer}
+                else:
+                    answer = await fast_path.try_answer_async(agent, user_input)
+                    if answer:
+                        yield {"data": answer.text}
+                    else:
+                        async for frame in stream_shaper.shape(agent.stream_async(user_input)):
+                            yield frame
+                        # 캐시 대상 질문이면 모델 답변을 저장
+                        answer_cache.store_turn(agent, user_input)
+            # 마지막 프레임: 이번 턴의 토큰 사용량 (캐시 읽기/쓰기 포함)
+            yield {"usage": usage}
+    except AdmissionRejected as e:
+        yield admission.rejection_event(e)
 
 
 if __name__ == "__main__":
+    if LAZY_STARTUP:
+        warmup.start(create_agent)
+    else:
+        # 워밍업이 끝난 뒤에 포트를 열어 첫 ping부터 healthy
+        warmup.run(create_agent)
     app.run()
@@ -0,0 +1,200 @@
+"""
+런타임 컨테이너 시작 시간 프로파일링 및 워밍업
+콜드 스타트 시간이 어디에 쓰이는지 기록하고, 첫 요청이 연결/도구 준비 비용을 떠안지 않도록 합니다.
+
+- StartupProfiler: 최상위 모듈별 import 시간과 객체 생성 단계별 시간 기록
+- load_module(lazy=True): 도구 모듈 실행을 첫 속성 접근 시점까지 미룸 (importlib LazyLoader)
+- WarmUp: 도구 스펙 생성 + Bedrock 연결(TLS/자격 증명) 사전 수립. 끝나기 전에는 ping이 HealthyBusy
+"""
+import asyncio
+import builtins
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """
+    시작 단계별 소요 시간 기록
+
+    install() 이후 처음 로드되는 최상위 import를 패키지 단위로 합산합니다.
+    중첩 import는 바깥 import 시간에 포함되므로 합계가 실제 import 시간과 같습니다.
+
+    Args:
+        enabled: False이면 import 훅을 설치하지 않고 단계 시간만 기록
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.imports: Dict[str, float] = {}
+        self.steps: List[Tuple[str, float]] = []
+        self._local = threading.local()
+        self._original_import = None
+
+    def install(self) -> "StartupProfiler":
+        if self.enabled and self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+        return self
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # 이미 로드된 모듈, 상대 import, 다른 import 안에서 일어난 import는 그대로 통과
+        if level or name in sys.modules or getattr(self._local, "active", False):
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._local.active = True
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._local.active = False
+            package = name.partition(".")[0]
+            self.imports[package] = self.imports.get(package, 0.0) + (time.perf_counter() - start) * 1000
+
+    @contextmanager
+    def step(self, name: str):
+        """객체 생성 등 import 이외의 시작 단계 시간 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, (time.perf_counter() - start) * 1000))
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        imports = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)
+        return {
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "imports_ms": {name: round(ms, 1) for name, ms in imports[:top]},
+            "steps_ms": {name: round(ms, 1) for name, ms in self.steps},
+        }
+
+    def log_report(self, top: int = 10) -> Dict[str, Any]:
+        report = self.report(top)
+        logger.info(
+            "시작 프로파일 (%.0fms) - import: %s | 단계: %s",
+            report["elapsed_ms"], report["imports_ms"], report["steps_ms"],
+        )
+        return report
+
+
+def load_module(name: str, lazy: bool = False) -> ModuleType:
+    """
+    모듈 로드. lazy=True이면 모듈 객체만 만들고 실제 실행은 첫 속성 접근 때 수행
+
+    도구 모듈처럼 요청 처리에만 필요한 모듈의 import 비용을 서버 시작 이후로 미룰 때 사용합니다.
+    """
+    if not lazy or name in sys.modules:
+        return importlib.import_module(name)
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def open_bedrock_connection(model) -> bool:
+    """
+    모델의 bedrock-runtime 클라이언트로 가벼운 API를 호출해 자격 증명 확인과 TLS 연결을 미리 수행
+
+    호출 권한이 없어도(AccessDenied) 연결은 이미 맺어져 커넥션 풀에 남으므로 성공으로 봅니다.
+    클라이언트가 없는 모델(테스트 대역 등)은 False를 반환합니다.
+    """
+    # 라우팅 모델(RoutingModel)은 등급별 모델마다 클라이언트가 따로 있음
+    models = getattr(model, "models", None)
+    if isinstance(models, dict):
+        return any([open_bedrock_connection(tier_model) for tier_model in models.values()])
+    # 응답 캐시(CachingModel)는 감싼 모델의 클라이언트를 사용
+    inner = getattr(model, "model", None)
+    if inner is not None and not isinstance(inner, str):
+        return open_bedrock_connection(inner)
+
+    client = getattr(model, "client", None)
+    if client is None or not hasattr(client, "list_async_invokes"):
+        return False
+
+    from botocore.exceptions import ClientError
+
+    try:
+        client.list_async_invokes(maxResults=1)
+    except ClientError as e:
+        logger.debug("워밍업 호출 응답: %s", e.response.get("Error", {}).get("Code"))
+    return True
+
+
+class WarmUp:
+    """
+    첫 요청 전에 에이전트 생성 경로를 한 번 실행
+
+    - 에이전트 생성: 도구 모듈 로드, 도구 레지스트리 검증, 도구 스펙 생성
+    - Bedrock 연결: open_bedrock_connection()
+
+    워밍업이 실패해도 서버는 시작되고, 실패한 단계는 첫 요청에서 다시 수행됩니다.
+
+    Args:
+        profiler: 단계 시간을 기록할 StartupProfiler (끝나면 시작 프로파일을 로그로 남김)
+    """
+
+    def __init__(self, profiler: Optional[StartupProfiler] = None):
+        self.profiler = profiler or StartupProfiler(enabled=False)
+        self.error: Optional[BaseException] = None
+        self._started = False
+        self._done = threading.Event()
+
+    @property
+    def pending(self) -> bool:
+        """워밍업이 시작되었지만 아직 끝나지 않았으면 True (ping의 HealthyBusy 판단용)"""
+        return self._started and not self._done.is_set()
+
+    def run(self, agent_factory: Callable[[], Any]):
+        """현재 스레드에서 워밍업 실행"""
+        self._started = True
+        try:
+            with self.profiler.step("warmup.agent"):
+                agent = agent_factory()
+            with self.profiler.step("warmup.tool_specs"):
+                agent.tool_registry.get_all_tool_specs()
+            with self.profiler.step("warmup.bedrock_connection"):
+                open_bedrock_connection(agent.model)
+        except Exception as e:
+            self.error = e
+            logger.warning("워밍업 실패 (첫 요청에서 다시 시도됩니다): %s", e)
+        finally:
+            self._done.set()
+            self.profiler.uninstall()
+            self.profiler.log_report()
+
+    def start(self, agent_factory: Callable[[], Any]) -> threading.Thread:
+        """백그라운드 스레드에서 워밍업 실행 (서버는 바로 시작)"""
+        self._started = True
+        thread = threading.Thread(target=self.run, args=(agent_factory,), name="runtime-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """진행 중인 워밍업이 끝날 때까지 대기 (시작하지 않았으면 바로 반환)"""
+        return self._done.wait(timeout) if self._started else True
+
+    async def wait_async(self, timeout: Optional[float] = None) -> bool:
+        """비동기 엔트리포인트용 wait(). 이벤트 루프를 막지 않음"""
+        if not self.pending:
+            return True
+        return await asyncio.get_running_loop().run_in_executor(None, self._done.wait, timeout)
@@ -0,0 +1,104 @@
+"""
+스트리밍 이벤트 정리 및 묶음 전송
+agent.stream_async()의 원시 이벤트 중 클라이언트에 필요한 것만 골라 SSE 프레임으로 만듭니다.
+
+- 텍스트 델타: {"data": "..."} 프레임으로 묶어서 전송 (max_bytes 또는 max_delay_ms 기준)
+- 도구 진행 상황: {"tool": {"name": ..., "id": ..., "status": ...}} 프레임
+- 그 외 수명주기/제어 이벤트(init_event_loop, 원시 model 이벤트 등)는 버림
+
+프레임은 JSON으로 바로 직렬화되는 dict만 담으므로 런타임이 프레임당 한 번만 직렬화합니다.
+첫 텍스트 델타는 묶지 않고 바로 내보내 TTFT를 유지합니다.
+"""
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+
+class StreamShaper:
+    """
+    원시 스트리밍 이벤트를 텍스트/도구 진행 프레임으로 변환
+
+    Args:
+        max_bytes: 버퍼의 텍스트가 이 크기(UTF-8 바이트) 이상이면 즉시 전송
+        max_delay_ms: 버퍼의 첫 델타 이후 이 시간이 지나면 전송
+        include_tool_events: 도구 시작/완료 프레임 포함 여부
+        enabled: False이면 원시 이벤트를 그대로 전달
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64,
+        max_delay_ms: float = 20.0,
+        include_tool_events: bool = True,
+        enabled: bool = True,
+    ):
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay_ms / 1000
+        self.include_tool_events = include_tool_events
+        self.enabled = enabled
+
+    def _tool_frames(self, event: Dict[str, Any], started: set) -> List[Dict[str, Any]]:
+        """도구 호출 시작(current_tool_use)과 완료(toolResult 메시지) 프레임"""
+        frames = []
+        tool_use = event.get("current_tool_use")
+        if tool_use and tool_use.get("toolUseId") not in started:
+            started.add(tool_use.get("toolUseId"))
+            frames.append({"tool": {"name": tool_use.get("name"), "id": tool_use.get("toolUseId"), "status": "running"}})
+
+        message = event.get("message")
+        if isinstance(message, dict) and message.get("role") == "user":
+            for block in message.get("content", []):
+                result = block.get("toolResult")
+                if result:
+                    frames.append({"tool": {"id": result.get("toolUseId"), "status": result.get("status", "success")}})
+        return frames
+
+    async def shape(self, events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        원시 이벤트 스트림을 프레임 스트림으로 변환
+
+        원본 스트림은 같은 태스크에서 그대로 순회합니다. 별도 태스크로 당겨 오면
+        OTEL 컨텍스트가 태스크마다 달라져 트레이스 span이 끊어지므로, 시간 창은
+        다음 이벤트가 도착할 때 확인합니다 (모델은 델타마다 여러 이벤트를 내보냄).
+        """
+        if not self.enabled:
+            async for event in events:
+                yield event
+            return
+
+        buffer: List[str] = []
+        buffered_bytes = 0
+        buffer_started = 0.0
+        first_text_sent = False
+        tools_started: set = set()
+
+        async for event in events:
+            if not isinstance(event, dict):
+                continue
+
+            text = event.get("data")
+            if isinstance(text, str) and text:
+                if not first_text_sent:
+                    first_text_sent = True
+                    yield {"data": text}
+                    continue
+                if not buffer:
+                    buffer_started = time.monotonic()
+                buffer.append(text)
+                buffered_bytes += len(text.encode("utf-8"))
+
+            frames = self._tool_frames(event, tools_started) if self.include_tool_events else []
+
+            # 크기/시간 기준을 넘었거나, 텍스트 순서를 지키기 위해 도구 프레임 전에 버퍼 전송
+            if buffer and (
+                frames
+                or buffered_bytes >= self.max_bytes
+                or time.monotonic() - buffer_started >= self.max_delay
+            ):
+                yield {"data": "".join(buffer)}
+                buffer, buffered_bytes = [], 0
+
+            for frame in frames:
+                yield frame
+
+        if buffer:
+            yield {"data": "".join(buffer)}
@@ -485,34 +485,74 @@ def web_search(query: str, search_type: str = "fashion") -> str:
 
 
 # 기존 전자제품 프로젝트와 동일한 구조로 에이전트 생성 함수 제공
-def create_ecommerce_agent():
-    """패션/뷰티 이커머스 고객 지원 에이전트를 생성합니다."""
+def create_ecommerce_agent(conversation_manager=None):
+    """
+    패션/뷰티 이커머스 고객 지원 에이전트를 생성합니다.
+
+    단순 FAQ/상태 문의는 model_router.FAST_MODEL_ID(ROUTER_FAST_MODEL_ID), 반품/교환/추천 상담은 MODEL_ID로 보냅니다
+    (MODEL_ROUTING=false이면 항상 MODEL_ID). MODEL_CACHE=record/replay이면 모델 응답을 기록/재생합니다.
+
+    Args:
+        conversation_manager: 대화 기록 관리자 (기본값: HistoryCompactionManager)
+    """
     from strands import Agent
     from strands.models import BedrockModel
     import boto3
+
+    try:
+        from helpers.history_compaction import HistoryCompactionManager
+        from helpers.model_cache import cached_model
+        from helpers.model_router import FAST_MODEL_ID, MODEL_ROUTING_ENABLED, routing_model
+        from helpers.prompt_cache import cache_model_config, stable_tools
+        from helpers.tool_memo import ToolMemoizer
+        from helpers.tool_timeout import ToolTimeouts
+    except ImportError:
+        from src.helpers.history_compaction import HistoryCompactionManager
+        from src.helpers.model_cache import cached_model
+        from src.helpers.model_router import FAST_MODEL_ID, MODEL_ROUTING_ENABLED, routing_model
+        from src.helpers.prompt_cache import cache_model_config, stable_tools
+        from src.helpers.tool_memo import ToolMemoizer
+        from src.helpers.tool_timeout import ToolTimeouts
     
     region = boto3.session.Session().region_name
     
-    model = BedrockModel(
+    # MODEL_CACHE=record/replay이면 같은 호출의 응답을 기록/재생 (네트워크 없는 회귀 테스트)
+    model = cached_model(BedrockModel(
         model_id=MODEL_ID,
         temperature=0.3,
-        region_name=region
-    )
+        region_name=region,
+        **cache_model_config()
+    ))
+    fast_model = cached_model(BedrockModel(
+        model_id=FAST_MODEL_ID,
+        temperature=0.3,
+        region_name=region,
+        **cache_model_config()
+    )) if MODEL_ROUTING_ENABLED else None
     
     agent = Agent(
-        model=model,
-        tools=[
+        model=routing_model(model, fast_model),
+        tools=stable_tools([
             process_return,
             process_exchange, 
             web_search
-        ],
-        system_prompt=SYSTEM_PROMPT
+        ]),
+        system_prompt=SYSTEM_PROMPT,
+        conversation_manager=conversation_manager or HistoryCompactionManager(),
+        # 같은 인자로 반복되는 web_search 호출은 저장된 결과로 바로 응답,
+        # 느린 도구가 턴 전체를 멈추지 않도록 도구별 제한 시간 적용
+        hooks=[ToolMemoizer(), ToolTimeouts()],
     )
     
     return agent
 
 
 if __name__ == "__main__":
+    try:
+        from helpers.prompt_cache import track_turn_usage
+    except ImportError:
+        from src.helpers.prompt_cache import track_turn_usage
+
     # 에이전트 테스트
     agent = create_ecommerce_agent()
     
@@ -531,8 +571,10 @@ if __name__ == "__main__":
         print(f"\n고객: {query}")
         print("-" * 40)
         try:
-            response = agent(query)
+            with track_turn_usage(agent) as usage:
+                response = agent(query)
             print(f"상담원: {response}")
+            print(f"토큰: {usage}")
         except Exception as e:
             print(f"오류: {e}")
         print("=" * 60)
\ No newline at end of file
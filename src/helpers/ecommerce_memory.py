@@ -3,27 +3,513 @@
 기존 전자제품 프로젝트의 메모리 시스템을 패션/뷰티 도메인으로 전환
 """
 
+import atexit
+import json
 import logging
-from strands.hooks import AfterInvocationEvent, HookProvider, HookRegistry, MessageAddedEvent
+import math
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from strands.hooks import (
+    AfterInvocationEvent,
+    AfterModelCallEvent,
+    BeforeModelCallEvent,
+    HookProvider,
+    HookRegistry,
+    MessageAddedEvent,
+)
 from bedrock_agentcore.memory import MemoryClient
 
+try:
+    from helpers.memory_dedup import DEFAULT_SIGNATURE_STORE, MinHashSignatureStore
+except ImportError:
+    from src.helpers.memory_dedup import DEFAULT_SIGNATURE_STORE, MinHashSignatureStore
+
 logger = logging.getLogger(__name__)
 
+# 네임스페이스별 메모리 검색을 병렬로 실행하는 공용 스레드 풀
+# (Streamlit처럼 메시지마다 훅을 새로 만드는 경우에도 스레드를 재사용)
+_RETRIEVAL_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="memory-retrieval")
+
+
+def _char_ngrams(text: str, n: int = 2) -> Set[str]:
+    """공백/구두점을 제거한 문자 n-gram 집합을 만듭니다 (한국어 질의 유사도용)."""
+    normalized = re.sub(r"[\W_]+", "", text.lower())
+    if len(normalized) < n:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + n] for i in range(len(normalized) - n + 1)}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 토큰 수를 보수적으로 추정합니다.
+    한글 등 비ASCII 문자는 문자당 1토큰, ASCII는 4문자당 1토큰으로 계산합니다.
+    """
+    ascii_chars = sum(1 for ch in text if ch.isascii())
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def _to_epoch(value: Any) -> Optional[float]:
+    """메모리 레코드의 createdAt(datetime/ISO 문자열/epoch)을 epoch 초로 변환합니다."""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+class MemoryRetrievalCache:
+    """
+    (고객, 세션) 단위 메모리 검색 결과 캐시
+
+    "네 알겠습니다"처럼 맥락을 바꿀 수 없는 짧은 후속 발화나, 직전 질의와
+    문자 n-gram Jaccard 유사도가 임계값 이상인 질의는 이전 검색 결과를 재사용합니다.
+    세션 수(LRU)와 세션당 항목 수, TTL로 크기를 제한합니다.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        max_sessions: int = 1024,
+        max_entries_per_session: int = 8,
+        similarity_threshold: float = 0.6,
+        min_query_chars: int = 7,
+        ngram_size: int = 2,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_entries_per_session = max_entries_per_session
+        self.similarity_threshold = similarity_threshold
+        self.min_query_chars = min_query_chars
+        self.ngram_size = ngram_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # (customer_id, session_id) -> [(저장 시각, 질의 n-gram, 검색 결과), ...]
+        self._sessions: "OrderedDict[Tuple[str, str], List[Tuple[float, Set[str], Any]]]" = OrderedDict()
+
+    def lookup(self, customer_id: str, session_id: str, query: str) -> Optional[Any]:
+        """재사용 가능한 검색 결과가 있으면 반환하고, 없으면 None을 반환합니다."""
+        key = (customer_id, session_id)
+        grams = _char_ngrams(query, self.ngram_size)
+        is_short = len(re.sub(r"[\W_]+", "", query)) < self.min_query_chars
+        now = time.monotonic()
+
+        with self._lock:
+            entries = [
+                entry for entry in self._sessions.get(key, [])
+                if now - entry[0] <= self.ttl_seconds
+            ]
+            if not entries:
+                self._sessions.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._sessions[key] = entries
+            self._sessions.move_to_end(key)
+
+            if is_short:
+                # 짧은 후속 발화는 가장 최근 검색 결과를 그대로 사용
+                self.hits += 1
+                return entries[-1][2]
+
+            best = max(entries, key=lambda entry: _jaccard(grams, entry[1]))
+            if _jaccard(grams, best[1]) >= self.similarity_threshold:
+                self.hits += 1
+                return best[2]
+
+            self.misses += 1
+            return None
+
+    def store(self, customer_id: str, session_id: str, query: str, results: Any) -> None:
+        """검색 결과를 세션 캐시에 저장합니다."""
+        key = (customer_id, session_id)
+        entry = (time.monotonic(), _char_ngrams(query, self.ngram_size), results)
+
+        with self._lock:
+            entries = self._sessions.setdefault(key, [])
+            entries.append(entry)
+            del entries[:-self.max_entries_per_session]
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def invalidate(self, customer_id: str, session_id: str) -> None:
+        """세션의 캐시 항목을 모두 제거합니다."""
+        with self._lock:
+            self._sessions.pop((customer_id, session_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중/미스 카운터를 반환합니다."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "sessions": len(self._sessions),
+            }
+
+
+# 훅 인스턴스 간에 공유되는 기본 검색 캐시
+DEFAULT_RETRIEVAL_CACHE = MemoryRetrievalCache()
+
+
+# 재시도해도 결과가 바뀌지 않는 오류 코드
+_NON_RETRYABLE_ERROR_CODES = {
+    "ValidationException",
+    "ResourceNotFoundException",
+    "AccessDeniedException",
+}
+
+
+class MemoryWriteBehindQueue:
+    """
+    create_event 호출을 백그라운드로 넘기는 write-behind 파이프라인
+
+    - 제한된 크기의 큐와 워커 스레드 풀로 쓰기를 처리합니다
+    - 같은 (memory, actor, session)의 연속된 쓰기는 하나의 create_event로 묶습니다
+    - 실패한 쓰기는 지수 백오프(지터 포함)로 재시도합니다
+    - 큐가 가득 차면 enqueue_timeout 동안 대기한 뒤 호출 스레드에서 직접 기록합니다 (백프레셔)
+    - flush()/shutdown()으로 종료 전에 남은 쓰기를 모두 내보낼 수 있습니다
+    """
+
+    def __init__(
+        self,
+        client: MemoryClient,
+        max_queue_size: int = 1000,
+        num_workers: int = 2,
+        max_batch_size: int = 10,
+        max_retries: int = 3,
+        backoff_base: float = 0.2,
+        backoff_max: float = 5.0,
+        enqueue_timeout: float = 0.05,
+    ):
+        self.client = client
+        self.num_workers = num_workers
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.enqueue_timeout = enqueue_timeout
+
+        self._queue: "queue.Queue[Tuple[str, str, str, List[Tuple[str, str]], datetime]]" = queue.Queue(
+            maxsize=max_queue_size
+        )
+        self._pending = 0
+        self._pending_cond = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._workers_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._counters_lock = threading.Lock()
+        self._counters = {
+            "submitted": 0,
+            "written_events": 0,
+            "written_batches": 0,
+            "retries": 0,
+            "failed": 0,
+            "backpressure_writes": 0,
+        }
+
+    def submit(
+        self, memory_id: str, actor_id: str, session_id: str, messages: List[Tuple[str, str]]
+    ) -> None:
+        """쓰기를 큐에 넣습니다. 큐가 가득 차면 호출 스레드에서 직접 기록합니다."""
+        item = (memory_id, actor_id, session_id, messages, datetime.now(timezone.utc))
+        self._count("submitted")
+
+        if self._stopping.is_set():
+            self._write_with_retry([item])
+            return
+
+        self._ensure_workers()
+        with self._pending_cond:
+            self._pending += 1
+        try:
+            self._queue.put(item, timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._pending_cond:
+                self._pending -= 1
+                self._pending_cond.notify_all()
+            self._count("backpressure_writes")
+            logger.warning("메모리 쓰기 큐가 가득 차서 동기 방식으로 기록합니다")
+            self._write_with_retry([item])
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """큐에 남은 쓰기가 모두 끝날 때까지 기다립니다. 시간 안에 끝나면 True."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._pending_cond:
+            while self._pending > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._pending_cond.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = 10.0) -> bool:
+        """남은 쓰기를 내보내고 워커를 종료합니다."""
+        flushed = self.flush(timeout)
+        self._stopping.set()
+        for worker in self._workers:
+            worker.join(timeout=1.0)
+        if not flushed:
+            logger.warning(f"메모리 쓰기 {self._pending}건을 종료 전에 내보내지 못했습니다")
+        return flushed
+
+    def stats(self) -> Dict[str, int]:
+        """큐 깊이와 처리 카운터를 반환합니다."""
+        with self._counters_lock:
+            counters = dict(self._counters)
+        return {**counters, "queue_depth": self._queue.qsize(), "pending": self._pending}
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._counters_lock:
+            self._counters[name] += amount
+
+    def _ensure_workers(self) -> None:
+        if len(self._workers) >= self.num_workers:
+            return
+        with self._workers_lock:
+            while len(self._workers) < self.num_workers:
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"memory-writer-{len(self._workers)}",
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def _worker_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            # 이미 쌓여 있는 쓰기를 함께 가져와 세션 단위로 묶습니다
+            items = [first]
+            while len(items) < self.max_batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            batches: "OrderedDict[Tuple[str, str, str], List[Tuple]]" = OrderedDict()
+            for item in items:
+                batches.setdefault(item[:3], []).append(item)
+
+            for batch in batches.values():
+                self._write_with_retry(batch)
+
+            with self._pending_cond:
+                self._pending -= len(items)
+                self._pending_cond.notify_all()
+
+    def _write_with_retry(self, batch: List[Tuple]) -> None:
+        memory_id, actor_id, session_id = batch[0][:3]
+        messages = [message for item in batch for message in item[3]]
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.client.create_event(
+                    memory_id=memory_id,
+                    actor_id=actor_id,
+                    session_id=session_id,
+                    messages=messages,
+                    # 큐에 들어온 시각을 유지해 대화 순서가 뒤섞이지 않도록 합니다
+                    event_timestamp=batch[0][4],
+                )
+                self._count("written_batches")
+                self._count("written_events", len(batch))
+                return
+            except Exception as e:
+                error_code = getattr(e, "response", {}).get("Error", {}).get("Code")
+                if attempt >= self.max_retries or error_code in _NON_RETRYABLE_ERROR_CODES:
+                    self._count("failed", len(batch))
+                    _forget_if_not_found(memory_id, e)
+                    logger.error(f"이커머스 상호작용 저장 실패 ({len(batch)}건): {e}")
+                    return
+                self._count("retries")
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+
+_WRITE_BEHIND_QUEUES: Dict[int, MemoryWriteBehindQueue] = {}
+_WRITE_BEHIND_LOCK = threading.Lock()
+
+
+def get_write_behind_queue(client: MemoryClient) -> MemoryWriteBehindQueue:
+    """MemoryClient별로 공유되는 write-behind 큐를 반환합니다."""
+    with _WRITE_BEHIND_LOCK:
+        writer = _WRITE_BEHIND_QUEUES.get(id(client))
+        if writer is None or writer.client is not client:
+            writer = MemoryWriteBehindQueue(client)
+            _WRITE_BEHIND_QUEUES[id(client)] = writer
+        return writer
+
+
+# 종료 시 남은 쓰기를 기다리는 최대 시간 (초)
+MEMORY_FLUSH_TIMEOUT = float(os.environ.get("MEMORY_FLUSH_TIMEOUT", "10"))
+
+
+def flush_memory_writes(timeout: Optional[float] = MEMORY_FLUSH_TIMEOUT) -> bool:
+    """
+    모든 write-behind 큐를 비웁니다.
+
+    세션 종료나 배치 작업 끝처럼 쓰기 완료를 기다려야 할 때만 호출합니다. 응답마다 호출하면
+    턴 시간에 메모리 쓰기 지연이 다시 포함됩니다. 프로세스 종료 시에는 atexit로 자동 실행됩니다.
+    """
+    with _WRITE_BEHIND_LOCK:
+        writers = list(_WRITE_BEHIND_QUEUES.values())
+    return all([writer.flush(timeout) for writer in writers])
+
+
+def _shutdown_memory_writers(timeout: Optional[float] = MEMORY_FLUSH_TIMEOUT) -> None:
+    """프로세스 종료 시 남은 쓰기를 내보내고 워커를 정리합니다."""
+    with _WRITE_BEHIND_LOCK:
+        writers = list(_WRITE_BEHIND_QUEUES.values())
+    for writer in writers:
+        writer.shutdown(timeout)
+
+
+atexit.register(_shutdown_memory_writers)
+
+
+# 세션 시작 시 미리 불러 둔 고객 프로필 맥락 (memory_id, customer_id, session_id) → Future
+PROFILE_PREFETCH_QUERY = "고객 선호 사이즈 브랜드 색상 스타일 피부 타입 구매 반품 교환 이력"
+_MAX_PREFETCHED_SESSIONS = 1024
+_PREFETCHED: "OrderedDict[Tuple[str, str, str], Future]" = OrderedDict()
+_PREFETCH_LOCK = threading.Lock()
+
+
+# 메모리 전략/네임스페이스 메타데이터 캐시 (프로세스 전역, memory_id별)
+MEMORY_METADATA_TTL_SECONDS = 600.0
+_MEMORY_METADATA_CACHE: Dict[str, Tuple[float, Dict[str, str]]] = {}
+_MEMORY_METADATA_LOCK = threading.Lock()
+
+
+def get_memory_namespaces(
+    client: MemoryClient, memory_id: str, ttl_seconds: float = MEMORY_METADATA_TTL_SECONDS
+) -> Dict[str, str]:
+    """
+    메모리 전략 유형별 네임스페이스를 반환합니다.
+
+    get_memory_strategies는 컨트롤 플레인 호출이므로 결과를 TTL 동안 캐시하여
+    훅을 자주 생성하는 경우(Streamlit은 메시지마다 생성)에도 원격 호출이 없도록 합니다.
+    """
+    now = time.monotonic()
+    with _MEMORY_METADATA_LOCK:
+        cached = _MEMORY_METADATA_CACHE.get(memory_id)
+        if cached and cached[0] > now:
+            return dict(cached[1])
+
+    namespaces = {
+        strategy["type"]: strategy["namespaces"][0]
+        for strategy in client.get_memory_strategies(memory_id)
+    }
+
+    with _MEMORY_METADATA_LOCK:
+        _MEMORY_METADATA_CACHE[memory_id] = (now + ttl_seconds, namespaces)
+    return dict(namespaces)
+
+
+def invalidate_memory_metadata(memory_id: Optional[str] = None) -> None:
+    """메모리 메타데이터 캐시를 비웁니다 (memory_id가 없으면 전체)."""
+    with _MEMORY_METADATA_LOCK:
+        if memory_id is None:
+            _MEMORY_METADATA_CACHE.clear()
+        else:
+            _MEMORY_METADATA_CACHE.pop(memory_id, None)
+
 
 class EcommerceCustomerMemoryHooks(HookProvider):
     """패션/뷰티 이커머스 고객 메모리 훅"""
 
     def __init__(
-        self, memory_id: str, client: MemoryClient, customer_id: str, session_id: str
+        self,
+        memory_id: str,
+        client: MemoryClient,
+        customer_id: str,
+        session_id: str,
+        retrieval_timeout: float = 1.5,
+        top_k: int = 3,
+        retrieval_cache: Optional[MemoryRetrievalCache] = DEFAULT_RETRIEVAL_CACHE,
+        write_behind: bool = True,
+        context_token_budget: int = 600,
+        dedup_threshold: float = 0.8,
+        recency_half_life_days: float = 30.0,
+        ephemeral_context: bool = True,
+        dedup_store: Optional[MinHashSignatureStore] = DEFAULT_SIGNATURE_STORE,
     ):
+        """
+        Args:
+            memory_id: AgentCore Memory ID
+            client: MemoryClient 인스턴스
+            customer_id: 고객 ID (actorId)
+            session_id: 세션 ID
+            retrieval_timeout: 전체 네임스페이스 검색에 허용하는 시간 예산 (초).
+                예산을 넘긴 네임스페이스의 결과는 이번 턴에서 제외됩니다.
+            top_k: 네임스페이스별 검색 개수
+            retrieval_cache: 세션 단위 검색 캐시 (None이면 매 턴 검색)
+            write_behind: True면 상호작용 저장을 백그라운드 큐로 넘겨
+                응답 경로에서 메모리 쓰기 지연을 제거합니다
+            context_token_budget: 주입할 고객 맥락의 최대 토큰 수 (추정치)
+            dedup_threshold: 이 값 이상으로 유사한 메모리는 하나만 남깁니다 (문자 bigram Jaccard)
+            recency_half_life_days: 최신성 가중치가 절반이 되는 기간 (일)
+            ephemeral_context: True면 맥락을 현재 모델 호출에만 주입하고
+                대화 기록에는 남기지 않습니다
+            dedup_store: 고객별 MinHash 서명 저장소. 최근에 저장한 질문/응답과 모두 근사 중복인
+                상호작용은 저장하지 않습니다 (None이면 모두 저장)
+        """
         self.memory_id = memory_id
         self.client = client
         self.customer_id = customer_id
         self.session_id = session_id
-        self.namespaces = {
-            strategy["type"]: strategy["namespaces"][0]
-            for strategy in self.client.get_memory_strategies(self.memory_id)
-        }
+        self.retrieval_timeout = retrieval_timeout
+        self.top_k = top_k
+        self.retrieval_cache = retrieval_cache
+        self.writer = get_write_behind_queue(client) if write_behind else None
+        self.context_token_budget = context_token_budget
+        self.dedup_threshold = dedup_threshold
+        self.recency_half_life_days = recency_half_life_days
+        self.ephemeral_context = ephemeral_context
+        self.dedup_store = dedup_store
+        # 이번 턴에 주입할 (사용자 메시지 content 블록, 맥락이 포함된 텍스트)
+        self._pending_context: Optional[Tuple[Dict[str, Any], str]] = None
+        # 모델 호출 동안 맥락으로 바꿔 둔 (content 블록, 원래 텍스트)
+        self._injected: Optional[Tuple[Dict[str, Any], str]] = None
+        # 마지막 턴의 네임스페이스별 검색 지연 시간 (ms)
+        self.last_retrieval_latencies: Dict[str, float] = {}
+        self.namespaces: Dict[str, str] = {}
+        if memory_id is None:
+            # 메모리 리소스를 확인하지 못한 경우(일시적 오류 등): 메모리 없이 동작
+            logger.warning("메모리 ID가 없어 고객 메모리 훅을 사용하지 않습니다")
+            return
+        try:
+            self.namespaces = get_memory_namespaces(self.client, self.memory_id)
+        except Exception as e:
+            if not _forget_if_not_found(self.memory_id, e):
+                raise
+            self.memory_id = None
 
     def retrieve_customer_context(self, event: MessageAddedEvent):
         """고객 맥락을 검색하여 개인화된 응답을 제공합니다."""
@@ -34,47 +520,270 @@ class EcommerceCustomerMemoryHooks(HookProvider):
         ):
             user_query = messages[-1]["content"][0]["text"]
 
+            self._pending_context = None
+
             try:
-                all_context = []
-
-                for context_type, namespace in self.namespaces.items():
-                    # AgentCore Memory에서 고객 맥락 검색
-                    memories = self.client.retrieve_memories(
-                        memory_id=self.memory_id,
-                        namespace=namespace.format(actorId=self.customer_id),
-                        query=user_query,
-                        top_k=3,
-                    )
+                # AgentCore Memory에서 고객 맥락 검색 (세션 캐시 → 네임스페이스 병렬)
+                retrieved = self._retrieve_with_cache(user_query)
 
-                    # 메모리를 맥락 문자열로 포맷
-                    for memory in memories:
-                        if isinstance(memory, dict):
-                            content = memory.get("content", {})
-                            if isinstance(content, dict):
-                                text = content.get("text", "").strip()
-                                if text:
-                                    # 이커머스 특화 맥락 태그
-                                    context_tag = self._get_context_tag(context_type, text)
-                                    all_context.append(f"[{context_tag}] {text}")
+                # 중복 제거 · 순위화 · 토큰 예산에 맞춘 맥락 구성
+                all_context = self._assemble_context(retrieved)
 
                 # 고객 맥락을 쿼리에 주입
                 if all_context:
-                    context_text = "\\n".join(all_context)
-                    original_text = messages[-1]["content"][0]["text"]
+                    context_text = "\n".join(all_context)
 
                     # 한국어로 맥락 정보 제공
-                    messages[-1]["content"][0]["text"] = f"""고객 정보:
+                    augmented_text = f"""고객 정보:
 {context_text}
 
-고객 문의: {original_text}"""
+고객 문의: {user_query}"""
+
+                    if self.ephemeral_context:
+                        # 모델 호출 직전에만 주입하고 호출이 끝나면 원문으로 되돌립니다
+                        self._pending_context = (messages[-1]["content"][0], augmented_text)
+                    else:
+                        messages[-1]["content"][0]["text"] = augmented_text
 
                     logger.info(f"고객 맥락 {len(all_context)}개 항목 검색 완료")
 
             except Exception as e:
                 logger.error(f"고객 맥락 검색 실패: {e}")
 
+    def inject_pending_context(self, event: BeforeModelCallEvent):
+        """이번 턴의 고객 맥락을 모델 호출 동안에만 사용자 메시지에 주입합니다."""
+        if self._pending_context is None or self._injected is not None:
+            return
+        block, augmented_text = self._pending_context
+        self._injected = (block, block["text"])
+        block["text"] = augmented_text
+
+    def restore_original_message(self, event: AfterModelCallEvent):
+        """모델 호출이 끝나면 사용자 메시지를 원래 텍스트로 되돌립니다."""
+        if self._injected is None:
+            return
+        block, original_text = self._injected
+        block["text"] = original_text
+        self._injected = None
+
+    def _assemble_context(self, retrieved: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+        """
+        검색된 메모리를 주입할 맥락 목록으로 구성합니다.
+
+        1. 검색 점수와 최신성(반감기 기반 가중치)으로 순위를 매기고
+        2. 상위 항목과 거의 같은 메모리는 제외한 뒤
+        3. 토큰 예산 안에 들어오는 항목만 남깁니다
+        """
+        now = time.time()
+        candidates = []
+        for context_type, memories in retrieved.items():
+            for memory in memories:
+                if not isinstance(memory, dict):
+                    continue
+                content = memory.get("content", {})
+                if not isinstance(content, dict):
+                    continue
+                text = content.get("text", "").strip()
+                if not text:
+                    continue
+
+                score = float(memory.get("score") or 0.0)
+                created_at = _to_epoch(memory.get("createdAt"))
+                if created_at is not None and self.recency_half_life_days > 0:
+                    age_days = max(0.0, now - created_at) / 86400
+                    recency = 0.5 ** (age_days / self.recency_half_life_days)
+                else:
+                    recency = 0.0
+                candidates.append((score + 0.5 * recency, context_type, text))
+
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        all_context: List[str] = []
+        kept_grams: List[Set[str]] = []
+        used_tokens = 0
+        for _, context_type, text in candidates:
+            grams = _char_ngrams(text)
+            if any(_jaccard(grams, kept) >= self.dedup_threshold for kept in kept_grams):
+                continue
+
+            # 이커머스 특화 맥락 태그
+            context_tag = self._get_context_tag(context_type, text)
+            line = f"[{context_tag}] {text}"
+            line_tokens = estimate_tokens(line)
+            if used_tokens + line_tokens > self.context_token_budget:
+                continue
+
+            all_context.append(line)
+            kept_grams.append(grams)
+            used_tokens += line_tokens
+
+        return all_context
+
+    def prefetch_customer_context(self) -> Future:
+        """
+        세션 시작 시점에 고객 선호도와 일반 프로필 맥락을 비동기로 불러옵니다.
+
+        Streamlit 세션 생성이나 런타임 세션 시작 시 호출하면, 첫 번째 고객 메시지에서는
+        선호도 네임스페이스를 다시 검색하지 않고 미리 불러 둔 결과를 사용합니다.
+        이후 턴은 질의별 검색만 수행합니다.
+        """
+        if self.memory_id is None:
+            future = Future()
+            future.set_result({})
+            return future
+        key = (self.memory_id, self.customer_id, self.session_id)
+        with _PREFETCH_LOCK:
+            future = _PREFETCHED.get(key)
+            if future is not None:
+                return future
+
+            future = _RETRIEVAL_EXECUTOR.submit(self._load_profile_context)
+            _PREFETCHED[key] = future
+            while len(_PREFETCHED) > _MAX_PREFETCHED_SESSIONS:
+                _PREFETCHED.popitem(last=False)
+
+        logger.info("고객 프로필 맥락 미리 불러오기 시작")
+        return future
+
+    def _load_profile_context(self) -> Dict[str, List[Dict[str, Any]]]:
+        """모든 네임스페이스에서 질의와 무관한 고객 프로필 맥락을 검색합니다."""
+        profile: Dict[str, List[Dict[str, Any]]] = {}
+        latencies: Dict[str, float] = {}
+        for context_type, namespace in self.namespaces.items():
+            profile[context_type] = self._retrieve_namespace(
+                context_type, namespace, PROFILE_PREFETCH_QUERY, latencies
+            )
+        logger.info(f"고객 프로필 맥락 미리 불러오기 완료 (ms): {latencies}")
+        return profile
+
+    def _take_prefetched_profile(self) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        프리페치 결과를 한 번만 꺼내 반환합니다 (첫 턴 전용).
+
+        아직 끝나지 않았으면 retrieval_timeout까지만 기다리고, 그래도 끝나지 않으면
+        취소하여 이후 턴에 뒤늦게 섞여 들어가지 않도록 합니다.
+        """
+        key = (self.memory_id, self.customer_id, self.session_id)
+        with _PREFETCH_LOCK:
+            future = _PREFETCHED.pop(key, None)
+        if future is None:
+            return None
+
+        try:
+            return future.result(timeout=self.retrieval_timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.warning(
+                f"고객 프로필 맥락 미리 불러오기가 {self.retrieval_timeout:.2f}초 안에 "
+                "끝나지 않아 일반 검색으로 진행합니다"
+            )
+            return None
+        except Exception as e:
+            logger.error(f"고객 프로필 맥락 미리 불러오기 실패: {e}")
+            return None
+
+    def _retrieve_with_cache(self, query: str) -> Dict[str, List[Dict[str, Any]]]:
+        """세션 캐시에 재사용 가능한 결과가 있으면 사용하고, 없으면 새로 검색합니다."""
+        profile = self._take_prefetched_profile()
+        if profile is not None:
+            # 첫 턴: 선호도는 미리 불러 둔 결과를 쓰고, 나머지 네임스페이스만 질의별로 검색
+            query_namespaces = {
+                context_type: namespace
+                for context_type, namespace in self.namespaces.items()
+                if context_type.upper() != "USER_PREFERENCE"
+            }
+            retrieved = self._retrieve_all_namespaces(query, query_namespaces)
+            merged = {
+                context_type: profile.get(context_type, []) + retrieved.get(context_type, [])
+                for context_type in self.namespaces
+            }
+            if self.retrieval_cache is not None and len(retrieved) == len(query_namespaces):
+                self.retrieval_cache.store(self.customer_id, self.session_id, query, merged)
+            return merged
+
+        if self.retrieval_cache is not None:
+            cached = self.retrieval_cache.lookup(self.customer_id, self.session_id, query)
+            if cached is not None:
+                logger.info("세션 검색 캐시 적중 - 메모리 검색을 건너뜁니다")
+                return cached
+
+        retrieved = self._retrieve_all_namespaces(query)
+
+        # 시간 예산 초과로 일부 네임스페이스가 빠진 결과는 재사용하지 않습니다
+        if self.retrieval_cache is not None and len(retrieved) == len(self.namespaces):
+            self.retrieval_cache.store(self.customer_id, self.session_id, query, retrieved)
+
+        return retrieved
+
+    def _retrieve_all_namespaces(
+        self, query: str, namespaces: Optional[Dict[str, str]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        네임스페이스(기본값: 전체)를 병렬로 검색하고, 시간 예산 안에 도착한 결과만 반환합니다.
+
+        예산을 넘긴 검색은 결과를 버리고(늦게 끝나면 지연 시간만 기록), 이미 도착한
+        네임스페이스의 결과만으로 맥락을 구성합니다.
+        """
+        if namespaces is None:
+            namespaces = self.namespaces
+        latencies: Dict[str, float] = {}
+        self.last_retrieval_latencies = latencies
+
+        futures = {
+            _RETRIEVAL_EXECUTOR.submit(
+                self._retrieve_namespace, context_type, namespace, query, latencies
+            ): context_type
+            for context_type, namespace in namespaces.items()
+        }
+        done, not_done = wait(futures, timeout=self.retrieval_timeout)
+
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        for future in done:
+            context_type = futures[future]
+            try:
+                results[context_type] = future.result()
+            except Exception as e:
+                logger.error(f"{context_type} 네임스페이스 검색 실패: {e}")
+
+        for future in not_done:
+            future.cancel()
+            logger.warning(
+                f"{futures[future]} 네임스페이스 검색이 시간 예산 "
+                f"({self.retrieval_timeout:.2f}초)을 초과하여 결과를 제외합니다"
+            )
+
+        logger.info(f"네임스페이스별 메모리 검색 지연 시간(ms): {latencies}")
+
+        # 네임스페이스 선언 순서를 유지하여 맥락 순서가 흔들리지 않도록 합니다
+        return {
+            context_type: results[context_type]
+            for context_type in namespaces
+            if context_type in results
+        }
+
+    def _retrieve_namespace(
+        self, context_type: str, namespace: str, query: str, latencies: Dict[str, float]
+    ) -> List[Dict[str, Any]]:
+        """단일 네임스페이스를 검색하고 지연 시간을 기록합니다."""
+        started = time.perf_counter()
+        try:
+            return self.client.retrieve_memories(
+                memory_id=self.memory_id,
+                namespace=namespace.format(actorId=self.customer_id),
+                query=query,
+                top_k=self.top_k,
+            )
+        except Exception as e:
+            _forget_if_not_found(self.memory_id, e)
+            raise
+        finally:
+            latencies[context_type] = round((time.perf_counter() - started) * 1000, 1)
+
     def save_ecommerce_interaction(self, event: AfterInvocationEvent):
         """이커머스 상호작용을 저장합니다."""
+        # 이번 턴의 맥락은 다음 턴으로 넘기지 않습니다
+        self._pending_context = None
+
         try:
             messages = event.agent.messages
             if len(messages) >= 2 and messages[-1]["role"] == "assistant":
@@ -93,25 +802,49 @@ class EcommerceCustomerMemoryHooks(HookProvider):
                         customer_query = msg["content"][0]["text"]
                         break
 
+                signature = None
+                if customer_query and agent_response and self.dedup_store is not None:
+                    similarity, signature = self.dedup_store.check(
+                        self.customer_id, customer_query, agent_response
+                    )
+                    if similarity is not None:
+                        logger.info(f"근사 중복 상호작용 저장 생략 (유사도 {similarity:.2f})")
+                        return
+
                 if customer_query and agent_response:
                     # 이커머스 상호작용 저장
-                    self.client.create_event(
-                        memory_id=self.memory_id,
-                        actor_id=self.customer_id,
-                        session_id=self.session_id,
-                        messages=[
-                            (customer_query, "USER"),
-                            (agent_response, "ASSISTANT"),
-                        ],
-                    )
-                    logger.info("이커머스 상호작용 메모리에 저장 완료")
+                    interaction = [
+                        (customer_query, "USER"),
+                        (agent_response, "ASSISTANT"),
+                    ]
+                    if self.writer is not None:
+                        self.writer.submit(
+                            self.memory_id, self.customer_id, self.session_id, interaction
+                        )
+                        logger.info("이커머스 상호작용 메모리 저장 대기열에 추가")
+                    else:
+                        self.client.create_event(
+                            memory_id=self.memory_id,
+                            actor_id=self.customer_id,
+                            session_id=self.session_id,
+                            messages=interaction,
+                        )
+                        logger.info("이커머스 상호작용 메모리에 저장 완료")
+                    if signature is not None:
+                        # 저장을 넘긴 뒤에만 비교 대상에 추가 (실패한 쓰기가 이후 저장을 막지 않도록)
+                        self.dedup_store.add(self.customer_id, signature)
 
         except Exception as e:
+            _forget_if_not_found(self.memory_id, e)
             logger.error(f"이커머스 상호작용 저장 실패: {e}")
 
     def register_hooks(self, registry: HookRegistry) -> None:
-        """이커머스 메모리 훅을 등록합니다."""
+        """이커머스 메모리 훅을 등록합니다 (메모리 ID가 없으면 등록하지 않음)."""
+        if self.memory_id is None:
+            return
         registry.add_callback(MessageAddedEvent, self.retrieve_customer_context)
+        registry.add_callback(BeforeModelCallEvent, self.inject_pending_context)
+        registry.add_callback(AfterModelCallEvent, self.restore_original_message)
         registry.add_callback(AfterInvocationEvent, self.save_ecommerce_interaction)
         logger.info("이커머스 고객 메모리 훅 등록 완료")
 
@@ -145,8 +878,150 @@ class EcommerceCustomerMemoryHooks(HookProvider):
             return context_type.upper()
 
 
-def create_or_get_ecommerce_memory_resource():
-    """이커머스 전용 메모리 리소스를 생성하거나 가져옵니다."""
+MEMORY_ID_PARAMETER = "/app/ecommerce/agentcore/memory_id"
+
+# 해석된 메모리 리소스 ID 캐시 (프로세스 내 + 로컬 파일, 계정/리전/메모리 이름별)
+MEMORY_RESOURCE_CACHE_TTL_SECONDS = 3600.0
+MEMORY_RESOURCE_CACHE_PATH = os.environ.get(
+    "ECOMMERCE_MEMORY_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "ecommerce_agent", "memory_resource.json"),
+)
+_RESOLVED_MEMORY: Dict[str, Tuple[float, str]] = {}
+_RESOLVED_MEMORY_LOCK = threading.Lock()
+
+# "리소스가 없음"을 뜻하는 오류 코드 (이 경우에만 새로 생성)
+_NOT_FOUND_ERROR_CODES = {"ParameterNotFound", "ResourceNotFoundException"}
+
+
+def _is_not_found(error: Exception) -> bool:
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return code in _NOT_FOUND_ERROR_CODES
+
+
+def _forget_if_not_found(memory_id: Optional[str], error: Exception) -> bool:
+    """메모리 호출이 리소스 없음으로 실패하면 해당 ID의 캐시를 지웁니다 (지웠으면 True)."""
+    if memory_id is None or not _is_not_found(error):
+        return False
+    logger.warning(f"메모리 리소스가 없습니다. 캐시에서 제거하고 다음 조회 때 다시 확인합니다: {memory_id}")
+    forget_memory_resource(memory_id)
+    return True
+
+
+_ACCOUNT_ID: Optional[str] = None
+
+
+def _memory_cache_key(session, memory_name: str) -> Optional[str]:
+    """
+    캐시 키 (계정/리전/메모리 이름). 계정을 확인할 수 없으면 캐시를 쓰지 않습니다.
+
+    계정 ID는 프로세스에서 한 번만 STS로 확인합니다.
+    """
+    global _ACCOUNT_ID
+    if _ACCOUNT_ID is None:
+        try:
+            _ACCOUNT_ID = session.client("sts").get_caller_identity()["Account"]
+        except Exception as e:
+            logger.warning(f"계정 ID 확인 실패 - 메모리 리소스 캐시를 사용하지 않습니다: {e}")
+            return None
+    return f"{_ACCOUNT_ID}/{session.region_name or 'default'}/{memory_name}"
+
+
+def _read_cached_memory_id(cache_key: str) -> Optional[str]:
+    """프로세스 캐시 → 파일 캐시 순서로 만료되지 않은 메모리 ID를 찾습니다."""
+    now = time.time()
+    with _RESOLVED_MEMORY_LOCK:
+        cached = _RESOLVED_MEMORY.get(cache_key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    try:
+        with open(MEMORY_RESOURCE_CACHE_PATH, encoding="utf-8") as f:
+            entry = json.load(f).get(cache_key)
+    except (OSError, ValueError):
+        return None
+    if not entry or entry["expires_at"] <= now:
+        return None
+
+    with _RESOLVED_MEMORY_LOCK:
+        _RESOLVED_MEMORY[cache_key] = (entry["expires_at"], entry["memory_id"])
+    return entry["memory_id"]
+
+
+def _update_cache_file(cache_key: str, entry: Optional[Dict[str, Any]]) -> None:
+    """파일 캐시의 항목을 바꾸거나(entry) 지웁니다(None)."""
+    try:
+        try:
+            with open(MEMORY_RESOURCE_CACHE_PATH, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        if entry is None:
+            if state.pop(cache_key, None) is None:
+                return
+        else:
+            state[cache_key] = entry
+
+        os.makedirs(os.path.dirname(MEMORY_RESOURCE_CACHE_PATH), exist_ok=True)
+        tmp_path = f"{MEMORY_RESOURCE_CACHE_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, MEMORY_RESOURCE_CACHE_PATH)
+    except OSError as e:
+        logger.warning(f"메모리 리소스 캐시 파일 저장 실패: {e}")
+
+
+def _write_cached_memory_id(cache_key: str, memory_id: str) -> None:
+    expires_at = time.time() + MEMORY_RESOURCE_CACHE_TTL_SECONDS
+    with _RESOLVED_MEMORY_LOCK:
+        _RESOLVED_MEMORY[cache_key] = (expires_at, memory_id)
+    _update_cache_file(cache_key, {"memory_id": memory_id, "expires_at": expires_at})
+
+
+def _drop_cached_memory_id(cache_key: str) -> None:
+    with _RESOLVED_MEMORY_LOCK:
+        _RESOLVED_MEMORY.pop(cache_key, None)
+    _update_cache_file(cache_key, None)
+
+
+def forget_memory_resource(memory_id: str) -> None:
+    """이 메모리 ID를 가리키는 캐시 항목(프로세스/파일)과 메타데이터 캐시를 지웁니다."""
+    with _RESOLVED_MEMORY_LOCK:
+        keys = {key for key, (_, cached_id) in _RESOLVED_MEMORY.items() if cached_id == memory_id}
+    try:
+        with open(MEMORY_RESOURCE_CACHE_PATH, encoding="utf-8") as f:
+            keys |= {key for key, entry in json.load(f).items() if entry.get("memory_id") == memory_id}
+    except (OSError, ValueError, AttributeError):
+        pass
+    for key in keys:
+        _drop_cached_memory_id(key)
+    invalidate_memory_metadata(memory_id)
+
+
+def invalidate_memory_resource_cache() -> None:
+    """해석된 메모리 리소스 캐시(프로세스/파일)를 비웁니다. 메모리를 삭제한 뒤 호출합니다."""
+    with _RESOLVED_MEMORY_LOCK:
+        _RESOLVED_MEMORY.clear()
+    try:
+        os.remove(MEMORY_RESOURCE_CACHE_PATH)
+    except OSError:
+        pass
+
+
+def create_or_get_ecommerce_memory_resource(refresh: bool = False):
+    """
+    이커머스 전용 메모리 리소스를 생성하거나 가져옵니다.
+
+    해석된 메모리 ID는 계정/리전/메모리 이름별로 프로세스 내와 로컬 파일에 TTL 동안 캐시되어,
+    Streamlit 워커나 런타임 컨테이너가 시작할 때 SSM/get_memory 호출 없이 반환합니다 (계정 ID 확인용
+    STS 호출은 프로세스당 한 번). 캐시된 ID로 메모리를 호출했다가 리소스가 없다는 응답을 받으면
+    그때 캐시 항목을 지우고(forget_memory_resource), 다음 호출에서 SSM으로 다시 확인합니다.
+    리소스가 없다는 응답(ParameterNotFound, ResourceNotFoundException)일 때만 새로 만들고,
+    스로틀링 같은 일시적 오류에서는 생성하지 않고 None을 반환합니다. 호출하는 쪽은 None이면 메모리
+    없이 진행해야 합니다 (EcommerceCustomerMemoryHooks는 memory_id가 None이면 아무것도 하지 않음).
+
+    Args:
+        refresh: True면 캐시를 무시하고 다시 확인합니다
+    """
     import boto3
     from bedrock_agentcore.memory.constants import StrategyType
     try:
@@ -155,62 +1030,74 @@ def create_or_get_ecommerce_memory_resource():
         from src.helpers.utils import get_ssm_parameter, put_ssm_parameter
 
     session = boto3.session.Session()
-    region = session.region_name
-
-    memory_client = MemoryClient(region_name=region)
+    memory_client = MemoryClient(region_name=session.region_name)
     memory_name = "EcommerceCustomerMemory"
+    cache_key = _memory_cache_key(session, memory_name)
+
+    cached_id = _read_cached_memory_id(cache_key) if cache_key and not refresh else None
+    if cached_id:
+        return cached_id
 
     try:
         # 기존 메모리 ID 확인
-        memory_id = get_ssm_parameter("/app/ecommerce/agentcore/memory_id")
+        memory_id = get_ssm_parameter(MEMORY_ID_PARAMETER)
         memory_client.gmcp_client.get_memory(memoryId=memory_id)
+        if cache_key:
+            _write_cached_memory_id(cache_key, memory_id)
         return memory_id
-    except:
-        try:
-            # 이커머스 특화 메모리 전략
-            strategies = [
-                {
-                    StrategyType.USER_PREFERENCE.value: {
-                        "name": "EcommerceCustomerPreferences",
-                        "description": "고객의 패션/뷰티 선호도, 사이즈, 브랜드 등을 저장",
-                        "namespaces": ["ecommerce/customer/{actorId}/preferences"],
-                    }
-                },
-                {
-                    StrategyType.SEMANTIC.value: {
-                        "name": "EcommerceCustomerHistory",
-                        "description": "고객의 구매 이력, 반품/교환 내역, 문의 사항 저장",
-                        "namespaces": ["ecommerce/customer/{actorId}/history"],
-                    }
-                },
-            ]
+    except Exception as e:
+        if not _is_not_found(e):
+            # 일시적 오류: 확인되지 않은 ID를 돌려주지 않고, 리소스 생성도 시도하지 않음
+            print(f"메모리 리소스 확인 중 일시적 오류 (생성하지 않음): {e}")
+            return None
 
-            print("이커머스 AgentCore Memory 리소스 생성 중... 몇 분 소요될 수 있습니다.")
+    try:
+        # 이커머스 특화 메모리 전략
+        strategies = [
+            {
+                StrategyType.USER_PREFERENCE.value: {
+                    "name": "EcommerceCustomerPreferences",
+                    "description": "고객의 패션/뷰티 선호도, 사이즈, 브랜드 등을 저장",
+                    "namespaces": ["ecommerce/customer/{actorId}/preferences"],
+                }
+            },
+            {
+                StrategyType.SEMANTIC.value: {
+                    "name": "EcommerceCustomerHistory",
+                    "description": "고객의 구매 이력, 반품/교환 내역, 문의 사항 저장",
+                    "namespaces": ["ecommerce/customer/{actorId}/history"],
+                }
+            },
+        ]
 
-            # 이커머스 메모리 리소스 생성
-            response = memory_client.create_memory_and_wait(
-                name=memory_name,
-                description="패션/뷰티 이커머스 고객 지원 메모리",
-                strategies=strategies,
-                event_expiry_days=90,  # 메모리는 90일 후 만료
-            )
+        print("이커머스 AgentCore Memory 리소스 생성 중... 몇 분 소요될 수 있습니다.")
+
+        # 이커머스 메모리 리소스 생성
+        response = memory_client.create_memory_and_wait(
+            name=memory_name,
+            description="패션/뷰티 이커머스 고객 지원 메모리",
+            strategies=strategies,
+            event_expiry_days=90,  # 메모리는 90일 후 만료
+        )
 
-            memory_id = response["id"]
+        memory_id = response["id"]
 
-            try:
-                put_ssm_parameter(
-                    "/app/ecommerce/agentcore/memory_id",
-                    memory_id,
-                    "이커머스 고객 메모리 ID"
-                )
-            except:
-                pass
+        try:
+            put_ssm_parameter(
+                MEMORY_ID_PARAMETER,
+                memory_id,
+                "이커머스 고객 메모리 ID"
+            )
+        except Exception:
+            pass
 
-            return memory_id
+        if cache_key:
+            _write_cached_memory_id(cache_key, memory_id)
+        return memory_id
 
-        except Exception as e:
-            print(f"메모리 리소스 생성 실패: {e}")
-            return None
+    except Exception as e:
+        print(f"메모리 리소스 생성 실패: {e}")
+        return None
 
 
 # 이커머스 특화 메모리 시드 데이터
@@ -2,11 +2,21 @@
 AgentCore Runtime용 이커머스 고객 지원 에이전트
 모든 코드가 인라인으로 포함되어 Docker 컨테이너에서 독립적으로 실행됩니다.
 """
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 from bedrock_agentcore.runtime import (
     BedrockAgentCoreApp,
+    PingStatus,
 )  #### AGENTCORE RUNTIME - LINE 1 ####
+from starlette.responses import JSONResponse
 from strands import Agent
-from strands.models import BedrockModel
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+from strands.models import BedrockModel, CacheConfig
 from strands.tools import tool
 
 # ============================================================
@@ -154,22 +164,171 @@ def get_product_recommendations(category: str, budget: str = "상관없음") ->
 # ============================================================
 # 에이전트 및 런타임 앱 설정
 # ============================================================
-model = BedrockModel(model_id=ECOMMERCE_MODEL_ID)
+# 시스템 프롬프트와 도구 정의 끝에 프롬프트 캐시 체크포인트 (PROMPT_CACHE=false이면 사용 안 함)
+# 의도 기반 모델 라우팅(model_router)은 이 독립 실행 파일에 인라인하지 않으므로 항상 ECOMMERCE_MODEL_ID 사용
+# (라우팅이 필요하면 notebooks/lab-04-agentcore-runtime/lab4_runtime.py 사용)
+model = BedrockModel(
+    model_id=ECOMMERCE_MODEL_ID,
+    **({"cache_config": CacheConfig(strategy="auto", tools_ttl=True)}
+       if os.environ.get("PROMPT_CACHE", "true").lower() == "true" else {}),
+)
+
+# ============================================================
+# 대화 기록 압축 (인라인)
+# history_compaction.HistoryCompactionManager와 같은 방식: 최근 메시지 밖의 도구 결과는
+# 한 줄 요약으로 바꾸고, 최근 window_size개 메시지만 유지합니다 (대화 요약은 사용하지 않음).
+# ============================================================
+TOOL_DIGEST_PREFIX = "[도구 결과 요약]"
+
+
+class HistoryCompactionManager(SlidingWindowConversationManager):
+    """슬라이딩 윈도우 + 오래된 도구 결과 요약"""
+
+    def __init__(self, window_size: int = 40, keep_tool_results_messages: int = 4, digest_chars: int = 120):
+        super().__init__(window_size=window_size)
+        self.keep_tool_results_messages = keep_tool_results_messages
+        self.digest_chars = digest_chars
 
+    def apply_management(self, agent, **kwargs):
+        names = {
+            block["toolUse"]["toolUseId"]: block["toolUse"]["name"]
+            for message in agent.messages for block in message["content"] if "toolUse" in block
+        }
+        for message in agent.messages[:max(len(agent.messages) - self.keep_tool_results_messages, 0)]:
+            for block in message["content"]:
+                result = block.get("toolResult")
+                if not result:
+                    continue
+                text = "\n".join(item["text"] for item in result.get("content", []) if "text" in item)
+                if not text or text.startswith(TOOL_DIGEST_PREFIX):
+                    continue
+                lines = [line.strip(" -•*\t") for line in text.splitlines() if line.strip(" -•*\t")]
+                # 첫 줄(결과 제목)과 "키: 값" 줄을 길이 제한까지 남김
+                summary = lines[0] if lines else ""
+                for line in lines[1:]:
+                    if ":" in line and len(summary) + len(line) + 3 <= self.digest_chars:
+                        summary = f"{summary} | {line}"
+                digest = (f"{TOOL_DIGEST_PREFIX} {names.get(result.get('toolUseId'), 'unknown')} "
+                          f"({result.get('status', 'success')}): {summary[:self.digest_chars]} (원본 {len(text)}자)")
+                if len(digest) < len(text):
+                    result["content"] = [{"text": digest}]
+        super().apply_management(agent, **kwargs)
+
+
+# 공유 에이전트의 대화 기록이 끝없이 쌓이지 않도록 최근 메시지만 유지하고 오래된 도구 결과는 요약
 agent = Agent(
     model=model,
     tools=[check_return_eligibility, process_return_request, get_product_recommendations],
     system_prompt=ECOMMERCE_SYSTEM_PROMPT,
+    conversation_manager=HistoryCompactionManager(
+        window_size=int(os.environ.get("AGENT_HISTORY_WINDOW_SIZE", "40")),
+    ),
+)
+
+
+# ============================================================
+# 승인 제어 (인라인)
+# 동시 실행 한도를 넘는 요청은 마감 시간까지 FIFO로 대기하고,
+# 대기열이 가득 차거나 마감 시간이 지나면 재시도 힌트와 함께 즉시 거절합니다.
+# ============================================================
+class AdmissionRejected(Exception):
+    """동시 실행 한도와 대기열이 모두 찬 경우"""
+
+    def __init__(self, reason: str, retry_after_seconds: float):
+        super().__init__(f"{reason} ({retry_after_seconds:.1f}초 후 재시도)")
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionController:
+    """동시 실행 한도 + 마감 시간이 있는 FIFO 대기열 (동기 엔트리포인트용)"""
+
+    def __init__(self, max_concurrency: int = 1, max_queue: int = 16, queue_timeout_seconds: float = 5.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._lock = threading.Lock()
+        self._waiters = deque()
+        self._in_flight = 0
+        self._service_ewma_s = 1.0
+        self.counts = {"admitted": 0, "rejected": 0, "timed_out": 0}
+
+    def _reject(self, reason: str, key: str):
+        self.counts[key] += 1
+        backlog = (len(self._waiters) + 1) / self.max_concurrency
+        raise AdmissionRejected(reason, round(max(1.0, backlog * self._service_ewma_s), 1))
+
+    @contextmanager
+    def admit(self):
+        started = time.monotonic()
+        waiter = threading.Event()
+        with self._lock:
+            queued = not (self._in_flight < self.max_concurrency and not self._waiters)
+            if not queued:
+                self._in_flight += 1
+            elif len(self._waiters) >= self.max_queue:
+                self._reject("동시 요청이 많아 처리할 수 없습니다", "rejected")
+            else:
+                self._waiters.append(waiter)
+
+        if queued and not waiter.wait(self.queue_timeout_seconds):
+            with self._lock:
+                # 시간 초과와 슬롯 전달이 겹친 경우에는 그대로 실행
+                if not waiter.is_set():
+                    self._waiters.remove(waiter)
+                    self._reject("대기 시간이 초과되었습니다", "timed_out")
+
+        admitted = time.monotonic()
+        with self._lock:
+            self.counts["admitted"] += 1
+        try:
+            yield admitted - started
+        finally:
+            with self._lock:
+                self._service_ewma_s = 0.8 * self._service_ewma_s + 0.2 * (time.monotonic() - admitted)
+                if self._waiters:
+                    # 실행 중 수는 그대로 두고 슬롯을 다음 대기자에게 넘김
+                    self._waiters.popleft().set()
+                else:
+                    self._in_flight -= 1
+
+    def is_busy(self) -> bool:
+        return self._in_flight >= self.max_concurrency
+
+    def gauges(self) -> dict:
+        return {"in_flight": self._in_flight, "queued": len(self._waiters), **self.counts}
+
+
+# 모든 요청이 하나의 에이전트를 공유하므로 기본 동시 실행 수는 1
+# (strands Agent는 동시 호출을 지원하지 않음)
+admission = AdmissionController(
+    max_concurrency=int(os.environ.get("AGENT_MAX_IN_FLIGHT", "1")),
+    max_queue=int(os.environ.get("ADMISSION_MAX_QUEUE", "16")),
+    queue_timeout_seconds=float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECONDS", "5")),
 )
 
 app = BedrockAgentCoreApp()  #### AGENTCORE RUNTIME - LINE 2 ####
 
 
+@app.ping
+def ping():
+    """모든 실행 슬롯이 사용 중이면 HealthyBusy를 보고"""
+    return PingStatus.HEALTHY_BUSY if admission.is_busy() else PingStatus.HEALTHY
+
+
 @app.entrypoint  #### AGENTCORE RUNTIME - LINE 3 ####
 def invoke(payload):
     """AgentCore Runtime 엔트리포인트 함수"""
     user_input = payload.get("prompt", "")
-    response = agent(user_input)
+    try:
+        with admission.admit():
+            response = agent(user_input)
+    except AdmissionRejected as e:
+        return JSONResponse(
+            {"error": str(e), "error_type": "ServerBusy", "retry_after_seconds": e.retry_after_seconds},
+            status_code=429,
+            headers={"Retry-After": str(math.ceil(e.retry_after_seconds))},
+        )
     return response.message["content"][0]["text"]
 
 
@@ -0,0 +1,389 @@
+"""
+로컬 인메모리 MemoryClient 대역
+AgentCore Memory 없이 메모리 훅의 오버헤드와 동시성 동작을 측정하기 위한 구현
+
+- MemoryClient와 같은 이름/인자의 메서드를 제공합니다
+  (retrieve_memories, create_event, list_memories, get_memory_strategies, create_memory_and_wait)
+- 네임스페이스별 문자 n-gram BM25 인덱스로 검색합니다
+- persist_path를 지정하면 로컬 JSON 파일에 저장/복원합니다
+- latency_ms로 메서드별 인공 지연을 넣어 원격 호출을 흉내 냅니다
+"""
+
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# create_memory_and_wait에 전달되는 전략 키 → get_memory_strategies의 type 값
+_STRATEGY_TYPES = {
+    "semanticMemoryStrategy": "SEMANTIC",
+    "summaryMemoryStrategy": "SUMMARIZATION",
+    "userPreferenceMemoryStrategy": "USER_PREFERENCE",
+    "customMemoryStrategy": "CUSTOM",
+}
+
+# 전략 유형별로 인덱싱할 메시지 역할 (선호도는 고객 발화에서만 추출)
+_STRATEGY_ROLES = {
+    "USER_PREFERENCE": {"USER"},
+}
+
+
+def _tokenize(text: str, ngram_size: int = 2) -> List[str]:
+    """단어와 단어 내부의 문자 n-gram을 검색 토큰으로 사용합니다."""
+    tokens = []
+    for word in re.findall(r"\w+", text.lower()):
+        tokens.append(word)
+        if len(word) > ngram_size:
+            tokens.extend(word[i:i + ngram_size] for i in range(len(word) - ngram_size + 1))
+    return tokens
+
+
+def _not_found(operation: str, message: str) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": "ResourceNotFoundException", "Message": message}}, operation
+    )
+
+
+class _NamespaceIndex:
+    """단일 네임스페이스의 BM25 인덱스"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.records: List[Dict[str, Any]] = []
+        self.term_freqs: List[Counter] = []
+        self.doc_freq: Counter = Counter()
+        self.total_length = 0
+
+    def add(self, record: Dict[str, Any], tokens: List[str]) -> None:
+        tf = Counter(tokens)
+        self.records.append(record)
+        self.term_freqs.append(tf)
+        self.doc_freq.update(tf.keys())
+        self.total_length += len(tokens)
+
+    def search(self, query_tokens: List[str], top_k: int) -> List[Tuple[float, Dict[str, Any]]]:
+        if not self.records or not query_tokens:
+            return []
+
+        n_docs = len(self.records)
+        avg_length = self.total_length / n_docs
+        query_terms = set(query_tokens)
+        scored = []
+        for tf, record in zip(self.term_freqs, self.records):
+            doc_length = sum(tf.values())
+            score = 0.0
+            for term in query_terms:
+                freq = tf.get(term)
+                if not freq:
+                    continue
+                df = self.doc_freq[term]
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                norm = freq + self.k1 * (1 - self.b + self.b * doc_length / avg_length)
+                score += idf * freq * (self.k1 + 1) / norm
+            if score > 0:
+                scored.append((score, record))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:top_k]
+
+
+class _LocalControlPlane:
+    """memory_client.gmcp_client.get_memory(...) 호출을 흉내 냅니다."""
+
+    def __init__(self, owner: "LocalMemoryClient"):
+        self._owner = owner
+
+    def get_memory(self, memoryId: str) -> Dict[str, Any]:
+        self._owner._simulate_latency("get_memory")
+        with self._owner._lock:
+            memory = self._owner._memories.get(memoryId)
+        if memory is None:
+            raise _not_found("GetMemory", f"Memory {memoryId} not found")
+        return {"memory": {**memory, "strategies": memory["strategies"]}}
+
+
+class LocalMemoryClient:
+    """
+    AgentCore MemoryClient의 로컬 대역
+
+    Args:
+        region_name: MemoryClient와의 인자 호환용 (사용하지 않음)
+        persist_path: 메모리/레코드를 저장할 JSON 파일 경로 (None이면 저장하지 않음)
+        latency_ms: 모든 메서드에 적용할 지연(ms) 또는 {메서드 이름: 지연(ms)} 딕셔너리
+        latency_jitter_ms: 지연에 더할 균등 분포 지터의 최대값 (ms)
+        autosave: 쓰기마다 파일에 저장할지 여부 (대량 적재 시 False 후 save() 호출)
+        seed: 지터 난수 시드 (재현 가능한 측정용)
+    """
+
+    def __init__(
+        self,
+        region_name: Optional[str] = None,
+        persist_path: Optional[str] = None,
+        latency_ms: Union[float, Dict[str, float]] = 0.0,
+        latency_jitter_ms: float = 0.0,
+        autosave: bool = True,
+        seed: Optional[int] = None,
+        ngram_size: int = 2,
+    ):
+        self.region_name = region_name
+        self.persist_path = persist_path
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.autosave = autosave
+        self.ngram_size = ngram_size
+        self.gmcp_client = _LocalControlPlane(self)
+        self.call_counts: Counter = Counter()
+
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._memories: Dict[str, Dict[str, Any]] = {}
+        self._events: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._indexes: Dict[Tuple[str, str], _NamespaceIndex] = {}
+
+        if persist_path and os.path.exists(persist_path):
+            self._load()
+
+    # ------------------------------------------------------------------
+    # MemoryClient 호환 메서드
+    # ------------------------------------------------------------------
+    def create_memory_and_wait(
+        self,
+        name: str,
+        strategies: List[Dict[str, Any]],
+        description: Optional[str] = None,
+        event_expiry_days: int = 90,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """메모리 리소스를 만들고 바로 ACTIVE 상태로 반환합니다."""
+        self._simulate_latency("create_memory_and_wait")
+
+        normalized = []
+        for strategy in strategies:
+            for strategy_key, config in strategy.items():
+                strategy_type = _STRATEGY_TYPES.get(strategy_key, strategy_key.upper())
+                strategy_id = f"{config.get('name', strategy_type)}-{uuid.uuid4().hex[:8]}"
+                normalized.append({
+                    "strategyId": strategy_id,
+                    "memoryStrategyId": strategy_id,
+                    "name": config.get("name", strategy_type),
+                    "description": config.get("description", ""),
+                    "type": strategy_type,
+                    "memoryStrategyType": strategy_type,
+                    "namespaces": list(config.get("namespaces", [])),
+                    "status": "ACTIVE",
+                })
+
+        memory_id = f"{name}-{uuid.uuid4().hex[:10]}"
+        memory = {
+            "id": memory_id,
+            "memoryId": memory_id,
+            "name": name,
+            "description": description or "",
+            "eventExpiryDuration": event_expiry_days,
+            "status": "ACTIVE",
+            "strategies": normalized,
+        }
+        with self._lock:
+            self._memories[memory_id] = memory
+            self._autosave()
+        return dict(memory)
+
+    def list_memories(self, max_results: int = 100) -> List[Dict[str, Any]]:
+        """메모리 리소스 요약 목록을 반환합니다."""
+        self._simulate_latency("list_memories")
+        with self._lock:
+            memories = list(self._memories.values())[:max_results]
+        return [
+            {"id": memory["id"], "memoryId": memory["memoryId"], "name": memory["name"],
+             "status": memory["status"]}
+            for memory in memories
+        ]
+
+    def get_memory_strategies(self, memory_id: str) -> List[Dict[str, Any]]:
+        """메모리의 전략 목록을 반환합니다."""
+        self._simulate_latency("get_memory_strategies")
+        with self._lock:
+            memory = self._memories.get(memory_id)
+            if memory is None:
+                raise _not_found("GetMemory", f"Memory {memory_id} not found")
+            return [dict(strategy) for strategy in memory["strategies"]]
+
+    def create_event(
+        self,
+        memory_id: str,
+        actor_id: str,
+        session_id: str,
+        messages: List[Tuple[str, str]],
+        event_timestamp: Optional[datetime] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        이벤트를 저장하고, 장기 메모리 추출을 흉내 내어 각 전략 네임스페이스에 인덱싱합니다.
+        """
+        self._simulate_latency("create_event")
+        if not messages:
+            raise ClientError(
+                {"Error": {"Code": "ValidationException", "Message": "messages must not be empty"}},
+                "CreateEvent",
+            )
+
+        timestamp = event_timestamp or datetime.now(timezone.utc)
+        event = {
+            "eventId": f"event-{uuid.uuid4().hex[:16]}",
+            "memoryId": memory_id,
+            "actorId": actor_id,
+            "sessionId": session_id,
+            "eventTimestamp": timestamp.isoformat(),
+            "payload": [{"conversational": {"content": {"text": text}, "role": role}}
+                        for text, role in messages],
+        }
+
+        with self._lock:
+            memory = self._memories.get(memory_id)
+            if memory is None:
+                raise _not_found("CreateEvent", f"Memory {memory_id} not found")
+
+            self._events[memory_id].append(event)
+            for strategy in memory["strategies"]:
+                roles = _STRATEGY_ROLES.get(strategy["type"])
+                for template in strategy["namespaces"]:
+                    namespace = template.format(actorId=actor_id, sessionId=session_id)
+                    for text, role in messages:
+                        if roles is None or role.upper() in roles:
+                            self._index_record(memory_id, namespace, strategy, text, timestamp.isoformat())
+            self._autosave()
+
+        return dict(event)
+
+    def retrieve_memories(
+        self,
+        memory_id: str,
+        namespace: Optional[str] = None,
+        query: str = None,
+        actor_id: Optional[str] = None,
+        top_k: int = 3,
+        **kwargs,
+    ) -> List[Dict[str, Any]]:
+        """네임스페이스에서 query와 가장 관련 있는 메모리 레코드를 반환합니다."""
+        self._simulate_latency("retrieve_memories")
+        if query is None:
+            raise TypeError("retrieve_memories() missing required argument: 'query'")
+
+        with self._lock:
+            index = self._indexes.get((memory_id, namespace))
+            if index is None:
+                return []
+            results = index.search(_tokenize(query, self.ngram_size), top_k)
+
+        # BM25 점수를 AgentCore와 비슷한 0~1 범위로 변환
+        return [
+            {
+                **record,
+                "score": round(1 - math.exp(-score / 4), 4),
+                "createdAt": datetime.fromisoformat(record["createdAt"]),
+            }
+            for score, record in results
+        ]
+
+    def list_events(
+        self, memory_id: str, actor_id: str, session_id: str, max_results: int = 100, **kwargs
+    ) -> List[Dict[str, Any]]:
+        """세션의 이벤트를 시간 순으로 반환합니다."""
+        self._simulate_latency("list_events")
+        with self._lock:
+            events = [
+                event for event in self._events.get(memory_id, [])
+                if event["actorId"] == actor_id and event["sessionId"] == session_id
+            ]
+        events.sort(key=lambda event: event["eventTimestamp"])
+        return events[:max_results]
+
+    # ------------------------------------------------------------------
+    # 저장/복원
+    # ------------------------------------------------------------------
+    def save(self) -> None:
+        """현재 상태를 persist_path에 저장합니다."""
+        if not self.persist_path:
+            return
+        with self._lock:
+            state = {
+                "memories": self._memories,
+                "events": self._events,
+            }
+            tmp_path = f"{self.persist_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+
+    def _load(self) -> None:
+        with open(self.persist_path, encoding="utf-8") as f:
+            state = json.load(f)
+
+        self._memories = state.get("memories", {})
+        self._events = defaultdict(list)
+        self._indexes = {}
+
+        # 저장된 이벤트를 다시 재생하여 인덱스를 복원합니다
+        autosave, self.autosave = self.autosave, False
+        latency, self.latency_ms = self.latency_ms, 0.0
+        try:
+            for memory_id, events in state.get("events", {}).items():
+                for event in events:
+                    self.create_event(
+                        memory_id=memory_id,
+                        actor_id=event["actorId"],
+                        session_id=event["sessionId"],
+                        messages=[
+                            (item["conversational"]["content"]["text"], item["conversational"]["role"])
+                            for item in event["payload"]
+                        ],
+                        event_timestamp=datetime.fromisoformat(event["eventTimestamp"]),
+                    )
+        finally:
+            self.autosave = autosave
+            self.latency_ms = latency
+        logger.info(f"로컬 메모리 상태 복원 완료: {self.persist_path}")
+
+    def _autosave(self) -> None:
+        if self.autosave and self.persist_path:
+            self.save()
+
+    # ------------------------------------------------------------------
+    # 내부 유틸리티
+    # ------------------------------------------------------------------
+    def _index_record(
+        self, memory_id: str, namespace: str, strategy: Dict[str, Any], text: str, created_at: str
+    ) -> None:
+        index = self._indexes.setdefault((memory_id, namespace), _NamespaceIndex())
+        record = {
+            "memoryRecordId": f"mem-{uuid.uuid4().hex[:16]}",
+            "content": {"text": text},
+            "memoryStrategyId": strategy["strategyId"],
+            "namespaces": [namespace],
+            "createdAt": created_at,
+        }
+        index.add(record, _tokenize(text, self.ngram_size))
+
+    def _simulate_latency(self, method: str) -> None:
+        self.call_counts[method] += 1
+        if isinstance(self.latency_ms, dict):
+            latency = self.latency_ms.get(method, 0.0)
+        else:
+            latency = self.latency_ms
+        if self.latency_jitter_ms:
+            latency += self._random.uniform(0, self.latency_jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
@@ -0,0 +1,495 @@
+"""
+고객 상담 기록 대량 적재기
+과거 상담 트랜스크립트(JSONL)를 AgentCore Memory 이벤트로 마이그레이션합니다.
+
+- JSONL을 한 줄씩 스트리밍으로 읽어 (actor, session) 단위 청크로 묶습니다
+- 제한된 동시성으로 create_event를 호출하고, 스로틀링에 따라 전송 속도를 조절합니다 (AIMD)
+- 체크포인트 파일에 완료된 위치를 기록하여 중단 후 이어서 적재할 수 있습니다
+- 초당 처리량과 오류 수를 주기적으로 보고합니다
+
+입력 형식 (한 줄에 한 턴):
+    {"actor_id": "customer_001", "session_id": "s-1", "role": "USER", "text": "...", "timestamp": "2024-01-10T10:00:00+09:00"}
+    (actor_id 대신 customer_id, text 대신 content도 허용)
+
+실행:
+    python -m src.helpers.memory_bulk_loader transcripts.jsonl --memory-id <ID> --checkpoint load.ckpt
+    python -m src.helpers.memory_bulk_loader transcripts.jsonl --local local_memory.json   # 로컬 대역
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 속도를 줄여야 하는 오류 코드
+_THROTTLE_ERROR_CODES = {
+    "ThrottlingException",
+    "ThrottledException",
+    "TooManyRequestsException",
+    "ServiceQuotaExceededException",
+}
+
+# 재시도해도 성공할 수 없는 오류 코드
+_NON_RETRYABLE_ERROR_CODES = {
+    "ValidationException",
+    "ResourceNotFoundException",
+    "AccessDeniedException",
+}
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    return getattr(error, "response", {}).get("Error", {}).get("Code")
+
+
+class AdaptiveRateLimiter:
+    """
+    AIMD 방식의 토큰 버킷
+
+    성공할 때마다 속도를 조금씩 올리고(additive increase),
+    스로틀링을 받으면 절반으로 줄입니다(multiplicative decrease).
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 20.0,
+        min_rate: float = 1.0,
+        max_rate: float = 200.0,
+        increase_step: float = 0.5,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 1.0,
+    ):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+        self._last_decrease = 0.0
+
+    def acquire(self) -> None:
+        """현재 속도에 맞는 전송 시점까지 대기합니다."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            # 동시에 실패한 요청들이 속도를 연달아 깎지 않도록 쿨다운 동안은 한 번만 감소
+            if now - self._last_decrease < self.decrease_cooldown:
+                return
+            self._last_decrease = now
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            # 이미 예약된 전송도 줄어든 속도에 맞춰 뒤로 미룹니다
+            self._next_slot = max(self._next_slot, time.monotonic() + 1.0 / self.rate)
+
+
+class _Chunk:
+    """같은 (actor, session)의 연속된 턴 묶음"""
+
+    __slots__ = ("actor_id", "session_id", "messages", "timestamp", "first_line", "last_line")
+
+    def __init__(self, actor_id: str, session_id: str, first_line: int):
+        self.actor_id = actor_id
+        self.session_id = session_id
+        self.messages: List[Tuple[str, str]] = []
+        self.timestamp: Optional[datetime] = None
+        self.first_line = first_line
+        self.last_line = first_line
+
+
+class BulkMemoryLoader:
+    """
+    JSONL 트랜스크립트를 AgentCore Memory(또는 LocalMemoryClient)로 적재합니다.
+
+    체크포인트는 "이 줄까지는 모두 기록됨"을 뜻하는 워터마크입니다. 재개 시 워터마크 이후의
+    줄부터 다시 읽으므로, 중단 직전에 워터마크 뒤에서 완료된 청크는 한 번 더 기록될 수 있습니다
+    (at-least-once). 재시도 끝에 실패한 청크가 있으면 워터마크는 그 청크의 첫 줄 앞에서 멈추고,
+    실패한 줄 범위는 체크포인트의 failed_lines에 남습니다.
+
+    Args:
+        client: MemoryClient 또는 LocalMemoryClient
+        memory_id: 적재 대상 메모리 ID
+        concurrency: 동시에 실행할 create_event 호출 수
+        chunk_size: create_event 한 번에 담을 최대 메시지 수
+        max_open_sessions: 동시에 버퍼링할 (actor, session) 수 (세션이 섞인 입력 대비)
+        initial_rate / max_rate: 초당 create_event 호출 수의 시작값/상한
+        max_retries: 청크별 최대 재시도 횟수
+        checkpoint_path: 체크포인트 파일 경로 (None이면 재개 불가)
+        checkpoint_interval: 체크포인트 저장 주기 (초)
+        report_interval: 처리량 보고 주기 (초, 0이면 보고하지 않음)
+    """
+
+    def __init__(
+        self,
+        client,
+        memory_id: str,
+        concurrency: int = 8,
+        chunk_size: int = 20,
+        max_open_sessions: int = 256,
+        initial_rate: float = 20.0,
+        max_rate: float = 200.0,
+        max_retries: int = 5,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_interval: float = 5.0,
+        report_interval: float = 1.0,
+    ):
+        self.client = client
+        self.memory_id = memory_id
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.max_open_sessions = max_open_sessions
+        self.max_retries = max_retries
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.report_interval = report_interval
+        self.rate_limiter = AdaptiveRateLimiter(initial_rate=initial_rate, max_rate=max_rate)
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "lines_read": 0,
+            "lines_skipped": 0,
+            "invalid_lines": 0,
+            "events_written": 0,
+            "messages_written": 0,
+            "retries": 0,
+            "throttles": 0,
+            "errors": 0,
+        }
+        # 아직 기록되지 않은 청크의 첫 줄 번호 (워터마크 계산용, 지연 삭제 힙)
+        self._outstanding: List[int] = []
+        self._completed_firsts: Dict[int, int] = {}
+        self._last_line_read = 0
+        self._watermark = 0
+        # 재시도 끝에 기록하지 못한 청크의 (첫 줄, 마지막 줄)
+        self._failed_lines: List[Tuple[int, int]] = []
+        self._recent_writes: deque = deque()
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    def load(self, path: str) -> Dict[str, Any]:
+        """트랜스크립트 파일을 적재하고 최종 통계를 반환합니다."""
+        resume_line = self._read_checkpoint()
+        self._watermark = resume_line
+        if resume_line:
+            logger.info(f"체크포인트에서 재개: {resume_line}번째 줄 이후")
+
+        started = time.monotonic()
+        in_flight = threading.BoundedSemaphore(self.concurrency * 2)
+        stop_reporting = threading.Event()
+        reporter = threading.Thread(
+            target=self._report_loop, args=(stop_reporting, started), daemon=True
+        )
+        if self.report_interval > 0:
+            reporter.start()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="bulk-loader") as pool:
+            def dispatch(chunk: _Chunk) -> None:
+                in_flight.acquire()
+                future = pool.submit(self._write_chunk, chunk)
+                future.add_done_callback(lambda _: in_flight.release())
+
+            last_checkpoint = time.monotonic()
+            for chunk in self._iter_chunks(path, resume_line):
+                dispatch(chunk)
+                if time.monotonic() - last_checkpoint >= self.checkpoint_interval:
+                    self._write_checkpoint()
+                    last_checkpoint = time.monotonic()
+
+        stop_reporting.set()
+        with self._lock:
+            self._advance_watermark()
+        self._write_checkpoint()
+
+        elapsed = time.monotonic() - started
+        stats = self.stats()
+        stats["elapsed_seconds"] = round(elapsed, 2)
+        stats["events_per_second"] = round(stats["events_written"] / elapsed, 1) if elapsed else 0.0
+        stats["messages_per_second"] = round(stats["messages_written"] / elapsed, 1) if elapsed else 0.0
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "checkpoint_line": self._watermark,
+                "failed_lines": [list(lines) for lines in self._failed_lines],
+                "rate": round(self.rate_limiter.rate, 1),
+            }
+
+    # ------------------------------------------------------------------
+    # 입력 스트리밍 및 청크 구성
+    # ------------------------------------------------------------------
+    def _iter_chunks(self, path: str, resume_line: int) -> Iterator[_Chunk]:
+        buffers: "OrderedDict[Tuple[str, str], _Chunk]" = OrderedDict()
+
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                if line_no <= resume_line:
+                    self._count("lines_skipped")
+                    continue
+                self._count("lines_read")
+                with self._lock:
+                    self._last_line_read = line_no
+
+                turn = self._parse_line(line, line_no)
+                if turn is None:
+                    continue
+                actor_id, session_id, text, role, timestamp = turn
+
+                key = (actor_id, session_id)
+                chunk = buffers.get(key)
+                if chunk is None:
+                    chunk = _Chunk(actor_id, session_id, line_no)
+                    buffers[key] = chunk
+                    self._track(line_no)
+                buffers.move_to_end(key)
+
+                chunk.messages.append((text, role))
+                chunk.last_line = line_no
+                if chunk.timestamp is None:
+                    chunk.timestamp = timestamp
+
+                if len(chunk.messages) >= self.chunk_size:
+                    yield buffers.pop(key)
+                while len(buffers) > self.max_open_sessions:
+                    yield buffers.popitem(last=False)[1]
+
+        while buffers:
+            yield buffers.popitem(last=False)[1]
+
+    def _parse_line(self, line: str, line_no: int) -> Optional[Tuple[str, str, str, str, Optional[datetime]]]:
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            record = json.loads(line)
+            actor_id = record.get("actor_id") or record["customer_id"]
+            session_id = record["session_id"]
+            text = (record.get("text") or record.get("content") or "").strip()
+            role = record.get("role", "USER").upper()
+            timestamp = record.get("timestamp")
+            if not text or role not in ("USER", "ASSISTANT", "TOOL", "OTHER"):
+                raise ValueError(f"잘못된 text/role: {role!r}")
+            parsed_ts = datetime.fromisoformat(timestamp.replace("Z", "+00:00")) if timestamp else None
+            return str(actor_id), str(session_id), text, role, parsed_ts
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self._count("invalid_lines")
+            logger.warning(f"{line_no}번째 줄을 건너뜁니다: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------------
+    def _write_chunk(self, chunk: _Chunk) -> None:
+        kwargs = {
+            "memory_id": self.memory_id,
+            "actor_id": chunk.actor_id,
+            "session_id": chunk.session_id,
+            "messages": chunk.messages,
+        }
+        if chunk.timestamp is not None:
+            kwargs["event_timestamp"] = chunk.timestamp
+
+        written = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                self.rate_limiter.acquire()
+                try:
+                    self.client.create_event(**kwargs)
+                    self.rate_limiter.on_success()
+                    with self._lock:
+                        self._stats["events_written"] += 1
+                        self._stats["messages_written"] += len(chunk.messages)
+                        self._recent_writes.append((time.monotonic(), len(chunk.messages)))
+                    written = True
+                    return
+                except Exception as e:
+                    code = _error_code(e)
+                    if code in _THROTTLE_ERROR_CODES:
+                        self._count("throttles")
+                        self.rate_limiter.on_throttle()
+                    if code in _NON_RETRYABLE_ERROR_CODES or attempt >= self.max_retries:
+                        self._count("errors")
+                        logger.error(
+                            f"청크 기록 실패 ({chunk.actor_id}/{chunk.session_id}, "
+                            f"{chunk.first_line}-{chunk.last_line}번째 줄): {e}"
+                        )
+                        return
+                    self._count("retries")
+                    time.sleep(min(10.0, 0.2 * (2 ** attempt)) * random.uniform(0.5, 1.0))
+        finally:
+            self._complete(chunk, failed=not written)
+
+    # ------------------------------------------------------------------
+    # 체크포인트
+    # ------------------------------------------------------------------
+    def _track(self, first_line: int) -> None:
+        with self._lock:
+            heapq.heappush(self._outstanding, first_line)
+
+    def _complete(self, chunk: _Chunk, failed: bool = False) -> None:
+        with self._lock:
+            if failed:
+                self._failed_lines.append((chunk.first_line, chunk.last_line))
+            first_line = chunk.first_line
+            self._completed_firsts[first_line] = self._completed_firsts.get(first_line, 0) + 1
+            while self._outstanding and self._completed_firsts.get(self._outstanding[0]):
+                done = heapq.heappop(self._outstanding)
+                self._completed_firsts[done] -= 1
+                if not self._completed_firsts[done]:
+                    del self._completed_firsts[done]
+            self._advance_watermark()
+
+    def _advance_watermark(self) -> None:
+        """미완료 청크와 실패한 청크 앞까지만 워터마크를 올립니다 (_lock을 잡은 상태에서 호출)."""
+        limit = self._outstanding[0] - 1 if self._outstanding else self._last_line_read
+        if self._failed_lines:
+            limit = min(limit, min(first for first, _ in self._failed_lines) - 1)
+        self._watermark = max(self._watermark, limit)
+
+    def _read_checkpoint(self) -> int:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            return int(json.load(f).get("line", 0))
+
+    def _write_checkpoint(self) -> None:
+        if not self.checkpoint_path:
+            return
+        stats = self.stats()
+        state = {
+            "line": stats["checkpoint_line"],
+            "failed_lines": stats["failed_lines"],
+            "updated_at": datetime.now().isoformat(),
+            "stats": stats,
+        }
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # ------------------------------------------------------------------
+    # 보고
+    # ------------------------------------------------------------------
+    def _report_loop(self, stop: threading.Event, started: float) -> None:
+        while not stop.wait(self.report_interval):
+            now = time.monotonic()
+            with self._lock:
+                while self._recent_writes and now - self._recent_writes[0][0] > self.report_interval:
+                    self._recent_writes.popleft()
+                recent_events = len(self._recent_writes)
+                recent_messages = sum(count for _, count in self._recent_writes)
+            stats = self.stats()
+            print(
+                f"⏱️ {now - started:6.1f}s | "
+                f"{recent_events / self.report_interval:6.1f} events/s | "
+                f"{recent_messages / self.report_interval:7.1f} msgs/s | "
+                f"누적 {stats['events_written']} events | "
+                f"오류 {stats['errors']} | 스로틀 {stats['throttles']} | "
+                f"속도 {stats['rate']}/s | 체크포인트 {stats['checkpoint_line']}",
+                flush=True,
+            )
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+
+def _create_local_memory(client) -> str:
+    """로컬 대역에 이커머스 메모리 리소스를 만들고 ID를 반환합니다."""
+    memory = client.create_memory_and_wait(
+        name="EcommerceCustomerMemory",
+        description="패션/뷰티 이커머스 고객 지원 메모리 (로컬)",
+        strategies=[
+            {"userPreferenceMemoryStrategy": {
+                "name": "EcommerceCustomerPreferences",
+                "namespaces": ["ecommerce/customer/{actorId}/preferences"],
+            }},
+            {"semanticMemoryStrategy": {
+                "name": "EcommerceCustomerHistory",
+                "namespaces": ["ecommerce/customer/{actorId}/history"],
+            }},
+        ],
+    )
+    return memory["id"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상담 트랜스크립트 대량 적재")
+    parser.add_argument("path", help="JSONL 트랜스크립트 파일")
+    parser.add_argument("--memory-id", help="적재 대상 메모리 ID (생략 시 SSM/로컬 대역에서 결정)")
+    parser.add_argument("--local", metavar="STATE_FILE", help="AgentCore 대신 LocalMemoryClient 사용")
+    parser.add_argument("--local-latency-ms", type=float, default=0.0, help="로컬 대역의 create_event 지연")
+    parser.add_argument("--checkpoint", help="체크포인트 파일 경로")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=20)
+    parser.add_argument("--initial-rate", type=float, default=20.0)
+    parser.add_argument("--max-rate", type=float, default=200.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.local:
+        try:
+            from helpers.local_memory_client import LocalMemoryClient
+        except ImportError:
+            from src.helpers.local_memory_client import LocalMemoryClient
+        client = LocalMemoryClient(
+            persist_path=args.local,
+            latency_ms={"create_event": args.local_latency_ms},
+            autosave=False,
+        )
+        existing = next((memory["id"] for memory in client.list_memories()), None)
+        memory_id = args.memory_id or existing or _create_local_memory(client)
+    else:
+        import boto3
+        from bedrock_agentcore.memory import MemoryClient
+        try:
+            from helpers.utils import get_ssm_parameter
+        except ImportError:
+            from src.helpers.utils import get_ssm_parameter
+        client = MemoryClient(region_name=boto3.session.Session().region_name)
+        memory_id = args.memory_id or get_ssm_parameter("/app/ecommerce/agentcore/memory_id")
+
+    loader = BulkMemoryLoader(
+        client,
+        memory_id,
+        concurrency=args.concurrency,
+        chunk_size=args.chunk_size,
+        initial_rate=args.initial_rate,
+        max_rate=args.max_rate,
+        checkpoint_path=args.checkpoint,
+    )
+    stats = loader.load(args.path)
+
+    if args.local:
+        client.save()
+
+    print("✅ 적재 완료")
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+고객 메모리 이벤트의 근사 중복 제거
+MinHash 서명으로 같은 고객이 반복한 상호작용("사이즈 교환 되나요?" x 5와 같은 답)을 찾아
+create_event 전에 저장을 건너뜁니다.
+"""
+
+import random
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+# 순열 해시 (a*x + b) mod p에 쓰는 메르센 소수
+_PRIME = (1 << 61) - 1
+_MAX_HASH = _PRIME
+
+# (질문 서명, 응답 서명)
+PairSignature = Tuple[Tuple[int, ...], Tuple[int, ...]]
+
+
+def _shingles(text: str, size: int) -> set:
+    """공백/구두점을 제거한 문자 shingle 집합 (한국어 조사/띄어쓰기 변형에 강함)"""
+    normalized = re.sub(r"[\W_]+", "", text.lower())
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+class MinHasher:
+    """
+    MinHash 서명을 계산합니다.
+
+    shingle을 crc32로 한 번만 해시한 뒤, 고정 시드로 고른 (a, b)에 대해
+    h(x) = (a*x + b) mod p (p = 2^61 - 1)를 순열로 사용합니다.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._params: List[Tuple[int, int]] = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)
+        ]
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in _shingles(text, self.shingle_size)]
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(min([(a * h + b) % _PRIME for h in hashes]) for a, b in self._params)
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """두 서명이 일치하는 비율 = Jaccard 유사도 추정치"""
+        matches = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+        return matches / len(sig_a)
+
+
+class MinHashSignatureStore:
+    """
+    고객(actor)별 최근 상호작용(질문 + 응답) MinHash 서명 저장소
+
+    질문과 응답이 모두 이전 상호작용과 비슷할 때만 근사 중복으로 봅니다 (같은 질문이라도
+    답이 달라졌으면 저장). 서명은 ttl_seconds가 지나면 비교 대상에서 빠지고,
+    고객당 max_signatures_per_actor개, 전체 max_actors명(LRU)까지만 보관합니다.
+
+    check()로 확인하고, 저장(submit/create_event)이 성공한 뒤 add()로 서명을 남깁니다.
+
+    Args:
+        threshold: 질문/응답 각각의 추정 Jaccard가 이 값 이상이면 근사 중복으로 봅니다
+        num_perm: 서명 길이 (길수록 정확하지만 느림)
+        shingle_size: 문자 shingle 길이
+        max_signatures_per_actor: 고객별로 비교 대상으로 유지할 최근 서명 수
+        max_actors: 서명을 유지할 최대 고객 수
+        ttl_seconds: 서명을 비교 대상으로 유지할 시간 (초)
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.7,
+        num_perm: int = 64,
+        shingle_size: int = 3,
+        max_signatures_per_actor: int = 50,
+        max_actors: int = 10000,
+        ttl_seconds: float = 3600.0,
+    ):
+        self.threshold = threshold
+        self.max_signatures_per_actor = max_signatures_per_actor
+        self.max_actors = max_actors
+        self.ttl_seconds = ttl_seconds
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.checked = 0
+        self.suppressed = 0
+        self._lock = threading.Lock()
+        # actor_id -> [(저장 시각, 서명), ...]
+        self._actors: "OrderedDict[str, Deque[Tuple[float, PairSignature]]]" = OrderedDict()
+
+    def check(self, actor_id: str, query: str, response: str = "") -> Tuple[Optional[float], PairSignature]:
+        """
+        (유사도, 서명)을 반환합니다. 고객의 최근 상호작용과 근사 중복이면 유사도(질문/응답 중
+        낮은 값), 아니면 None. 서명은 저장에 성공한 뒤 add()에 넘깁니다.
+        """
+        signature = (self.hasher.signature(query), self.hasher.signature(response))
+        now = time.monotonic()
+
+        with self._lock:
+            self.checked += 1
+            entries = self._actors.get(actor_id)
+            if not entries:
+                return None, signature
+            while entries and now - entries[0][0] > self.ttl_seconds:
+                entries.popleft()
+
+            best = 0.0
+            for _, (seen_query, seen_response) in entries:
+                similarity = min(
+                    self.hasher.similarity(signature[0], seen_query),
+                    self.hasher.similarity(signature[1], seen_response),
+                )
+                best = max(best, similarity)
+            if best >= self.threshold:
+                self.suppressed += 1
+                return best, signature
+            return None, signature
+
+    def add(self, actor_id: str, signature: PairSignature) -> None:
+        """저장한 상호작용의 서명을 비교 대상으로 추가합니다."""
+        with self._lock:
+            entries = self._actors.get(actor_id)
+            if entries is None:
+                entries = deque(maxlen=self.max_signatures_per_actor)
+                self._actors[actor_id] = entries
+            entries.append((time.monotonic(), signature))
+            self._actors.move_to_end(actor_id)
+            while len(self._actors) > self.max_actors:
+                self._actors.popitem(last=False)
+
+    def check_and_add(self, actor_id: str, query: str, response: str = "") -> Optional[float]:
+        """check() 후 중복이 아니면 바로 add()합니다 (저장 성공 여부를 따로 확인하지 않는 경우)."""
+        similarity, signature = self.check(actor_id, query, response)
+        if similarity is None:
+            self.add(actor_id, signature)
+        return similarity
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "suppressed": self.suppressed,
+                "suppression_rate": round(self.suppressed / self.checked, 3) if self.checked else 0.0,
+                "actors": len(self._actors),
+            }
+
+
+# 훅 인스턴스 간에 공유되는 기본 서명 저장소
+DEFAULT_SIGNATURE_STORE = MinHashSignatureStore()
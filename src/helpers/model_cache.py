@@ -0,0 +1,235 @@
+"""
+모델 응답 완전 일치 캐시 (record/replay)
+회귀 테스트와 데모는 같은 메시지 시퀀스를 Bedrock에 반복해서 보냅니다. 모델 호출의 모든 입력이
+같으면 저장해 둔 스트림 이벤트를 그대로 다시 재생해, 네트워크 없이 몇 초 안에 끝나도록 합니다.
+
+- 키: sha256(model_id, 시스템 프롬프트, 도구 정의, tool_choice, 메시지, 추론 파라미터)
+- 저장소: SQLite (이벤트와 스트림 시작 기준 도착 시각을 함께 저장)
+- 모드 (MODEL_CACHE 환경 변수)
+  - off: 캐시 사용 안 함 (기본값)
+  - record: 적중하면 재생, 아니면 모델을 호출하고 기록
+  - replay: 적중하면 재생, 아니면 ModelCacheMiss (네트워크 호출 없음을 보장)
+  - deterministic: 운영용. temperature=0 호출만 기록/재생
+- 재생 속도 (MODEL_CACHE_REPLAY): fast(지연 없이) 또는 original(기록된 델타 간격 그대로)
+
+끝까지 받은 스트림만 기록하므로 오류나 취소로 끊긴 응답은 저장되지 않습니다. 도구 결과에 접수 시각이나
+난수가 들어가면 다음 모델 호출의 키가 달라지므로, 재생용 시나리오는 messages_injection처럼 고정된
+대화 기록이나 결정적인 도구로 구성합니다.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from strands.models.model import Model
+
+logger = logging.getLogger(__name__)
+
+OFF, RECORD, REPLAY, DETERMINISTIC = "off", "record", "replay", "deterministic"
+MODES = (OFF, RECORD, REPLAY, DETERMINISTIC)
+FAST, ORIGINAL = "fast", "original"
+
+MODEL_CACHE_MODE = os.environ.get("MODEL_CACHE", OFF).lower()
+MODEL_CACHE_PATH = os.environ.get("MODEL_CACHE_PATH", "model_cache.sqlite3")
+MODEL_CACHE_REPLAY = os.environ.get("MODEL_CACHE_REPLAY", FAST).lower()
+
+# 응답에 영향을 주는 모델 설정 (캐시 설정, 리전 등은 응답이 같으므로 키에서 제외)
+INFERENCE_PARAMS = ("temperature", "top_p", "max_tokens", "stop_sequences", "additional_request_fields",
+                    "additional_args", "streaming")
+
+
+class ModelCacheMiss(RuntimeError):
+    """replay 모드에서 기록되지 않은 호출"""
+
+
+def _json_default(value: Any) -> Any:
+    # 이미지/문서 블록의 bytes는 내용 해시로
+    if isinstance(value, (bytes, bytearray)):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    return str(value)
+
+
+def request_key(
+    model_id: str,
+    messages: List[Dict[str, Any]],
+    tool_specs: Optional[List[Dict[str, Any]]] = None,
+    system_prompt: Optional[str] = None,
+    system_prompt_content: Optional[List[Dict[str, Any]]] = None,
+    tool_choice: Optional[Dict[str, Any]] = None,
+    params: Optional[Dict[str, Any]] = None,
+) -> str:
+    """모델 호출 입력의 sha256 (dict 키 순서와 무관)"""
+    payload = {
+        "model_id": model_id,
+        "system": system_prompt_content if system_prompt_content is not None else system_prompt,
+        "tools": tool_specs or [],
+        "tool_choice": tool_choice,
+        "messages": messages,
+        "params": params or {},
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=_json_default)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SqliteResponseStore:
+    """
+    키 -> (도착 시각 ms, 스트림 이벤트) 목록 저장소
+
+    Args:
+        path: SQLite 파일 경로 (":memory:"이면 프로세스 안에서만 유지)
+    """
+
+    def __init__(self, path: str = MODEL_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model_id TEXT, events TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[List[Tuple[float, Dict[str, Any]]]]:
+        with self._lock:
+            row = self._conn.execute("SELECT events FROM responses WHERE key = ?", (key,)).fetchone()
+        return [tuple(item) for item in json.loads(row[0])] if row else None
+
+    def put(self, key: str, model_id: str, events: List[Tuple[float, Dict[str, Any]]]) -> None:
+        encoded = json.dumps(events, ensure_ascii=False, default=_json_default)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model_id, events, created_at) VALUES (?, ?, ?, ?)",
+                (key, model_id, encoded, time.time()),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachingModel(Model):
+    """
+    응답 캐시를 거쳐 모델을 호출하는 strands 모델
+
+    config/get_config()/update_config()/structured_output()은 감싼 모델에 그대로 위임하므로
+    Agent(model=CachingModel(...))로 바꿔 끼워도 트레이스와 설정은 그대로입니다.
+
+    Args:
+        model: 실제 모델 (BedrockModel 등)
+        store: 응답 저장소 (기본값: MODEL_CACHE_PATH의 SqliteResponseStore)
+        mode: record / replay / deterministic
+        replay_speed: fast 또는 original
+
+    stats: hits, misses, recorded, bypass(deterministic 모드에서 temperature가 0이 아닌 호출)
+    """
+
+    def __init__(self, model: Model, store: Optional[SqliteResponseStore] = None, mode: str = RECORD,
+                 replay_speed: str = MODEL_CACHE_REPLAY):
+        if mode not in (RECORD, REPLAY, DETERMINISTIC):
+            raise ValueError(f"지원하지 않는 캐시 모드입니다: {mode}")
+        if replay_speed not in (FAST, ORIGINAL):
+            raise ValueError(f"지원하지 않는 재생 속도입니다: {replay_speed}")
+        self.model = model
+        self.store = store if store is not None else SqliteResponseStore()
+        self.mode = mode
+        self.replay_speed = replay_speed
+        self.stats: Counter = Counter()
+
+    @property
+    def config(self) -> Any:
+        return self.model.get_config()
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        return self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs)
+
+    def cacheable(self) -> bool:
+        """deterministic 모드에서는 temperature=0 호출만 (설정이 없으면 Bedrock 기본값이 1이므로 제외)"""
+        if self.mode != DETERMINISTIC:
+            return True
+        temperature = self.model.get_config().get("temperature")
+        return temperature is not None and float(temperature) == 0.0
+
+    def key_for(self, messages, tool_specs=None, system_prompt=None, **kwargs) -> str:
+        config = self.model.get_config()
+        return request_key(
+            config.get("model_id", type(self.model).__name__),
+            messages,
+            tool_specs=tool_specs,
+            system_prompt=system_prompt,
+            system_prompt_content=kwargs.get("system_prompt_content"),
+            tool_choice=kwargs.get("tool_choice"),
+            params={name: config[name] for name in INFERENCE_PARAMS if config.get(name) is not None},
+        )
+
+    async def _replay(self, events: List[Tuple[float, Dict[str, Any]]]):
+        started = time.perf_counter()
+        for offset_ms, event in events:
+            if self.replay_speed == ORIGINAL:
+                delay = offset_ms / 1000 - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield event
+
+    async def stream(self, messages, tool_specs=None, system_prompt: Optional[str] = None, **kwargs):
+        if not self.cacheable():
+            self.stats["bypass"] += 1
+            async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+                yield event
+            return
+
+        key = self.key_for(messages, tool_specs, system_prompt, **kwargs)
+        events = await asyncio.to_thread(self.store.get, key)
+        if events is not None:
+            self.stats["hits"] += 1
+            logger.debug("모델 응답 캐시 적중: %s", key[:12])
+            async for event in self._replay(events):
+                yield event
+            return
+
+        self.stats["misses"] += 1
+        if self.mode == REPLAY:
+            raise ModelCacheMiss(f"기록되지 않은 모델 호출입니다 (key={key[:12]}). MODEL_CACHE=record로 먼저 기록하세요")
+
+        recorded: List[Tuple[float, Dict[str, Any]]] = []
+        started = time.perf_counter()
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            recorded.append((round((time.perf_counter() - started) * 1000, 3), event))
+            yield event
+        # 스트림을 끝까지 받은 경우에만 저장
+        await asyncio.to_thread(self.store.put, key, self.model.get_config().get("model_id"), recorded)
+        self.stats["recorded"] += 1
+        logger.debug("모델 응답 기록: %s (이벤트 %d개)", key[:12], len(recorded))
+
+
+def cached_model(model: Model, mode: str = MODEL_CACHE_MODE, store: Optional[SqliteResponseStore] = None,
+                 replay_speed: str = MODEL_CACHE_REPLAY) -> Model:
+    """
+    캐시를 켠 경우 CachingModel, 끈 경우(MODEL_CACHE=off) 원래 모델
+
+    Args:
+        model: 실제 모델
+        mode: off / record / replay / deterministic
+        store: 응답 저장소 (여러 모델이 하나를 공유해도 키에 model_id가 들어가므로 섞이지 않음)
+    """
+    if mode not in MODES:
+        raise ValueError(f"MODEL_CACHE는 {', '.join(MODES)} 중 하나여야 합니다: {mode}")
+    if mode == OFF:
+        return model
+    return CachingModel(model, store=store, mode=mode, replay_speed=replay_speed)
@@ -0,0 +1,403 @@
+"""
+의도 기반 모델 라우팅
+"반품 기간이 어떻게 되나요?" 같은 단순 FAQ/상태 문의는 작고 빠른 모델로 보내고,
+여러 도구가 필요한 반품/교환/추천 상담은 큰 모델에 남깁니다.
+
+- IntentClassifier: 키워드 + 문자 n-gram 로지스틱 회귀 (로컬 학습/추론, 네트워크 없음)
+- ModelRouter: 의도 -> 모델 등급(fast/full), 의도별 재정의, 확신이 낮거나 여러 요청이 섞이면 full
+- RoutingModel: strands Model 래퍼. 모델 호출마다 마지막 고객 질문으로 등급을 골라 위임
+
+Agent(model=RoutingModel(...))로 쓰므로 세션 에이전트, 대화 기록, 프롬프트 캐시는 그대로입니다.
+"""
+
+import logging
+import math
+import os
+import random
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from strands.models.model import Model
+
+logger = logging.getLogger(__name__)
+
+MODEL_ROUTING_ENABLED = os.environ.get("MODEL_ROUTING", "true").lower() == "true"
+FAST_MODEL_ID = os.environ.get("ROUTER_FAST_MODEL_ID", "us.anthropic.claude-haiku-4-5-20251001-v1:0")
+
+FAST, FULL = "fast", "full"
+
+# 의도별 기본 모델 등급 (도구 호출 없이 답하거나 조회 한 번이면 되는 의도만 fast)
+DEFAULT_ROUTES = {
+    "greeting": FAST,
+    "faq": FAST,
+    "order_status": FAST,
+    "return": FULL,
+    "exchange": FULL,
+    "recommendation": FULL,
+    "complex": FULL,
+}
+
+# 의도별 키워드 (로지스틱 회귀의 특징으로 사용되며, 실행 요청 의도가 둘 이상 걸리면 complex)
+KEYWORDS = {
+    "greeting": ("안녕", "감사합니다", "고마워", "고맙습니다", "수고", "좋은 하루"),
+    "faq": ("기간", "정책", "배송비", "수수료", "며칠", "영업일", "운영 시간", "고객센터", "방법", "조건",
+            "가능한가요", "되나요", "얼마"),
+    "order_status": ("어디쯤", "언제 와", "언제 도착", "언제 들어", "출고", "송장", "배송 조회", "진행 상황",
+                     "진행상황", "처리됐", "접수됐", "상태"),
+    "return": ("반품 신청", "반품하고", "반품할게", "반품해", "반품 접수해", "환불해 주", "환불받고",
+               "돌려보내", "반품 가능"),
+    "exchange": ("교환해", "교환하고", "교환할게", "교환 신청", "바꿔", "바꾸고", "사이즈 변경", "색상 변경"),
+    "recommendation": ("추천", "어울리", "코디", "스타일링", "골라", "뭐가 좋"),
+    "complex": ("그리고", "그다음", "그 다음", "하면서", "동시에", "랑 같이", "도 같이", "한꺼번에"),
+}
+
+# 둘 이상 걸리면 여러 도구가 필요한 상담으로 보는 실행 요청 의도
+ACTION_INTENTS = ("return", "exchange", "recommendation")
+
+# 분류기 학습용 예시 발화 (평가용 발화는 benchmarks/eval_model_router.py에 따로 있음)
+TRAINING_UTTERANCES: List[Tuple[str, str]] = [
+    ("안녕하세요", "greeting"),
+    ("안녕하세요 문의 좀 드릴게요", "greeting"),
+    ("감사합니다!", "greeting"),
+    ("네 고마워요", "greeting"),
+    ("친절하게 답해주셔서 고맙습니다", "greeting"),
+    ("수고하세요", "greeting"),
+    ("좋은 하루 보내세요", "greeting"),
+    ("알겠습니다 감사해요", "greeting"),
+    ("반품 기간이 어떻게 되나요?", "faq"),
+    ("교환 기간은 며칠인가요?", "faq"),
+    ("반품 배송비는 얼마인가요?", "faq"),
+    ("단순 변심도 반품 되나요?", "faq"),
+    ("환불은 보통 며칠 걸려요?", "faq"),
+    ("고객센터 운영 시간 알려주세요", "faq"),
+    ("화장품도 교환이 가능한가요?", "faq"),
+    ("택 떼면 반품 안 되나요?", "faq"),
+    ("세일 상품도 반품 가능한가요?", "faq"),
+    ("반품 조건이 뭐예요?", "faq"),
+    ("무료 배송 기준 금액이 얼마예요?", "faq"),
+    ("교환 정책 알려주세요", "faq"),
+    ("ORD-20240101-001 배송 어디쯤 왔어요?", "order_status"),
+    ("주문한 원피스 언제 도착해요?", "order_status"),
+    ("어제 주문한 거 출고됐나요?", "order_status"),
+    ("송장 번호 알려주세요", "order_status"),
+    ("반품 접수됐는지 확인해 주세요", "order_status"),
+    ("환불 진행 상황이 궁금해요", "order_status"),
+    ("교환 신청한 거 처리됐나요?", "order_status"),
+    ("배송 조회 부탁드려요", "order_status"),
+    ("환불 언제 들어오나요?", "order_status"),
+    ("주문 상태 확인해 주세요", "order_status"),
+    ("ORD-20240101-001 원피스 사이즈가 작아서 반품하고 싶어요", "return"),
+    ("니트에 구멍이 있어요 반품 신청할게요", "return"),
+    ("색상이 사진이랑 달라서 반품할게요", "return"),
+    ("쿠션 파운데이션 알레르기가 나서 환불받고 싶어요", "return"),
+    ("이 가방 반품 접수해 주세요", "return"),
+    ("오배송 왔어요 돌려보내고 싶어요", "return"),
+    ("ORD-20240102-002 주문한 데님 팬츠 반품 가능해요?", "return"),
+    ("마음에 안 들어서 환불해 주세요", "return"),
+    ("원피스 M 사이즈로 교환해 주세요", "exchange"),
+    ("블랙 말고 화이트로 바꿔 주세요", "exchange"),
+    ("ORD-20240103-003 청바지 L로 교환하고 싶어요", "exchange"),
+    ("사이즈 변경 가능할까요? 한 치수 크게요", "exchange"),
+    ("립스틱 색상 변경하고 싶어요", "exchange"),
+    ("신발 250에서 255로 교환할게요", "exchange"),
+    ("니트 색상만 바꾸고 싶어요", "exchange"),
+    ("플리츠 스커트에 어울리는 상의 추천해 주세요", "recommendation"),
+    ("데이트 룩 코디 좀 도와주세요", "recommendation"),
+    ("건성 피부에 맞는 쿠션 뭐가 좋아요?", "recommendation"),
+    ("여름 원피스 추천해 주세요", "recommendation"),
+    ("와이드 팬츠 스타일링 방법 알려주세요", "recommendation"),
+    ("쿨톤 립스틱 골라 주세요", "recommendation"),
+    ("출근룩으로 입을 가디건 추천 부탁해요", "recommendation"),
+    ("원피스는 반품하고 비슷한 스타일로 추천해 주세요", "complex"),
+    ("니트는 교환하고 바지는 반품할게요", "complex"),
+    ("ORD-20240101-001 반품 신청하고 그다음에 다른 사이즈로 다시 주문하고 싶어요", "complex"),
+    ("청바지 교환하면서 어울리는 상의도 같이 추천해 주세요", "complex"),
+    ("주문 두 건 있는데 하나는 반품, 하나는 교환해 주세요", "complex"),
+    ("가방 반품 가능한지 확인하고 그리고 비슷한 가방 추천도 해주세요", "complex"),
+    ("원피스 교환이랑 립스틱 환불을 한꺼번에 처리하고 싶어요", "complex"),
+    ("사이즈가 안 맞아서 반품할지 교환할지 고민인데 어떤 게 나을지 비교해 주세요", "complex"),
+]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text.strip().lower())
+
+
+def keyword_hits(text: str) -> Dict[str, int]:
+    """의도별 키워드 일치 수 (일치가 없는 의도는 제외)"""
+    text = _normalize(text)
+    hits = {intent: sum(word in text for word in words) for intent, words in KEYWORDS.items()}
+    return {intent: count for intent, count in hits.items() if count}
+
+
+class IntentPrediction:
+    """분류 결과: 의도, 확률, 의도별 확률, 키워드 일치"""
+
+    def __init__(self, intent: str, confidence: float, scores: Dict[str, float], keywords: Dict[str, int]):
+        self.intent = intent
+        self.confidence = confidence
+        self.scores = scores
+        self.keywords = keywords
+
+
+class IntentClassifier:
+    """
+    키워드 + 문자 n-gram 다항 로지스틱 회귀
+
+    한국어 활용형(반품할게요/반품하고/반품해)을 형태소 분석 없이 잡도록 문자 2~3-gram을
+    쓰고, 의도별 키워드 일치 수를 별도 특징으로 더합니다. 생성 시 예시 발화 수십 개로
+    약 0.1초 안에 학습되며 (런타임에서는 워밍업 중), 분류 한 번은 1ms 미만입니다.
+
+    Args:
+        samples: (발화, 의도) 학습 데이터 (기본값: TRAINING_UTTERANCES)
+        ngram_range: 문자 n-gram 길이 범위
+        epochs, learning_rate, l2: SGD 학습 설정 (셔플 시드가 고정이라 결과가 항상 같음)
+    """
+
+    def __init__(
+        self,
+        samples: Sequence[Tuple[str, str]] = TRAINING_UTTERANCES,
+        ngram_range: Tuple[int, int] = (2, 3),
+        epochs: int = 15,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+    ):
+        self.ngram_range = ngram_range
+        self.labels: List[str] = sorted({label for _, label in samples})
+        self.weights: Dict[str, List[float]] = {}
+        self.bias = [0.0] * len(self.labels)
+        self._fit(samples, epochs, learning_rate, l2)
+
+    def features(self, text: str) -> Dict[str, float]:
+        text = _normalize(text)
+        padded = f" {text} "
+        low, high = self.ngram_range
+        grams = {padded[i:i + n] for n in range(low, high + 1) for i in range(len(padded) - n + 1)}
+        # 문장 길이와 무관하게 n-gram 특징의 크기를 맞춤 (L2 정규화)
+        scale = 1.0 / math.sqrt(len(grams)) if grams else 0.0
+        features = {f"c:{gram}": scale for gram in grams}
+        for intent, count in keyword_hits(text).items():
+            features[f"k:{intent}"] = float(count)
+        return features
+
+    def _probabilities(self, features: Dict[str, float]) -> List[float]:
+        logits = list(self.bias)
+        for name, value in features.items():
+            weights = self.weights.get(name)
+            if weights:
+                for k, weight in enumerate(weights):
+                    logits[k] += weight * value
+        top = max(logits)
+        exps = [math.exp(logit - top) for logit in logits]
+        total = sum(exps)
+        return [e / total for e in exps]
+
+    def _fit(self, samples: Sequence[Tuple[str, str]], epochs: int, learning_rate: float, l2: float):
+        data = [(self.features(text), self.labels.index(label)) for text, label in samples]
+        rng = random.Random(0)
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            rate = learning_rate / (1 + epoch * 0.1)
+            for features, target in data:
+                probabilities = self._probabilities(features)
+                for k, probability in enumerate(probabilities):
+                    gradient = probability - (1.0 if k == target else 0.0)
+                    self.bias[k] -= rate * gradient
+                    for name, value in features.items():
+                        weights = self.weights.setdefault(name, [0.0] * len(self.labels))
+                        weights[k] -= rate * (gradient * value + l2 * weights[k])
+
+    def predict(self, text: str) -> IntentPrediction:
+        features = self.features(text)
+        probabilities = self._probabilities(features)
+        best = max(range(len(self.labels)), key=probabilities.__getitem__)
+        keywords = {name[2:]: int(value) for name, value in features.items() if name.startswith("k:")}
+        return IntentPrediction(
+            intent=self.labels[best],
+            confidence=probabilities[best],
+            scores=dict(zip(self.labels, probabilities)),
+            keywords=keywords,
+        )
+
+
+class RouteDecision:
+    """라우팅 결정: 의도, 확률, 모델 등급, 결정 이유, 분류 지연"""
+
+    def __init__(self, intent: str, confidence: float, tier: str, reason: str, latency_ms: float):
+        self.intent = intent
+        self.confidence = confidence
+        self.tier = tier
+        self.reason = reason
+        self.latency_ms = latency_ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "intent": self.intent,
+            "confidence": round(self.confidence, 3),
+            "tier": self.tier,
+            "reason": self.reason,
+            "latency_ms": round(self.latency_ms, 3),
+        }
+
+
+def parse_overrides(value: str) -> Dict[str, str]:
+    """'faq=full,recommendation=fast' 형식의 의도별 재정의 파싱"""
+    overrides = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        intent, _, tier = item.partition("=")
+        overrides[intent.strip()] = tier.strip()
+    return overrides
+
+
+class ModelRouter:
+    """
+    고객 질문 -> 모델 등급
+
+    결정 순서:
+    1. 빈 질문 -> default_tier (reason="empty")
+    2. 실행 요청 의도(반품/교환/추천) 키워드가 둘 이상 -> complex (reason="multi_intent")
+    3. 분류 확률이 min_confidence 미만 -> default_tier (reason="low_confidence")
+    4. overrides[의도] (reason="override") 또는 routes[의도] (reason="intent")
+
+    Args:
+        classifier: 의도 분류기 (기본값: 예시 발화로 학습한 IntentClassifier)
+        routes: 의도 -> 등급 (기본값: DEFAULT_ROUTES)
+        overrides: 의도별 재정의 (예: {"recommendation": "fast"})
+        min_confidence: 이 확률 미만이면 분류를 믿지 않고 default_tier 사용
+        default_tier: 판단이 어려울 때의 등급 (품질을 위해 full)
+    """
+
+    def __init__(
+        self,
+        classifier: Optional[IntentClassifier] = None,
+        routes: Optional[Dict[str, str]] = None,
+        overrides: Optional[Dict[str, str]] = None,
+        min_confidence: float = 0.5,
+        default_tier: str = FULL,
+    ):
+        self.classifier = classifier or IntentClassifier()
+        self.routes = dict(routes or DEFAULT_ROUTES)
+        self.overrides = dict(overrides or {})
+        self.min_confidence = min_confidence
+        self.default_tier = default_tier
+        for intent, tier in self.overrides.items():
+            if intent not in self.routes:
+                raise ValueError(f"알 수 없는 의도입니다: {intent} (가능한 값: {', '.join(self.routes)})")
+            if tier not in (FAST, FULL):
+                raise ValueError(f"모델 등급은 {FAST} 또는 {FULL}이어야 합니다: {intent}={tier}")
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """ROUTER_OVERRIDES, ROUTER_MIN_CONFIDENCE 환경 변수로 생성"""
+        return cls(
+            overrides=parse_overrides(os.environ.get("ROUTER_OVERRIDES", "")),
+            min_confidence=float(os.environ.get("ROUTER_MIN_CONFIDENCE", "0.5")),
+        )
+
+    def route(self, text: str) -> RouteDecision:
+        start = time.perf_counter()
+        if not text.strip():
+            intent, confidence, tier, reason = "unknown", 0.0, self.default_tier, "empty"
+        else:
+            prediction = self.classifier.predict(text)
+            intent, confidence = prediction.intent, prediction.confidence
+            actions = [name for name in ACTION_INTENTS if name in prediction.keywords]
+            if len(actions) >= 2:
+                intent, confidence, reason = "complex", 1.0, "multi_intent"
+            elif confidence < self.min_confidence:
+                reason = "low_confidence"
+            elif intent in self.overrides:
+                reason = "override"
+            else:
+                reason = "intent"
+
+            if reason == "low_confidence":
+                tier = self.default_tier
+            else:
+                tier = self.overrides.get(intent) or self.routes.get(intent, self.default_tier)
+        return RouteDecision(intent, confidence, tier, reason, (time.perf_counter() - start) * 1000)
+
+
+def latest_user_text(messages: Iterable[Dict[str, Any]]) -> str:
+    """마지막 고객 질문 (도구 결과 메시지와 앞에 붙은 대화 요약 블록은 건너뜀)"""
+    for message in reversed(list(messages)):
+        if message.get("role") != "user":
+            continue
+        texts = [block["text"] for block in message.get("content", []) if "text" in block]
+        if texts:
+            return texts[-1]
+    return ""
+
+
+class RoutingModel(Model):
+    """
+    등급별 모델에 위임하는 strands 모델
+
+    모델 호출마다 마지막 고객 질문을 분류해 등급을 고릅니다. 도구 결과 뒤의 후속 호출도 같은
+    질문으로 분류되므로 한 턴 안에서는 같은 모델이 쓰입니다. 결정은 턴 첫 호출에서만 INFO로
+    남기고 (의도, 확률, 등급, 이유, 분류 지연), 등급/의도별 횟수는 stats에 누적합니다.
+
+    get_config()/config는 full 모델 것을 노출하므로 트레이스의 model_id는 full 모델 기준입니다.
+
+    Args:
+        models: 등급 -> 모델 ({"fast": ..., "full": ...}, full은 필수)
+        router: 라우터 (기본값: ModelRouter.from_env())
+    """
+
+    def __init__(self, models: Dict[str, Model], router: Optional[ModelRouter] = None):
+        if FULL not in models:
+            raise ValueError(f"'{FULL}' 모델이 필요합니다")
+        self.models = models
+        self.router = router or ModelRouter.from_env()
+        self.stats: Counter = Counter()
+
+    @property
+    def config(self) -> Any:
+        return self.models[FULL].get_config()
+
+    def update_config(self, **model_config: Any) -> None:
+        for model in self.models.values():
+            model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.models[FULL].get_config()
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        return self.models[FULL].structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs)
+
+    def model_for(self, messages: List[Dict[str, Any]]) -> Tuple[Model, RouteDecision]:
+        decision = self.router.route(latest_user_text(messages))
+        tier = decision.tier if decision.tier in self.models else FULL
+        return self.models[tier], decision
+
+    async def stream(self, messages, tool_specs=None, system_prompt: Optional[str] = None, **kwargs):
+        model, decision = self.model_for(messages)
+        follow_up = bool(messages) and any("toolResult" in block for block in messages[-1].get("content", []))
+        if not follow_up:
+            self.stats[decision.tier] += 1
+            self.stats[f"intent:{decision.intent}"] += 1
+        logger.log(
+            logging.DEBUG if follow_up else logging.INFO,
+            "모델 라우팅: intent=%s (%.2f) -> %s [%s, %.2fms]",
+            decision.intent, decision.confidence, decision.tier, decision.reason, decision.latency_ms,
+        )
+        async for event in model.stream(messages, tool_specs, system_prompt, **kwargs):
+            yield event
+
+
+def routing_model(full_model: Model, fast_model: Optional[Model] = None,
+                  enabled: bool = MODEL_ROUTING_ENABLED) -> Model:
+    """
+    라우팅을 켠 경우 RoutingModel, 끈 경우(MODEL_ROUTING=false) 또는 fast 모델이 없으면 full 모델
+
+    Args:
+        full_model: 복잡한 상담용 모델 (기존 MODEL_ID)
+        fast_model: 단순 FAQ/상태 문의용 모델 (예: FAST_MODEL_ID의 BedrockModel)
+    """
+    if not enabled or fast_model is None:
+        return full_model
+    return RoutingModel({FAST: fast_model, FULL: full_model})
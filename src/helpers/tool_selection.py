@@ -0,0 +1,285 @@
+"""
+요청별 도구 선택 (도구 정의 토큰 줄이기)
+Streamlit 앱은 로컬 도구와 Gateway MCP 도구(mcp_client.list_tools_sync())를 모든 모델 호출에 넘기므로,
+Gateway 타깃이 늘어날수록 도구 정의가 프롬프트의 대부분을 차지하고 매 턴의 TTFT가 늘어납니다.
+마지막 고객 질문과 관련 있는 도구만 골라 모델 요청에 넣습니다.
+
+- ToolIndex: 도구 이름/설명/인자 설명으로 만든 로컬 BM25 인덱스 (단어 + 단어 내부 문자 bigram, 네트워크 없음)
+- ToolSelector: 상위 top_k개 + 고정(pinned) 도구 + 최근 턴에서 쓴 도구 (+ tool_choice로 지정된 도구)
+  어떤 도구와도 겹치는 단어가 없고 유지할 도구도 없으면 판단할 근거가 없으므로 전체 도구를 넘김.
+  같은 세션에서 직전에 보낸 도구 목록이 이번 선택을 모두 포함하면 그 목록을 그대로 다시 보냄
+- ToolSelectingModel: strands Model 래퍼 (model_router.RoutingModel과 같은 방식). 에이전트의 도구
+  레지스트리는 그대로이므로 도구 실행/대체 도구/결과 재사용에는 영향이 없음
+
+선택된 도구는 원래(stable_tools) 순서를 유지하므로 같은 부분집합이면 프롬프트 캐시 prefix도 같지만,
+부분집합이 바뀌면 도구 정의 뒤의 prefix(시스템 프롬프트, 대화 기록)까지 캐시가 새로 쓰입니다. 그래서 직전
+목록으로 충분한 동안은 목록을 바꾸지 않습니다(세션 단위, 에이전트의 model_state에 보관).
+도구가 top_k + 고정 도구 수 이하이면 아무것도 하지 않습니다.
+전체 도구 정의 prefix가 세션 간에 캐시되는 구성에서는 선택이 과금 기준 입력을 오히려 늘릴 수 있으므로
+benchmarks/bench_tool_selection.py의 캐시 지표로 확인한 뒤 켜세요.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from strands.models.model import Model
+
+try:
+    from helpers.model_router import latest_user_text
+except ImportError:
+    try:
+        from src.helpers.model_router import latest_user_text
+    except ImportError:  # 런타임 컨테이너 (같은 디렉토리)
+        from model_router import latest_user_text
+
+logger = logging.getLogger(__name__)
+
+TOOL_SELECTION_ENABLED = os.environ.get("TOOL_SELECTION", "false").lower() == "true"
+TOOL_SELECTION_TOP_K = int(os.environ.get("TOOL_SELECTION_TOP_K", "5"))
+TOOL_SELECTION_PINNED = tuple(
+    name.strip() for name in os.environ.get("TOOL_SELECTION_PINNED", "").split(",") if name.strip()
+)
+
+# 세션에서 직전에 보낸 도구 이름을 보관하는 model_state 키
+MODEL_STATE_KEY = "tool_selection"
+
+# 밑줄로 이어진 도구 이름도 단어로 나눔 (check_return_eligibility -> check, return, eligibility)
+_WORD = re.compile(r"[^\W_]+")
+
+
+def terms(text: str, ngram_size: int = 2) -> List[str]:
+    """단어와 단어 내부의 문자 n-gram (조사가 붙은 '반품은'도 '반품'과 겹치도록)"""
+    tokens = []
+    for word in _WORD.findall(unicodedata.normalize("NFKC", text).lower()):
+        tokens.append(word)
+        if len(word) > ngram_size:
+            tokens.extend(word[i:i + ngram_size] for i in range(len(word) - ngram_size + 1))
+    return tokens
+
+
+def tool_document(tool_spec: Dict[str, Any], name_weight: int = 2) -> List[str]:
+    """도구 하나의 검색 토큰: 이름(가중치만큼 반복), 설명, 인자 이름/설명"""
+    properties = tool_spec.get("inputSchema", {}).get("json", {}).get("properties", {})
+    parts = [tool_spec.get("description", "")]
+    parts += [f"{name} {prop.get('description', '')}" for name, prop in properties.items()]
+    return terms(tool_spec["name"]) * name_weight + terms(" ".join(parts))
+
+
+class ToolIndex:
+    """도구 정의 BM25 인덱스"""
+
+    def __init__(self, tool_specs: Sequence[Dict[str, Any]], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.names = [spec["name"] for spec in tool_specs]
+        self.term_freqs = [Counter(tool_document(spec)) for spec in tool_specs]
+        self.doc_freq: Counter = Counter()
+        for tf in self.term_freqs:
+            self.doc_freq.update(tf.keys())
+        self.avg_length = sum(sum(tf.values()) for tf in self.term_freqs) / max(len(self.term_freqs), 1)
+
+    def rank(self, query: str) -> List[Tuple[float, str]]:
+        """(점수, 도구 이름) 점수순 (점수가 0인 도구는 제외)"""
+        query_terms = set(terms(query))
+        n_docs = len(self.names)
+        scored = []
+        for position, (tf, name) in enumerate(zip(self.term_freqs, self.names)):
+            doc_length = sum(tf.values())
+            score = 0.0
+            for term in query_terms & tf.keys():
+                df = self.doc_freq[term]
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                norm = tf[term] + self.k1 * (1 - self.b + self.b * doc_length / self.avg_length)
+                score += idf * tf[term] * (self.k1 + 1) / norm
+            if score > 0:
+                scored.append((score, -position, name))
+        scored.sort(reverse=True)
+        return [(score, name) for score, _, name in scored]
+
+
+def recent_tool_names(messages: Iterable[Dict[str, Any]], turns: int = 1) -> Set[str]:
+    """이번 턴과 직전 turns개 턴에서 모델이 호출한 도구 (후속 질문에서 같은 도구를 다시 쓸 수 있도록)"""
+    names: Set[str] = set()
+    user_turns = 0
+    for message in reversed(list(messages)):
+        content = message.get("content", [])
+        if message.get("role") == "user" and any("text" in block for block in content):
+            user_turns += 1
+            if user_turns > turns:
+                break
+        names.update(block["toolUse"]["name"] for block in content if "toolUse" in block)
+    return names
+
+
+class ToolSelection:
+    """선택 결과: 넘길 도구 정의, 선택 이유(ranked/kept/no_match/all), 점수, 선택 지연"""
+
+    def __init__(self, tool_specs: List[Dict[str, Any]], reason: str, scores: List[Tuple[float, str]],
+                 latency_ms: float):
+        self.tool_specs = tool_specs
+        self.reason = reason
+        self.scores = scores
+        self.latency_ms = latency_ms
+
+    @property
+    def names(self) -> List[str]:
+        return [spec["name"] for spec in self.tool_specs]
+
+
+class ToolSelector:
+    """
+    마지막 고객 질문으로 모델 요청에 넣을 도구를 고름
+
+    Args:
+        top_k: 점수순으로 넣을 도구 수 (TOOL_SELECTION_TOP_K)
+        pinned: 항상 넣을 도구 이름 (TOOL_SELECTION_PINNED, Gateway 도구는 '타깃___도구' 이름)
+        sticky_turns: 직전 몇 턴에서 호출한 도구를 계속 넣을지
+        keep_previous: 직전에 보낸 도구 목록이 이번 선택을 모두 포함하면 그 목록을 다시 보낼지
+
+    stats: requests, filtered, kept, no_match, tools_sent, tools_total
+    (모델 하나를 여러 세션이 공유하므로 stats와 인덱스는 잠금 안에서 갱신)
+    """
+
+    def __init__(self, top_k: int = TOOL_SELECTION_TOP_K, pinned: Sequence[str] = TOOL_SELECTION_PINNED,
+                 sticky_turns: int = 1, keep_previous: bool = True):
+        self.top_k = top_k
+        self.pinned = tuple(pinned)
+        self.sticky_turns = sticky_turns
+        self.keep_previous = keep_previous
+        self.stats: Counter = Counter()
+        self._indexes: Dict[Tuple[str, ...], ToolIndex] = {}
+        self._lock = threading.Lock()
+
+    def index_for(self, tool_specs: Sequence[Dict[str, Any]]) -> ToolIndex:
+        """도구 목록이 같으면 인덱스 재사용 (Gateway 도구가 바뀌면 새로 만듦)"""
+        key = tuple(spec["name"] for spec in tool_specs)
+        with self._lock:
+            index = self._indexes.get(key)
+        if index is None:
+            index = ToolIndex(tool_specs)
+            with self._lock:
+                if len(self._indexes) >= 8:
+                    self._indexes.clear()
+                self._indexes[key] = index
+        return index
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            self.stats.update(increments)
+
+    def select(self, tool_specs: Optional[List[Dict[str, Any]]], messages: List[Dict[str, Any]],
+               tool_choice: Optional[Dict[str, Any]] = None,
+               previous: Optional[Sequence[str]] = None) -> ToolSelection:
+        """previous: 같은 세션에서 직전에 보낸 도구 이름 (ToolSelectingModel이 넘김)"""
+        start = time.perf_counter()
+        tool_specs = list(tool_specs or [])
+        names = {spec["name"] for spec in tool_specs}
+        keep = {name for name in self.pinned if name in names}
+        if len(tool_specs) <= self.top_k + len(keep):
+            return ToolSelection(tool_specs, "all", [], (time.perf_counter() - start) * 1000)
+
+        keep |= recent_tool_names(messages, self.sticky_turns) & names
+        forced = (tool_choice or {}).get("tool", {}).get("name")
+        if forced in names:
+            keep.add(forced)
+
+        scores = self.index_for(tool_specs).rank(latest_user_text(messages))
+        ranked = [name for _, name in scores if name not in keep][:self.top_k]
+        if not ranked and not keep:
+            self._count(requests=1, tools_total=len(tool_specs), no_match=1, tools_sent=len(tool_specs))
+            return ToolSelection(tool_specs, "no_match", scores, (time.perf_counter() - start) * 1000)
+
+        selected = keep | set(ranked)
+        reason = "ranked"
+        if self.keep_previous and previous and selected <= set(previous) <= names:
+            # 직전 목록으로 충분하면 그대로 (도구 정의가 같아야 캐시된 prefix를 읽음)
+            selected = set(previous)
+            reason = "kept"
+        subset = [spec for spec in tool_specs if spec["name"] in selected]
+        self._count(requests=1, tools_total=len(tool_specs), filtered=1, tools_sent=len(subset),
+                    kept=int(reason == "kept"))
+        return ToolSelection(subset, reason, scores[:self.top_k], (time.perf_counter() - start) * 1000)
+
+
+class ToolSelectingModel(Model):
+    """
+    모델 호출마다 도구 정의를 골라 넘기는 strands 모델
+
+    도구 결과 뒤의 후속 호출도 같은 질문으로 고르고 이번 턴에 쓴 도구는 계속 넣으므로 한 턴 안에서
+    도구 목록이 줄어들지 않습니다. 보낸 목록은 strands가 넘기는 model_state(에이전트별, 세션 저장 시
+    함께 저장됨)에 남겨 다음 호출의 previous로 씁니다. 선택은 턴 첫 호출에서만 INFO로 남깁니다.
+
+    Args:
+        model: 실제 모델 (BedrockModel 등)
+        selector: 도구 선택기 (기본값: ToolSelector())
+        state: model_state 대신 직전 목록을 보관할 dict. 질문마다 에이전트를 새로 만들어 model_state가
+            이어지지 않는 경우(Streamlit) 세션마다 이 모델을 하나씩 만들고 dict를 넘김
+    """
+
+    def __init__(self, model: Model, selector: Optional[ToolSelector] = None,
+                 state: Optional[Dict[str, Any]] = None):
+        self.model = model
+        self.selector = selector or ToolSelector()
+        self.state = state
+
+    @property
+    def config(self) -> Any:
+        return self.model.get_config()
+
+    @property
+    def stats(self) -> Counter:
+        return self.selector.stats
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        return self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs)
+
+    async def stream(self, messages, tool_specs=None, system_prompt: Optional[str] = None, **kwargs):
+        model_state = self.state if self.state is not None else kwargs.get("model_state")
+        previous = model_state.get(MODEL_STATE_KEY) if model_state is not None else None
+        selection = self.selector.select(tool_specs, messages, kwargs.get("tool_choice"), previous)
+        if model_state is not None:
+            if selection.reason in ("ranked", "kept"):
+                model_state[MODEL_STATE_KEY] = selection.names
+            else:
+                model_state.pop(MODEL_STATE_KEY, None)
+        follow_up = bool(messages) and any("toolResult" in block for block in messages[-1].get("content", []))
+        logger.log(
+            logging.DEBUG if follow_up else logging.INFO,
+            "도구 선택: %d/%d개 [%s, %.2fms] %s",
+            len(selection.tool_specs), len(tool_specs or []), selection.reason, selection.latency_ms,
+            selection.names if selection.reason in ("ranked", "kept") else "",
+        )
+        async for event in self.model.stream(messages, selection.tool_specs or tool_specs, system_prompt,
+                                             **kwargs):
+            yield event
+
+
+def tool_selecting_model(model: Model, top_k: int = TOOL_SELECTION_TOP_K,
+                         pinned: Sequence[str] = TOOL_SELECTION_PINNED,
+                         enabled: bool = TOOL_SELECTION_ENABLED,
+                         state: Optional[Dict[str, Any]] = None) -> Model:
+    """
+    도구 선택을 켠 경우 ToolSelectingModel, 끈 경우(기본값) 원래 모델
+
+    Args:
+        model: 실제 모델
+        top_k: 점수순으로 넣을 도구 수
+        pinned: 항상 넣을 도구 이름
+        state: 직전 목록을 보관할 dict (ToolSelectingModel 참고)
+    """
+    if not enabled:
+        return model
+    return ToolSelectingModel(model, ToolSelector(top_k=top_k, pinned=pinned), state=state)
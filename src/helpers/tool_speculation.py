@@ -0,0 +1,231 @@
+"""
+엔티티 기반 도구 선실행(speculative prefetch)
+고객 메시지에 주문번호/시리얼 번호가 있으면 모델은 거의 항상 해당 조회 도구를 다음에 호출합니다.
+메시지가 기록에 추가되는 순간 조회 도구를 백그라운드에서 먼저 실행해, 모델이 도구를 고르는
+동안 도구 I/O를 겹쳐 처리합니다.
+
+- MessageAddedEvent: 고객 메시지에서 엔티티 추출 -> 도구 입력 스키마의 필수 인자를 모두 채울 수
+  있는 조회 도구만 스레드 풀에서 실행
+- BeforeToolCallEvent: 모델이 같은 도구를 같은 인자로 호출하면 selected_tool을 선실행 결과를
+  돌려주는 도구로 교체 (인자가 다르면 평소대로 실행)
+- AfterInvocationEvent: 사용되지 않은 선실행 결과는 폐기
+
+반품/교환 신청처럼 부수 효과가 있는 도구는 NEVER_SPECULATE로 막으며, 선실행 대상으로 지정하면
+생성 시 ValueError가 발생합니다.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from strands.hooks import AfterInvocationEvent, BeforeToolCallEvent, HookProvider, HookRegistry, MessageAddedEvent
+from strands.types.tools import AgentTool
+
+try:
+    from helpers.fast_path import extract_entities, registered_tool
+except ImportError:
+    try:
+        from src.helpers.fast_path import extract_entities, registered_tool
+    except ImportError:  # 런타임 컨테이너 (같은 디렉토리)
+        from fast_path import extract_entities, registered_tool
+
+logger = logging.getLogger(__name__)
+
+SPECULATION_ENABLED = os.environ.get("TOOL_SPECULATION", "true").lower() == "true"
+
+# 선실행해도 안전한 조회 도구 (get_order_status는 Gateway 등으로 등록된 경우에만 사용)
+DEFAULT_TOOLS = ("check_return_eligibility", "check_warranty_status", "get_order_status")
+
+# 절대 선실행하지 않는 부수 효과 도구 (접수/환불/교환이 실제로 진행됨)
+NEVER_SPECULATE = frozenset({"process_return", "process_return_request", "process_exchange"})
+
+# 도구 인자 이름 -> 엔티티에서 값을 꺼내는 함수
+ENTITY_ARGUMENTS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "order_number": lambda e: e["order_numbers"][0] if len(e.get("order_numbers", [])) == 1 else None,
+    "item_name": lambda e: e.get("item_name"),
+    "serial_number": lambda e: e.get("serial_number"),
+}
+
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("TOOL_SPECULATION_WORKERS", "8")),
+    thread_name_prefix="tool-speculation",
+)
+
+
+def call_key(tool_name: str, tool_input: Dict[str, Any]) -> Tuple[str, str]:
+    """도구 호출 비교용 키 (인자 순서와 무관)"""
+    return tool_name, json.dumps(tool_input, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def base_tool_name(tool_name: str) -> str:
+    """Gateway 도구의 '타깃___도구' 이름에서 도구 이름만 (tool_memo/tool_timeout에서도 사용)"""
+    return tool_name.rsplit("___", 1)[-1]
+
+
+def tool_result_of(event: Any) -> Optional[Dict[str, Any]]:
+    """
+    tool.stream()이 낸 이벤트가 결과이면 ToolResult 반환 (tool_timeout에서도 사용)
+
+    strands 내장 도구는 tool_result 속성이 있는 결과 이벤트를, 그 밖의 AgentTool은 ToolResult dict를
+    마지막으로 냅니다. 비공개 이벤트 클래스에 의존하지 않도록 두 형태 모두 모양으로만 판별합니다.
+    """
+    result = getattr(event, "tool_result", None)
+    if result is None and isinstance(event, dict) and "toolUseId" in event and "status" in event:
+        result = event
+    return result
+
+
+def _run_tool(tool: AgentTool, tool_use: Dict[str, Any]) -> Dict[str, Any]:
+    """작업 스레드에서 도구를 실행하고 ToolResult 반환"""
+
+    async def run():
+        result = None
+        async for event in tool.stream(tool_use, {}):
+            result = tool_result_of(event) or result
+        return result
+
+    result = asyncio.run(run())
+    if result is None:
+        raise RuntimeError(f"{tool.tool_name} 도구가 결과를 반환하지 않았습니다")
+    return result
+
+
+class _SpeculatedTool(AgentTool):
+    """선실행 결과를 기다렸다 돌려주는 도구 (선실행이 실패했으면 원래 도구를 실행)"""
+
+    def __init__(self, tool: AgentTool, future: Future, stats: Counter):
+        super().__init__()
+        self._tool = tool
+        self._future = future
+        self._stats = stats
+
+    @property
+    def tool_name(self) -> str:
+        return self._tool.tool_name
+
+    @property
+    def tool_spec(self):
+        return self._tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self._tool.tool_type
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        try:
+            result = await asyncio.wrap_future(self._future)
+        except Exception as e:
+            logger.debug("선실행 실패, 도구를 다시 실행합니다 (%s): %s", self.tool_name, e)
+            self._stats["errors"] += 1
+            async for event in self._tool.stream(tool_use, invocation_state, **kwargs):
+                yield event
+            return
+        # AgentTool 규약: 마지막으로 낸 ToolResult가 도구 결과
+        yield {**result, "toolUseId": tool_use["toolUseId"]}
+
+
+class SpeculativePrefetch(HookProvider):
+    """
+    조회 도구 선실행 훅 (에이전트마다 하나씩 생성)
+
+    Args:
+        tools: 선실행할 조회 도구 이름 (에이전트에 등록된 것만 사용)
+        context: 메시지에 없는 고정 인자 (예: {"customer_id": ...}, Gateway 도구용)
+        enabled: False이면 아무것도 하지 않음 (TOOL_SPECULATION=false)
+        executor: 도구를 실행할 스레드 풀 (기본값: 모든 에이전트가 공유하는 풀)
+
+    stats: started(선실행 시작), hits(모델 호출에 사용), misses(선실행 없이 실행된 조회 도구),
+    discarded(사용되지 않고 폐기), errors(선실행 실패 후 재실행)
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[str] = DEFAULT_TOOLS,
+        context: Optional[Dict[str, Any]] = None,
+        enabled: bool = SPECULATION_ENABLED,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        unsafe = [name for name in tools if base_tool_name(name) in NEVER_SPECULATE]
+        if unsafe:
+            raise ValueError(f"부수 효과가 있는 도구는 선실행할 수 없습니다: {', '.join(unsafe)}")
+        self.tools = tuple(tools)
+        self.context = dict(context or {})
+        self.enabled = enabled
+        self.executor = executor or _EXECUTOR
+        self.stats: Counter = Counter()
+        self._pending: Dict[Tuple[str, str], Future] = {}
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(MessageAddedEvent, self.on_message_added)
+        registry.add_callback(BeforeToolCallEvent, self.on_before_tool_call)
+        registry.add_callback(AfterInvocationEvent, self.on_after_invocation)
+
+    def _tool_input(self, tool: AgentTool, entities: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """입력 스키마의 필수 인자를 엔티티/context로 모두 채울 수 있으면 인자 dict"""
+        schema = tool.tool_spec.get("inputSchema", {}).get("json", {})
+        tool_input = {}
+        for name in schema.get("required", []):
+            value = self.context.get(name)
+            if value is None and name in ENTITY_ARGUMENTS:
+                value = ENTITY_ARGUMENTS[name](entities)
+            if value is None:
+                return None
+            tool_input[name] = value
+        return tool_input or None
+
+    def on_message_added(self, event: MessageAddedEvent) -> None:
+        message = event.message
+        if not self.enabled or message["role"] != "user":
+            return
+        text = " ".join(block["text"] for block in message["content"] if "text" in block)
+        if not text:
+            return
+        entities = extract_entities(text)
+        if not entities["order_numbers"] and "serial_number" not in entities:
+            return
+
+        registry = event.agent.tool_registry.registry
+        for name in self.tools:
+            tool_name = registered_tool(event.agent, name)
+            if tool_name is None or base_tool_name(tool_name) in NEVER_SPECULATE:
+                continue
+            tool = registry[tool_name]
+            tool_input = self._tool_input(tool, entities)
+            if tool_input is None:
+                continue
+            key = call_key(tool_name, tool_input)
+            if key in self._pending:
+                continue
+            tool_use = {"toolUseId": f"speculative_{tool_name}", "name": tool_name, "input": tool_input}
+            self._pending[key] = self.executor.submit(_run_tool, tool, tool_use)
+            self.stats["started"] += 1
+            logger.debug("도구 선실행 시작: %s %s", tool_name, tool_input)
+
+    def on_before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        if event.selected_tool is None:
+            return
+        tool_use = event.tool_use
+        future = self._pending.pop(call_key(tool_use["name"], tool_use.get("input") or {}), None)
+        if getattr(event.selected_tool, "memoized", False):
+            # ToolMemoizer가 저장된 결과로 바꾼 호출: 선실행 결과는 쓰지 않음
+            if future is not None:
+                future.cancel()
+                self.stats["discarded"] += 1
+            return
+        if future is None:
+            if base_tool_name(tool_use["name"]) in self.tools:
+                self.stats["misses"] += 1
+            return
+        event.selected_tool = _SpeculatedTool(event.selected_tool, future, self.stats)
+        self.stats["hits"] += 1
+        logger.debug("선실행 결과 사용: %s", tool_use["name"])
+
+    def on_after_invocation(self, event: AfterInvocationEvent) -> None:
+        for future in self._pending.values():
+            future.cancel()
+        self.stats["discarded"] += len(self._pending)
+        self._pending.clear()
@@ -0,0 +1,258 @@
+"""
+도구별 실행 시간 제한과 대체 도구
+Gateway MCP 도구나 web_search Lambda가 느려지면 턴 전체가 상한 없이 멈춥니다. 도구마다 제한 시간을
+두고, 시간이 지나면 실행을 취소한 뒤 대체 도구(예: Gateway 검색 대신 로컬 web_search)를 먼저 시도하고,
+그것도 안 되면 모델이 판단할 수 있는 구조화된 "도구 시간 초과" 결과를 돌려줍니다.
+
+- BeforeToolCallEvent에서 selected_tool을 제한 시간을 적용하는 도구로 교체 (tool_speculation과 같은 방식)
+- 제한 시간/대체 도구는 도구 이름 또는 glob 패턴으로 지정 (Gateway 도구는 '타깃___도구' 이름이므로
+  "*___web_search"처럼 지정)
+- 취소: 이벤트를 기다리던 코루틴을 취소하고 도구 스트림을 닫음. MCP/비동기 도구는 실제 호출이
+  취소되지만, 동기 @tool 함수는 작업 스레드를 멈출 수 없으므로 결과만 버림. 이때 동기 agent(...)
+  호출은 모델 답변을 제때 만들어도 이벤트 루프 종료 시 작업 스레드를 기다렸다가 반환합니다
+  (stream_async/invoke_async는 바로 반환)
+- 반품/교환 신청처럼 부수 효과가 있는 도구(NEVER_SPECULATE)는 기본적으로 제한 시간을 걸지 않음.
+  시간 초과 뒤에도 접수가 끝까지 진행될 수 있어, 모델이 실패로 보고 다시 신청하면 중복 접수가 됨
+"""
+
+import asyncio
+import fnmatch
+import logging
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+from strands.hooks import BeforeToolCallEvent, HookProvider, HookRegistry
+from strands.types.tools import AgentTool
+
+try:
+    from helpers.tool_speculation import NEVER_SPECULATE, base_tool_name, tool_result_of
+except ImportError:
+    try:
+        from src.helpers.tool_speculation import NEVER_SPECULATE, base_tool_name, tool_result_of
+    except ImportError:  # 런타임 컨테이너 (같은 디렉토리)
+        from tool_speculation import NEVER_SPECULATE, base_tool_name, tool_result_of
+
+logger = logging.getLogger(__name__)
+
+TOOL_TIMEOUTS_ENABLED = os.environ.get("TOOL_TIMEOUTS", "true").lower() == "true"
+DEFAULT_TIMEOUT_SECONDS = float(os.environ.get("TOOL_TIMEOUT_SECONDS", "20"))
+
+# 도구 이름/패턴 -> 제한 시간(초). 정확히 같은 이름이 우선이고, 그다음은 앞에서부터 처음 맞는 패턴
+DEFAULT_TIMEOUTS: Dict[str, float] = {
+    "web_search": 10.0,
+    "*___*": 10.0,  # Gateway MCP 도구 (Lambda 콜드 스타트 포함)
+}
+# 도구 이름/패턴 -> 시간 초과 시 먼저 시도할 대체 도구 (에이전트에 등록된 도구만 사용)
+DEFAULT_FALLBACKS: Dict[str, str] = {
+    "*___web_search": "web_search",
+}
+
+
+def parse_mapping(value: str) -> Dict[str, str]:
+    """'web_search=8,*___*=12' 형식의 설정 파싱"""
+    mapping = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, setting = item.partition("=")
+        mapping[name.strip()] = setting.strip()
+    return mapping
+
+
+def _merge(*mappings: Dict[str, Any]) -> Dict[str, Any]:
+    """뒤의 설정이 우선하도록 합침 (패턴은 앞에서부터 처음 맞는 것을 쓰므로 우선하는 설정이 앞에 옴)"""
+    merged: Dict[str, Any] = {}
+    for mapping in reversed(mappings):
+        for name, value in mapping.items():
+            merged.setdefault(name, value)
+    return merged
+
+
+def _lookup(mapping: Dict[str, Any], tool_name: str) -> Any:
+    if tool_name in mapping:
+        return mapping[tool_name]
+    return next((value for pattern, value in mapping.items() if fnmatch.fnmatchcase(tool_name, pattern)), None)
+
+
+def timeout_result(tool_use_id: str, tool_name: str, timeout_seconds: float,
+                   fallback: Optional[str] = None) -> Dict[str, Any]:
+    """모델에 돌려줄 시간 초과 결과 (실행 결과를 알 수 없으므로 같은 도구를 다시 호출하지 않도록 안내)"""
+    tried = f" 대체 도구 {fallback}도 응답하지 않았습니다." if fallback else ""
+    return {
+        "toolUseId": tool_use_id,
+        "status": "error",
+        "content": [
+            {"text": f"도구 시간 초과: {tool_name}이(가) {timeout_seconds:g}초 안에 응답하지 않았습니다. "
+                     f"실행이 끝났는지와 결과는 알 수 없습니다.{tried} 같은 도구를 다시 호출하지 말고, 다른 "
+                     f"정보로 답하거나 고객에게 잠시 후 다시 확인해 드리겠다고 안내하세요."},
+            {"json": {"error": "tool_timeout", "tool": tool_name, "timeout_seconds": timeout_seconds,
+                      "fallback": fallback}},
+        ],
+    }
+
+
+async def run_with_timeout(tool: AgentTool, tool_use: Dict[str, Any], invocation_state: Dict[str, Any],
+                           timeout_seconds: float, **kwargs: Any):
+    """
+    도구를 제한 시간 안에 실행하며 이벤트를 그대로 전달
+
+    중간 이벤트(ToolStreamEvent)는 바로 내보내고, 결과 전에 시간이 다 되면 도구 스트림을 취소하고
+    asyncio.TimeoutError를 발생시킵니다.
+    """
+    deadline = time.monotonic() + timeout_seconds
+    events = tool.stream(tool_use, invocation_state, **kwargs).__aiter__()
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            try:
+                event = await asyncio.wait_for(events.__anext__(), remaining)
+            except StopAsyncIteration:
+                return
+            yield event
+    finally:
+        await events.aclose()
+
+
+class _TimeoutTool(AgentTool):
+    """제한 시간을 적용하고, 시간이 지나면 대체 도구 -> 시간 초과 결과 순으로 응답하는 도구"""
+
+    def __init__(self, tool: AgentTool, timeout_seconds: float, fallback: Optional[AgentTool],
+                 fallback_timeout_seconds: float, stats: Counter):
+        super().__init__()
+        self._tool = tool
+        self._timeout_seconds = timeout_seconds
+        self._fallback = fallback
+        self._fallback_timeout_seconds = fallback_timeout_seconds
+        self._stats = stats
+
+    @property
+    def tool_name(self) -> str:
+        return self._tool.tool_name
+
+    @property
+    def tool_spec(self):
+        return self._tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self._tool.tool_type
+
+    def _fallback_use(self, tool_use: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """대체 도구 입력: 스키마에 있는 인자만 넘기고, 필수 인자가 빠지면 None"""
+        schema = self._fallback.tool_spec.get("inputSchema", {}).get("json", {})
+        properties = schema.get("properties", {})
+        tool_input = {k: v for k, v in (tool_use.get("input") or {}).items() if k in properties}
+        if any(name not in tool_input for name in schema.get("required", [])):
+            return None
+        return {"toolUseId": tool_use["toolUseId"], "name": self._fallback.tool_name, "input": tool_input}
+
+    async def _run_fallback(self, tool_use, invocation_state, **kwargs) -> Optional[Dict[str, Any]]:
+        fallback_use = self._fallback_use(tool_use)
+        if fallback_use is None:
+            return None
+        result = None
+        try:
+            async for event in run_with_timeout(self._fallback, fallback_use, invocation_state,
+                                                self._fallback_timeout_seconds, **kwargs):
+                result = tool_result_of(event) or result
+        except asyncio.TimeoutError:
+            self._stats[f"timeout:{self._fallback.tool_name}"] += 1
+            return None
+        if result is None or result.get("status") != "success":
+            return None
+        note = {"text": f"({self.tool_name} 응답이 늦어 {self._fallback.tool_name} 결과로 대신합니다)"}
+        return {**result, "toolUseId": tool_use["toolUseId"], "content": [note, *result.get("content", [])]}
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        try:
+            async for event in run_with_timeout(self._tool, tool_use, invocation_state, self._timeout_seconds,
+                                                **kwargs):
+                yield event
+            return
+        except asyncio.TimeoutError:
+            pass
+
+        self._stats["timeouts"] += 1
+        self._stats[f"timeout:{self.tool_name}"] += 1
+        logger.warning("도구 시간 초과 (%s, %gs), 결과를 기다리지 않습니다", self.tool_name, self._timeout_seconds)
+
+        if self._fallback is not None:
+            result = await self._run_fallback(tool_use, invocation_state, **kwargs)
+            if result is not None:
+                self._stats["fallback_success"] += 1
+                logger.info("대체 도구 사용: %s -> %s", self.tool_name, self._fallback.tool_name)
+                yield result
+                return
+            self._stats["fallback_failed"] += 1
+
+        fallback_name = self._fallback.tool_name if self._fallback is not None else None
+        yield timeout_result(tool_use["toolUseId"], self.tool_name, self._timeout_seconds, fallback_name)
+
+
+class ToolTimeouts(HookProvider):
+    """
+    도구 실행 시간 제한 훅 (여러 에이전트가 하나를 공유해도 됨)
+
+    제한 시간과 대체 도구는 인자로 받은 값을 기본값에 덮어쓰며, 환경 변수
+    TOOL_TIMEOUTS_BY_TOOL("web_search=8,*___*=12"), TOOL_FALLBACKS("*___web_search=web_search")로도
+    지정할 수 있습니다.
+
+    Args:
+        timeouts: 도구 이름/패턴 -> 제한 시간(초)
+        fallbacks: 도구 이름/패턴 -> 대체 도구 이름
+        default_timeout: 어느 설정에도 맞지 않는 도구의 제한 시간 (TOOL_TIMEOUT_SECONDS)
+        exempt: 제한 시간을 걸지 않는 도구 이름 (Gateway 도구는 '타깃___' 뒤 이름으로도 비교)
+        enabled: False이면 아무것도 하지 않음 (TOOL_TIMEOUTS=false)
+
+    stats: timeouts, timeout:<도구>, fallback_success, fallback_failed, exempt
+    """
+
+    def __init__(
+        self,
+        timeouts: Optional[Dict[str, float]] = None,
+        fallbacks: Optional[Dict[str, str]] = None,
+        default_timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        exempt: Iterable[str] = NEVER_SPECULATE,
+        enabled: bool = TOOL_TIMEOUTS_ENABLED,
+    ):
+        env_timeouts = {name: float(value)
+                        for name, value in parse_mapping(os.environ.get("TOOL_TIMEOUTS_BY_TOOL", "")).items()}
+        self.timeouts = _merge(DEFAULT_TIMEOUTS, env_timeouts, timeouts or {})
+        self.fallbacks = _merge(DEFAULT_FALLBACKS, parse_mapping(os.environ.get("TOOL_FALLBACKS", "")),
+                                fallbacks or {})
+        self.default_timeout = default_timeout
+        self.exempt = frozenset(exempt)
+        self.enabled = enabled
+        self.stats: Counter = Counter()
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeToolCallEvent, self.on_before_tool_call)
+
+    def timeout_for(self, tool_name: str) -> float:
+        timeout = _lookup(self.timeouts, tool_name)
+        return float(timeout) if timeout is not None else self.default_timeout
+
+    def fallback_for(self, agent, tool_name: str) -> Optional[AgentTool]:
+        name = _lookup(self.fallbacks, tool_name)
+        if not name or name == tool_name:
+            return None
+        return agent.tool_registry.registry.get(name)
+
+    def on_before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        # ToolMemoizer가 저장된 결과로 바꾼 호출은 실행할 것이 없으므로 감싸지 않음
+        if not self.enabled or event.selected_tool is None or getattr(event.selected_tool, "memoized", False):
+            return
+        tool_name = event.tool_use["name"]
+        if tool_name in self.exempt or base_tool_name(tool_name) in self.exempt:
+            self.stats["exempt"] += 1
+            return
+        fallback = self.fallback_for(event.agent, tool_name)
+        event.selected_tool = _TimeoutTool(
+            event.selected_tool,
+            timeout_seconds=self.timeout_for(tool_name),
+            fallback=fallback,
+            fallback_timeout_seconds=self.timeout_for(fallback.tool_name) if fallback else 0.0,
+            stats=self.stats,
+        )
@@ -31,10 +31,16 @@ from lab_helpers.lab1_strands_agent import (
     get_product_recommendations,
     ECOMMERCE_MODEL_ID as MODEL_ID
 )
+# 메모리 쓰기는 응답과 별도로 write-behind 큐에서 처리되고, 남은 쓰기는 프로세스 종료 시(atexit) 내보냄
+# (Streamlit은 SIGTERM을 받으면 서버를 정상 종료하므로 atexit가 실행됨)
 from lab_helpers.ecommerce_memory import (
     EcommerceCustomerMemoryHooks,
     create_or_get_ecommerce_memory_resource
 )
+from lab_helpers.prompt_cache import cache_model_config
+from lab_helpers.tool_memo import ToolMemoizer
+from lab_helpers.tool_selection import tool_selecting_model
+from lab_helpers.tool_timeout import ToolTimeouts
 from lab_helpers.utils import get_ssm_parameter, get_cognito_client_secret
 
 # Lab 3에서 만든 추가 도구들
@@ -128,11 +134,12 @@ def initialize_agent():
     try:
         REGION = boto3.session.Session().region_name
         
-        # Bedrock 모델
+        # Bedrock 모델 (모든 세션이 공유, 도구 선택 래퍼는 세션마다 main()에서 씌움)
         model = BedrockModel(
             model_id=MODEL_ID,
             temperature=0.3,
-            region_name=REGION
+            region_name=REGION,
+            **cache_model_config()
         )
         
         # 메모리 클라이언트
@@ -202,6 +209,10 @@ def initialize_session_state():
     
     if "customer_id" not in st.session_state:
         st.session_state.customer_id = "customer_streamlit_001"
+
+    # 에이전트는 질문마다 새로 만들므로 세션 범위 도구 결과는 세션 상태에 보관
+    if "tool_memo" not in st.session_state:
+        st.session_state.tool_memo = ToolMemoizer()
     
     if "messages" not in st.session_state:
         st.session_state.messages = [
@@ -221,6 +232,23 @@ def initialize_session_state():
             "preferred_brands": ["ZARA", "이니스프리", "에이블리"]
         }
 
+# 세션 시작 시 고객 메모리 미리 불러오기
+def prefetch_customer_memory(memory_client, memory_id):
+    """새 세션이 만들어지면 고객 선호도/프로필 메모리를 백그라운드로 미리 불러옵니다."""
+    if st.session_state.get("memory_prefetched") or not memory_id:
+        return
+
+    try:
+        EcommerceCustomerMemoryHooks(
+            memory_id,
+            memory_client,
+            st.session_state.customer_id,
+            st.session_state.session_id
+        ).prefetch_customer_context()
+        st.session_state.memory_prefetched = True
+    except Exception as e:
+        st.warning(f"고객 메모리 미리 불러오기 실패: {str(e)}")
+
 # 빠른 액션 버튼들
 def render_quick_actions():
     """빠른 액션 버튼들을 렌더링합니다."""
@@ -348,11 +376,17 @@ def get_agent_response_streaming(user_input, model, memory_client, memory_id, to
             st.session_state.session_id
         )
         
-        # 에이전트 생성
+        # 에이전트 생성 (같은 인자로 반복되는 검색은 저장된 결과로 응답,
+        # Gateway 도구가 느리면 제한 시간 후 취소하고 로컬 web_search 등으로 대체)
+        # 메시지마다 새 에이전트를 만들어 대화 기록이 쌓이지 않으므로 기록 압축은 사용하지 않음
+        # (이전 맥락은 메모리 훅이 제공, 메모리 리소스를 확인하지 못했으면 메모리 없이 진행)
+        hooks = [st.session_state.tool_memo, ToolTimeouts()]
+        if memory_id:
+            hooks.insert(0, memory_hooks)
         agent = Agent(
             model=model,
             tools=tools,
-            hooks=[memory_hooks],
+            hooks=hooks,
             system_prompt=SYSTEM_PROMPT
         )
         
@@ -422,6 +456,16 @@ def main():
     if model is None:
         st.error("에이전트 초기화에 실패했습니다. 관리자에게 문의해주세요.")
         return
+
+    # TOOL_SELECTION=true이면 모델 호출마다 질문과 관련 있는 도구 정의만 전달
+    # (기본값은 전체 도구: 도구 정의 prefix가 캐시되므로 대개 이쪽이 더 저렴).
+    # 에이전트는 질문마다 새로 만들므로 직전에 보낸 도구 목록은 tool_memo처럼 세션 상태에 보관
+    if "model" not in st.session_state:
+        st.session_state.model = tool_selecting_model(model, state={})
+    model = st.session_state.model
+
+    # 첫 메시지 전에 고객 메모리를 미리 불러와 첫 응답 지연을 줄임
+    prefetch_customer_memory(memory_client, memory_id)
     
     # 레이아웃 구성
     render_customer_sidebar()
@@ -15,17 +15,19 @@ from strands.models import BedrockModel
 import boto3
 
 from src.agent import process_return, process_exchange, web_search, MODEL_ID, SYSTEM_PROMPT
+from src.helpers.model_cache import cached_model
 
 
 def create_test_agent(messages=None):
     """테스트용 Agent 생성"""
     region = boto3.session.Session().region_name
 
-    model = BedrockModel(
+    # MODEL_CACHE=record로 한 번 실행하면 이후 MODEL_CACHE=replay로 네트워크 없이 재실행
+    model = cached_model(BedrockModel(
         model_id=MODEL_ID,
         temperature=0.3,
         region_name=region
-    )
+    ))
 
     agent = Agent(
         model=model,